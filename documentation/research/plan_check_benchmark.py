@@ -0,0 +1,689 @@
+#!/usr/bin/env python3
+"""
+plan-check: benchmarks for the validation engine prototype
+
+dispatch: compares the single-pass EntityDispatcher used by
+    PlanCheckValidator.validate against running each validate_* function on
+    its own (one model space walk per validator plus the two stats passes the
+    engine used to do).
+
+findings: peak memory and report time on a pathological drawing where every
+    polyline is off Z=0 and every text uses a wrong font, with and without a
+    per-code findings cap.
+
+blocks: a furniture block with a few defects inserted many times, validated
+    with the memoized BlockRule against exploding every INSERT into
+    transformed model space entities first.
+
+precheck: times the staged pipeline (dwglayers precheck, then the full
+    dwgread parse only if the layer structure passes) against the plain full
+    validation on real DWG files. Needs LibreDWG installed.
+
+scale: time and tracemalloc peak of every validate_* function and of
+    PlanCheckValidator.validate on synthetic drawings of growing size. The
+    growth exponent between the two largest sizes flags superlinear paths;
+    --json stores the results and --baseline compares against a stored run
+    (exit status 1 on a regression).
+
+reports: time and tracemalloc peak of serializing the pathological drawing's
+    findings with the streaming report writers (json, jsonl, sarif) against
+    building the report dict and dumping it with json.dumps(indent=2), at
+    growing finding counts.
+
+tiles: build time and peak memory of the OverlayTiles index on synthetic
+    drawings, then render time (cold and cached) and size of the tile over
+    the drawing centre at every zoom level.
+
+aoids: check and accept time of one new floor against a project AOID index
+    filled with a growing number of accepted floors; should stay flat.
+
+gaps: time of the endpoint gap check and of its near_pairs grid query on
+    synthetic floors of growing size with 2.3 mm wall gaps injected, plus
+    the growth exponent between the two largest sizes (about 1 for
+    O(n log n)).
+
+imports: import time of the prototype module from `python -X importtime`
+    in fresh interpreters, best of --repeat, against a budget in ms. Fails
+    as well if one of the lazily loaded packages (numpy, shapely, openpyxl,
+    pyarrow, yaml) is imported eagerly, or if validations that first touch
+    numpy and shapely from several executor threads at once (as the async
+    service does) fail or hang.
+
+Usage:
+    python plan_check_benchmark.py dispatch --rooms 500 --filler 200000
+    python plan_check_benchmark.py findings --count 200000 --cap 1000
+    python plan_check_benchmark.py blocks --inserts 10000 --block-size 200
+    python plan_check_benchmark.py precheck plans/*.dwg
+    python plan_check_benchmark.py scale --sizes 1000 10000 100000 1000000
+    python plan_check_benchmark.py scale --json scale.json --baseline previous.json
+    python plan_check_benchmark.py reports --counts 20000 200000
+    python plan_check_benchmark.py tiles --sizes 100000 1000000
+    python plan_check_benchmark.py aoids --floors 10 100 500 --rooms 1000
+    python plan_check_benchmark.py gaps --sizes 10000 100000 1000000
+    python plan_check_benchmark.py --repeat 5 imports --budget-ms 250
+"""
+
+import argparse
+import copy
+import csv
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Optional
+
+from plan_check_prototype import (
+    BlockRule,
+    EntityDispatcher,
+    ForbiddenEntityRule,
+    GAP_TOLERANCE_MM,
+    GeometryModel,
+    GeometryRule,
+    MockDWGParser,
+    OverlayTiles,
+    PlanCheckValidator,
+    ProjectAoidIndex,
+    REPORT_FORMATS,
+    StatsRule,
+    SyntheticDWGParser,
+    SyntheticSpec,
+    TextEntityRule,
+    build_entity_rules,
+    build_report,
+    create_report_writer,
+    generate_drawing,
+    insert_transform,
+    model_space_entities,
+    near_pairs,
+    run_rules,
+    validate_aoids,
+    validate_endpoint_gaps,
+    validate_entity_types,
+    validate_geometry,
+    validate_layer_entities,
+    validate_layers,
+    validate_text_entities,
+)
+
+
+def build_scaled_drawing(rooms: int, filler: int) -> dict:
+    """
+    Tile the mock drawing's entities on a grid so that no two rooms overlap,
+    then pad model space with plain LINE entities on A_ARCHITEKTUR.
+    """
+    base = MockDWGParser().parse_dwg_to_json(None)
+    template = model_space_entities(base)
+    entities = []
+
+    tiles = max(1, rooms // 2)
+    for tile in range(tiles):
+        dx = (tile % 100) * 20000.0
+        dy = (tile // 100) * 20000.0
+        for entity in template:
+            clone = copy.deepcopy(entity)
+            clone["handle"] = f"{clone['handle']}-{tile}"
+            for pt in clone.get("points", []):
+                pt["x"] += dx
+                pt["y"] += dy
+            if "insertion_point" in clone:
+                clone["insertion_point"]["x"] += dx
+                clone["insertion_point"]["y"] += dy
+            entities.append(clone)
+
+    for i in range(filler):
+        entities.append({
+            "type": "LINE",
+            "handle": f"F{i:X}",
+            "layer": "A_ARCHITEKTUR",
+            "color": 256,
+            "start": {"x": float(i), "y": 0.0, "z": 0.0},
+            "end": {"x": float(i), "y": 100.0, "z": 0.0},
+        })
+
+    base["blocks"]["*Model_Space"]["entities"] = entities
+    return base
+
+
+def run_per_validator(dwg_json: dict) -> int:
+    """Previous engine layout: every validator walks model space itself."""
+    errors = []
+    errors.extend(validate_entity_types(dwg_json))
+    errors.extend(validate_layer_entities(dwg_json))
+    errors.extend(validate_geometry(dwg_json))
+    errors.extend(validate_endpoint_gaps(dwg_json))
+    errors.extend(validate_aoids(dwg_json))
+    errors.extend(validate_text_entities(dwg_json))
+    entities = model_space_entities(dwg_json)
+    sum(1 for e in entities if e.get("layer") == "R_RAUMPOLYGON")
+    sum(1 for e in entities if e.get("layer") == "R_AOID")
+    return len(errors)
+
+
+def run_single_pass(dwg_json: dict) -> int:
+    """Current engine layout: one dispatched walk over model space."""
+    dispatcher = EntityDispatcher(build_entity_rules() + [StatsRule()])
+    return len(dispatcher.run(dwg_json))
+
+
+def time_best(func, dwg_json: dict, repeat: int) -> tuple[float, int]:
+    """Best-of-N wall time in seconds, plus the finding count of the last run."""
+    best = float("inf")
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = func(dwg_json)
+        best = min(best, time.perf_counter() - start)
+    return best, count
+
+
+def bench_dispatch(rooms: int, filler: int, repeat: int) -> None:
+    dwg_json = build_scaled_drawing(rooms, filler)
+    total = len(model_space_entities(dwg_json))
+    print(f"Dispatch benchmark: {total} entities, best of {repeat}")
+
+    legacy_time, legacy_count = time_best(run_per_validator, dwg_json, repeat)
+    single_time, single_count = time_best(run_single_pass, dwg_json, repeat)
+    assert legacy_count == single_count, "single-pass findings differ from per-validator findings"
+
+    print(f"  per-validator loops: {legacy_time * 1000:9.1f} ms ({legacy_count} findings)")
+    print(f"  single pass:         {single_time * 1000:9.1f} ms ({single_count} findings)")
+    print(f"  speedup:             {legacy_time / single_time:9.2f}x")
+
+
+def build_pathological_drawing(count: int) -> dict:
+    """Every polyline has a vertex off Z=0, every text uses the BadFont style."""
+    dwg_json = MockDWGParser().parse_dwg_to_json(None)
+    entities = []
+    for i in range(count // 2):
+        x = float(i % 1000) * 6000.0
+        y = float(i // 1000) * 6000.0
+        entities.append({
+            "type": "LWPOLYLINE",
+            "handle": f"P{i:X}",
+            "layer": "A_ARCHITEKTUR",
+            "flag": 1,
+            "const_width": 0.0,
+            "points": [
+                {"x": x, "y": y, "z": 1.0},
+                {"x": x + 5000.0, "y": y, "z": 0.0},
+                {"x": x + 5000.0, "y": y + 5000.0, "z": 0.0},
+            ]
+        })
+        entities.append({
+            "type": "TEXT",
+            "handle": f"T{i:X}",
+            "layer": "V_TEXT",
+            "color": 256,
+            "insertion_point": {"x": x, "y": y, "z": 0.0},
+            "text_value": "Label",
+            "style": "BadFont"
+        })
+    dwg_json["blocks"]["*Model_Space"]["entities"] = entities
+    return dwg_json
+
+
+def bench_findings(count: int, cap: int) -> None:
+    dwg_json = build_pathological_drawing(count)
+    print(f"Findings benchmark: {count} entities")
+
+    for label, limit in (("uncapped", None), (f"cap {cap}", cap)):
+        validator = PlanCheckValidator(use_mock_parser=True, max_findings_per_code=limit)
+
+        # Timing run without tracemalloc, whose hooks would dominate the numbers
+        start = time.perf_counter()
+        result = validator.validate_drawing(Path("pathological.dwg"), dwg_json)
+        validated = time.perf_counter()
+        build_report(result)
+        done = time.perf_counter()
+        del result
+
+        tracemalloc.start()
+        build_report(validator.validate_drawing(Path("pathological.dwg"), dwg_json))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"  {label:10s} validate {(validated - start) * 1000:8.1f} ms, "
+              f"report {(done - validated) * 1000:8.1f} ms, peak {peak / 1024 ** 2:8.1f} MiB")
+
+
+def build_block_drawing(inserts: int, block_size: int) -> dict:
+    """One block of block_size entities (one SPLINE, one off-Z polyline), inserted on a grid."""
+    dwg_json = MockDWGParser().parse_dwg_to_json(None)
+    block = [{
+        "type": "LWPOLYLINE",
+        "handle": f"B{i:X}",
+        "layer": "0",
+        "flag": 1,
+        "const_width": 0.0,
+        "points": [
+            {"x": float(i), "y": 0.0, "z": 1.0 if i == 0 else 0.0},
+            {"x": float(i) + 10.0, "y": 0.0, "z": 0.0},
+            {"x": float(i) + 10.0, "y": 10.0, "z": 0.0},
+        ]
+    } for i in range(block_size - 1)]
+    block.append({"type": "SPLINE", "handle": "BS", "layer": "0", "insertion_point": {"x": 0.0, "y": 0.0, "z": 0.0}})
+    dwg_json["blocks"]["CHAIR"] = {"base_point": {"x": 0.0, "y": 0.0, "z": 0.0}, "entities": block}
+    dwg_json["blocks"]["*Model_Space"]["entities"] = [{
+        "type": "INSERT",
+        "handle": f"I{i:X}",
+        "layer": "A_ARCHITEKTUR",
+        "name": "CHAIR",
+        "insertion_point": {"x": (i % 100) * 1000.0, "y": (i // 100) * 1000.0, "z": 0.0},
+        "rotation": 0.5
+    } for i in range(inserts)]
+    return dwg_json
+
+
+def explode_inserts(dwg_json: dict) -> dict:
+    """Replace every INSERT by transformed copies of its block's entities."""
+    entities = []
+    for insert in model_space_entities(dwg_json):
+        block = dwg_json["blocks"][insert["name"]]
+        m = insert_transform(insert, block.get("base_point", {}))
+        for entity in block["entities"]:
+            clone = copy.deepcopy(entity)
+            clone["handle"] = f"{insert['handle']}/{entity['handle']}"
+            for pt in clone.get("points", []) + [clone.get("insertion_point", {})]:
+                x, y, z = pt.get("x", 0.0), pt.get("y", 0.0), pt.get("z", 0.0)
+                pt.update(x=m[0] * x + m[1] * y + m[3], y=m[4] * x + m[5] * y + m[7], z=m[10] * z + m[11])
+            entities.append(clone)
+    return {"tables": dwg_json["tables"], "blocks": {"*Model_Space": {"entities": entities}}}
+
+
+def run_exploded(dwg_json: dict) -> int:
+    exploded = explode_inserts(dwg_json)
+    model = GeometryModel()
+    rules = [ForbiddenEntityRule(), model, GeometryRule(model, check_overlaps=False), TextEntityRule()]
+    return len(run_rules(exploded, rules))
+
+
+def run_memoized(dwg_json: dict) -> int:
+    return len(run_rules(dwg_json, [BlockRule()]))
+
+
+def bench_blocks(inserts: int, block_size: int, repeat: int) -> None:
+    dwg_json = build_block_drawing(inserts, block_size)
+    print(f"Block benchmark: {inserts} inserts of a {block_size}-entity block, best of {repeat}")
+
+    exploded_time, exploded_count = time_best(run_exploded, dwg_json, repeat)
+    memo_time, memo_count = time_best(run_memoized, dwg_json, repeat)
+    assert exploded_count == memo_count, "memoized block findings differ from exploded findings"
+
+    print(f"  exploded inserts: {exploded_time * 1000:9.1f} ms ({exploded_count} findings)")
+    print(f"  memoized blocks:  {memo_time * 1000:9.1f} ms ({memo_count} findings)")
+    print(f"  speedup:          {exploded_time / memo_time:9.2f}x")
+
+
+def bench_precheck(dwg_paths: list[Path], repeat: int) -> None:
+    print(f"Precheck benchmark: {len(dwg_paths)} files, best of {repeat}")
+    full = PlanCheckValidator()
+    staged = PlanCheckValidator(precheck=True)
+
+    for dwg_path in dwg_paths:
+        full_time, full_count = time_best(lambda p: len(full.validate(p).errors), dwg_path, repeat)
+        staged_result = staged.validate(dwg_path)
+        staged_time, _ = time_best(lambda p: len(staged.validate(p).errors), dwg_path, repeat)
+        stage = "stage 1 only" if staged_result.stats.get("precheck") == "failed" else "both stages"
+        print(f"  {dwg_path.name}: full {full_time * 1000:9.1f} ms ({full_count} errors), "
+              f"staged {staged_time * 1000:9.1f} ms ({stage})")
+
+
+def write_room_table(room_table, path: Path) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["AOID", "Raumname", "Fläche"])
+        for aoid in room_table:
+            row = room_table[aoid]
+            writer.writerow([aoid, row["name"], row["area"]])
+
+
+def scale_cases(spec: SyntheticSpec, workdir: Path) -> dict:
+    """Benchmarked callables for one drawing size, keyed by name."""
+    parser = SyntheticDWGParser(spec)
+    drawing = parser.drawing(workdir / "floor_0.dwg")
+    dwg_json, room_table = drawing.dwg_json, drawing.room_table
+    excel_path = workdir / "rooms.csv"
+    write_room_table(room_table, excel_path)
+    validator = PlanCheckValidator(use_mock_parser=True)
+    validator.parser = parser
+    return {
+        "validate_layers": lambda: validate_layers(dwg_json),
+        "validate_entity_types": lambda: validate_entity_types(dwg_json),
+        "validate_layer_entities": lambda: validate_layer_entities(dwg_json),
+        "validate_geometry": lambda: validate_geometry(dwg_json),
+        "validate_endpoint_gaps": lambda: validate_endpoint_gaps(dwg_json),
+        "validate_aoids": lambda: validate_aoids(dwg_json, room_table),
+        "validate_text_entities": lambda: validate_text_entities(dwg_json),
+        "PlanCheckValidator.validate": lambda: validator.validate(workdir / "floor_0.dwg", excel_path),
+    }, drawing.entity_count
+
+
+def measure(func, repeat: int) -> tuple[float, float]:
+    """Best-of-N wall time in ms and the tracemalloc peak in MiB of one extra run."""
+    best, _ = time_best(lambda _: func(), None, repeat)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best * 1000, peak / 1024 ** 2
+
+
+def bench_scale(sizes: list[int], error_rate: float, repeat: int, json_path: Optional[Path],
+                baseline_path: Optional[Path], tolerance: float) -> int:
+    print(f"Scale benchmark: best of {repeat}, error rate {error_rate:.0%}")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            spec = SyntheticSpec.for_entities(size, error_rate=error_rate, block_inserts=size // 100)
+            cases, entities = scale_cases(spec, Path(tmp))
+            print(f"  {entities} entities, {spec.rooms_per_floor} rooms")
+            for name, func in cases.items():
+                ms, mib = measure(func, repeat)
+                results.setdefault(name, {})[str(size)] = {"ms": round(ms, 3), "peak_mib": round(mib, 3)}
+                print(f"    {name:28s} {ms:10.1f} ms {mib:9.1f} MiB")
+
+    failed = 0
+    if len(sizes) > 1:
+        # Growth exponent k in time ~ n^k between the two largest sizes
+        small, large = str(sizes[-2]), str(sizes[-1])
+        ratio = math.log(sizes[-1] / sizes[-2])
+        print(f"  growth {small} -> {large} (time ~ n^k):")
+        for name, runs in results.items():
+            k = math.log(max(runs[large]["ms"], 1e-3) / max(runs[small]["ms"], 1e-3)) / ratio
+            flag = "  superlinear" if k > 1.3 else ""
+            print(f"    {name:28s} k = {k:5.2f}{flag}")
+
+    if baseline_path:
+        baseline = json.loads(baseline_path.read_text())
+        for name, runs in results.items():
+            for size, run in runs.items():
+                before = baseline.get(name, {}).get(size)
+                if before and run["ms"] > before["ms"] * (1 + tolerance) and run["ms"] - before["ms"] > 1.0:
+                    failed += 1
+                    print(f"  REGRESSION {name} at {size}: {before['ms']:.1f} -> {run['ms']:.1f} ms")
+        print(f"  {failed} regressions against {baseline_path} (tolerance {tolerance:.0%})")
+
+    if json_path:
+        json_path.write_text(json.dumps(results, indent=2))
+    return 1 if failed else 0
+
+
+def bench_reports(counts: list[int], repeat: int) -> None:
+    print(f"Report benchmark: best of {repeat}, written to {os.devnull}")
+    with open(os.devnull, "wb") as out:
+        def dict_dump(result):
+            out.write(json.dumps(build_report(result), indent=2, ensure_ascii=False).encode("utf-8"))
+            return out
+
+        def streamed(format):
+            def write(result):
+                with create_report_writer(format, out) as writer:
+                    writer.write(result)
+                return writer
+            return write
+
+        cases = {"dict + json.dumps": dict_dump}
+        cases.update((f"stream {format}", streamed(format)) for format in sorted(REPORT_FORMATS))
+        results = {}
+        for count in counts:
+            dwg_json = build_pathological_drawing(count)
+            result = PlanCheckValidator(use_mock_parser=True).validate_drawing(Path("pathological.dwg"), dwg_json)
+            del dwg_json
+            print(f"  {len(result.errors)} findings")
+            for name, func in cases.items():
+                ms, mib = measure(lambda: func(result), repeat)
+                size = getattr(func(result), "bytes_written", None)
+                results.setdefault(name, []).append(ms)
+                written = f" {size / 1024 ** 2:9.1f} MiB written" if size else ""
+                print(f"    {name:20s} {ms:10.1f} ms, peak {mib:9.2f} MiB{written}")
+
+    if len(counts) > 1:
+        ratio = math.log(counts[-1] / counts[-2])
+        print(f"  growth {counts[-2]} -> {counts[-1]} (time ~ n^k):")
+        for name, runs in results.items():
+            print(f"    {name:20s} k = {math.log(max(runs[-1], 1e-3) / max(runs[-2], 1e-3)) / ratio:5.2f}")
+
+
+def bench_tiles(sizes: list[int], error_rate: float, repeat: int) -> None:
+    print(f"Tile benchmark: best of {repeat}, error rate {error_rate:.0%}")
+    for size in sizes:
+        spec = SyntheticSpec.for_entities(size, error_rate=error_rate, block_inserts=size // 100)
+        drawing = generate_drawing(spec, 1)
+        result = PlanCheckValidator(use_mock_parser=True).validate_drawing(Path("synthetic.dwg"), drawing.dwg_json)
+        ms, mib = measure(lambda: OverlayTiles(drawing.dwg_json, result.errors, result.warnings), repeat)
+        tiles = OverlayTiles(drawing.dwg_json, result.errors, result.warnings)
+        print(f"  {drawing.entity_count} entities, {len(tiles.marker_x)} markers: "
+              f"index {ms:.1f} ms, peak {mib:.1f} MiB")
+
+        # The tile over the centre of the drawing, cold and from the cache
+        cx, cy = (tiles.bounds[0] + tiles.bounds[2]) / 2, (tiles.bounds[1] + tiles.bounds[3]) / 2
+        for z in range(tiles.max_level + 1):
+            edge = tiles.extent / tiles.tile_count(z)
+            tx, ty = int((cx - tiles.origin[0]) // edge), int((tiles.origin[1] - cy) // edge)
+            cold, _ = time_best(lambda _: tiles.render_tile(z, tx, ty), None, repeat)
+            svg = tiles.tile(z, tx, ty)
+            cached, _ = time_best(lambda _: tiles.tile(z, tx, ty), None, repeat)
+            print(f"    z{z:<2d} {tx:5d}/{ty:<5d} {cold * 1000:8.1f} ms cold, {cached * 1e6:6.1f} µs cached, "
+                  f"{len(svg) / 1024:8.1f} KiB")
+
+
+def bench_aoids(floors: list[int], rooms: int, repeat: int) -> None:
+    print(f"AOID index benchmark: {rooms} AOIDs per floor, best of {repeat}")
+    spec = SyntheticSpec(rooms_per_floor=rooms)
+
+    def aoid(floor: int, room: int) -> str:
+        # AOID floors wrap at 100, so every 100 floors are another building
+        return f"{2000 + floor // 100}{spec.aoid(floor, room)[len(spec.building):]}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = ProjectAoidIndex(Path(tmp) / "project.sqlite")
+        accepted = 0
+        for target in floors:
+            start = time.perf_counter()
+            for floor in range(accepted, target):
+                index.accept(f"floor_{floor:03d}.dwg", [(aoid(floor, room), None, None) for room in range(rooms)])
+            fill = time.perf_counter() - start
+            accepted = target
+
+            # A new floor with one AOID of floor 0, against everything accepted so far
+            entries = [(aoid(target, room), None, None) for room in range(rooms)]
+            entries[-1] = (aoid(0, 0), None, None)
+            check, conflicts = time_best(lambda aoids: index.conflicts("new.dwg", aoids), [e[0] for e in entries], repeat)
+            accept, _ = time_best(lambda e: index.accept("new.dwg", e[:-1]), entries, repeat)
+            print(f"  {target * rooms:9d} AOIDs in index (+{fill * 1000:8.1f} ms): "
+                  f"check {check * 1000:6.1f} ms, accept {accept * 1000:6.1f} ms, {len(conflicts)} conflict(s)")
+
+
+def bench_gaps(sizes: list[int], error_rate: float, repeat: int) -> None:
+    import numpy as np
+    print(f"Endpoint gap benchmark: best of {repeat}, wall gaps in {error_rate:.0%} of the rooms")
+    times = []
+    for size in sizes:
+        spec = SyntheticSpec.for_entities(size, lines_per_room=16, error_rate=error_rate, defect_kinds=("wall_gap",))
+        drawing = generate_drawing(spec)
+        xy = np.array([(point["x"], point["y"]) for entity in model_space_entities(drawing.dwg_json)
+                       if entity["type"] == "LINE" for point in (entity["start"], entity["end"])])
+
+        ms, mib = measure(lambda: validate_endpoint_gaps(drawing.dwg_json), repeat)
+        query, (i, _, _) = time_best(lambda points: near_pairs(points, GAP_TOLERANCE_MM), xy, repeat)
+        found = len(validate_endpoint_gaps(drawing.dwg_json))
+        times.append((len(xy), query))
+        print(f"  {drawing.entity_count:8d} entities, {len(xy):8d} endpoints: check {ms:8.1f} ms "
+              f"(peak {mib:6.1f} MiB), near_pairs {query * 1000:7.1f} ms for {len(i)} pairs, "
+              f"{found}/{drawing.defects.get('wall_gap', 0)} gaps found")
+
+    if len(times) > 1:
+        (n0, t0), (n1, t1) = times[-2:]
+        print(f"  near_pairs growth exponent: {math.log(max(t1, 1e-6) / max(t0, 1e-6)) / math.log(n1 / n0):.2f}")
+
+
+# Packages the prototype must only load when a check needs them
+LAZY_PACKAGES = ("numpy", "shapely", "openpyxl", "pyarrow", "yaml", "ijson", "msgpack", "orjson", "asyncio")
+
+# Run in a fresh interpreter: the validations in the loop's thread pool are
+# the first users of the lazily imported packages, all at the same time
+CONCURRENT_FIRST_USE = """
+import asyncio, json
+from pathlib import Path
+import plan_check_prototype as p
+
+async def main():
+    raw = json.dumps(p.MockDWGParser().parse_dwg_to_json(None)).encode()
+    loop = asyncio.get_running_loop()
+    return await asyncio.gather(*(loop.run_in_executor(None, p._validate_json_bytes, Path("mock.dwg"), raw, None)
+                                  for _ in range({threads})), return_exceptions=True)
+
+for result in asyncio.run(main()):
+    if isinstance(result, BaseException):
+        print(f"{{type(result).__name__}}: {{result}}")
+"""
+
+
+def import_times(module: str) -> dict:
+    """
+    Cumulative import time in µs and nesting depth per module, from one
+    fresh `python -X importtime` run (depth 0 is the module itself).
+    """
+    # Bytecode has to be written, or every run would time the compiler
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONDONTWRITEBYTECODE"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).resolve().parent,
+        env=env,
+        check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2].lstrip()
+        times[name.rstrip()] = (int(fields[1]), (len(fields[2]) - len(name) - 1) // 2)
+    return times
+
+
+def concurrent_first_use(module: str, threads: int = 8, timeout: float = 120) -> list[str]:
+    """Failures of validations that race on the first use of numpy and shapely, or ["hung"]."""
+    try:
+        result = subprocess.run(
+            [sys.executable, "-c", CONCURRENT_FIRST_USE.format(threads=threads).replace("plan_check_prototype", module)],
+            capture_output=True,
+            text=True,
+            cwd=Path(__file__).resolve().parent,
+            timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        return [f"hung for more than {timeout:.0f} s"]
+    failures = result.stdout.splitlines()
+    if result.returncode != 0:
+        failures.append(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else f"exit {result.returncode}")
+    return failures
+
+
+def bench_imports(repeat: int, budget_ms: float, top: int) -> int:
+    module = "plan_check_prototype"
+    import_times(module)  # Writes the bytecode cache, so only warm imports are timed
+    runs = [import_times(module) for _ in range(repeat)]
+    best = min(runs, key=lambda times: times[module][0])
+    total_ms = best[module][0] / 1000
+    print(f"Import benchmark: {module}, best of {repeat}")
+    print(f"  total:  {total_ms:9.1f} ms (budget {budget_ms:.0f} ms)")
+    children = sorted(((us, name) for name, (us, depth) in best.items() if depth == 1), reverse=True)
+    for us, name in children[:top]:
+        print(f"    {name:30s} {us / 1000:9.1f} ms")
+
+    eager = [name for name in LAZY_PACKAGES if name in best]
+    if eager:
+        print(f"  imported eagerly: {', '.join(eager)}")
+    threads = 8
+    failures = concurrent_first_use(module, threads)
+    print(f"  concurrent first use ({threads} threads): {len(failures)} failed")
+    for failure in failures[:top]:
+        print(f"    {failure}")
+    over = total_ms > budget_ms or bool(eager)
+    failed = over or bool(failures)
+    print("  over budget" if over else "  failed" if failed else "  within budget")
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="plan-check validation benchmarks")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement")
+    commands = parser.add_subparsers(dest="command")
+
+    dispatch = commands.add_parser("dispatch", help="single pass vs per-validator loops")
+    dispatch.add_argument("--rooms", type=int, default=500, help="room polygons in the drawing")
+    dispatch.add_argument("--filler", type=int, default=200_000, help="additional LINE entities")
+
+    findings = commands.add_parser("findings", help="memory and report time for huge finding lists")
+    findings.add_argument("--count", type=int, default=200_000, help="entities in the drawing")
+    findings.add_argument("--cap", type=int, default=1000, help="max findings kept per code")
+
+    blocks = commands.add_parser("blocks", help="memoized block validation vs exploded inserts")
+    blocks.add_argument("--inserts", type=int, default=10_000, help="INSERTs in model space")
+    blocks.add_argument("--block-size", type=int, default=200, help="entities in the block definition")
+
+    precheck = commands.add_parser("precheck", help="staged dwglayers precheck vs full parse")
+    precheck.add_argument("dwg", type=Path, nargs="+", help="DWG files to validate")
+
+    scale = commands.add_parser("scale", help="time and memory per validator at growing drawing sizes")
+    scale.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000],
+                       help="model space entities per drawing")
+    scale.add_argument("--error-rate", type=float, default=0.02, help="share of rooms with a defect")
+    scale.add_argument("--json", type=Path, default=None, help="write the results to this file")
+    scale.add_argument("--baseline", type=Path, default=None, help="results of an earlier run to compare with")
+    scale.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown against the baseline")
+
+    reports = commands.add_parser("reports", help="streamed report writers vs one report dict")
+    reports.add_argument("--counts", type=int, nargs="+", default=[20_000, 200_000],
+                         help="entities in the pathological drawings")
+
+    tiles = commands.add_parser("tiles", help="error overlay tiles: index build and render time per level")
+    tiles.add_argument("--sizes", type=int, nargs="+", default=[100_000], help="model space entities per drawing")
+    tiles.add_argument("--error-rate", type=float, default=0.2, help="share of rooms with a defect")
+
+    aoids = commands.add_parser("aoids", help="project AOID index: check time of a new floor as the index grows")
+    aoids.add_argument("--floors", type=int, nargs="+", default=[10, 100, 500], help="accepted floors in the index")
+    aoids.add_argument("--rooms", type=int, default=1000, help="AOIDs per floor")
+
+    gaps = commands.add_parser("gaps", help="endpoint gap check: grid query time at growing drawing sizes")
+    gaps.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                      help="model space entities per drawing")
+    gaps.add_argument("--error-rate", type=float, default=0.05, help="share of rooms with a wall gap")
+
+    imports = commands.add_parser("imports", help="import time of the prototype against a budget")
+    imports.add_argument("--budget-ms", type=float, default=250, help="allowed import time in ms")
+    imports.add_argument("--top", type=int, default=10, help="slowest imported modules to list")
+
+    args = parser.parse_args()
+    if args.command == "imports":
+        sys.exit(bench_imports(args.repeat, args.budget_ms, args.top))
+    if args.command == "scale":
+        sys.exit(bench_scale(args.sizes, args.error_rate, args.repeat, args.json, args.baseline, args.tolerance))
+    if args.command == "gaps":
+        bench_gaps(args.sizes, args.error_rate, args.repeat)
+    elif args.command == "aoids":
+        bench_aoids(args.floors, args.rooms, args.repeat)
+    elif args.command == "tiles":
+        bench_tiles(args.sizes, args.error_rate, args.repeat)
+    elif args.command == "reports":
+        bench_reports(args.counts, args.repeat)
+    elif args.command == "precheck":
+        bench_precheck(args.dwg, args.repeat)
+    elif args.command == "findings":
+        bench_findings(args.count, args.cap)
+    elif args.command == "blocks":
+        bench_blocks(args.inserts, args.block_size, args.repeat)
+    else:
+        bench_dispatch(getattr(args, "rooms", 500), getattr(args, "filler", 200_000), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
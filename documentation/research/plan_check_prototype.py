@@ -7,30 +7,129 @@ This demonstrates how the validation logic would work.
 In production, LibreDWG CLI outputs JSON which this code processes.
 """
 
+import argparse
+import csv
+import gc
+import hashlib
+import importlib.machinery
+import importlib.util
+import io
+import itertools
 import json
+import marshal
+import math
+import os
+import pickle
+import random
 import re
+import shutil
 import subprocess
+import sys
+import time
+import tracemalloc
+import zlib
+from array import array
+from collections.abc import Mapping, Sequence
+from contextlib import contextmanager, nullcontext
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
+from types import MappingProxyType
 from typing import Optional
 import tempfile
+import threading
 
-# Optional imports - would be installed in production
-try:
-    from shapely.geometry import Polygon, Point
-    from shapely.validation import explain_validity
-    SHAPELY_AVAILABLE = True
-except ImportError:
-    SHAPELY_AVAILABLE = False
-    print("Warning: shapely not installed, geometry validation disabled")
+_lazy_lock = threading.RLock()
+
+
+class _LazyModule:
+    """
+    Placeholder for an optional package that is imported on first attribute
+    access. The import runs to completion under a module-level lock before
+    any attribute is handed out, so threads racing on first use all get the
+    finished module; the global named alias is then rebound to the module
+    itself, so later lookups skip the placeholder.
+    """
+
+    def __init__(self, name: str, alias: str):
+        self._name = name
+        self._alias = alias
+        self._module = None
+
+    def __getattr__(self, attr: str):
+        module = self._module
+        if module is None:
+            with _lazy_lock:
+                module = self._module
+                if module is None:
+                    module = importlib.import_module(self._name)
+                    self._module = module
+                    globals()[self._alias] = module
+        return getattr(module, attr)
+
+
+def _lazy_import(name: str, alias: Optional[str] = None):
+    """
+    Module for an optional dependency that is only imported on first
+    attribute access, or None if it is not installed. Keeps heavy packages
+    out of the import time of CLI calls and batch workers that never touch
+    geometry or room tables. alias is the global the module is bound to.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    if importlib.util.find_spec(name) is None:
+        return None
+    return _LazyModule(name, alias or name)
+
+
+def _installed(name: str) -> bool:
+    return name in sys.modules or importlib.util.find_spec(name) is not None
+
+
+# Optional imports - would be installed in production. numpy, shapely,
+# yaml and the codecs (ijson, msgpack, orjson) load lazily; openpyxl and
+# pyarrow are imported where they are used. What a run had to skip is
+# listed in stats["missing_capabilities"].
+np = _lazy_import("numpy", "np")
+NUMPY_AVAILABLE = np is not None
+
+shapely = _lazy_import("shapely")
+SHAPELY_AVAILABLE = shapely is not None
+
+ijson = _lazy_import("ijson")
+IJSON_AVAILABLE = ijson is not None
+
+msgpack = _lazy_import("msgpack")
+MSGPACK_AVAILABLE = msgpack is not None
+
+orjson = _lazy_import("orjson")
+ORJSON_AVAILABLE = orjson is not None
+
+yaml = _lazy_import("yaml")
+YAML_AVAILABLE = yaml is not None
+
+OPENPYXL_AVAILABLE = _installed("openpyxl")
+PYARROW_AVAILABLE = _installed("pyarrow")
+
+# Checks skipped when an optional package is missing
+OPTIONAL_CAPABILITIES = {
+    "numpy": "Geometrie-, AOID- und Flächenprüfung",
+    "shapely": "Überlappungs-, AOID-Lage- und Flächenprüfung",
+    "openpyxl": "XLSX-Raumtabellen",
+    "pyarrow": "Parquet-Raumtabellen",
+    "ijson": "Streaming-Parser",
+}
+
+# Only the async service needs the event loop, and asyncio is the largest
+# stdlib import left
+asyncio = _lazy_import("asyncio")
 
 try:
-    import openpyxl
-    OPENPYXL_AVAILABLE = True
+    import resource
+    RESOURCE_AVAILABLE = True
 except ImportError:
-    OPENPYXL_AVAILABLE = False
-    print("Warning: openpyxl not installed, Excel parsing disabled")
+    RESOURCE_AVAILABLE = False
 
 
 # =============================================================================
@@ -43,14 +142,14 @@ class Severity(Enum):
     INFO = "INFO"
 
 
-@dataclass
+@dataclass(slots=True)
 class Location:
     x: float
     y: float
     z: float = 0.0
 
 
-@dataclass
+@dataclass(slots=True)
 class ValidationError:
     code: str
     message: str
@@ -64,9 +163,207 @@ class ValidationError:
 class ValidationResult:
     file_path: str
     valid: bool
-    errors: list[ValidationError] = field(default_factory=list)
-    warnings: list[ValidationError] = field(default_factory=list)
+    errors: Sequence[ValidationError] = field(default_factory=list)
+    warnings: Sequence[ValidationError] = field(default_factory=list)
     stats: dict = field(default_factory=dict)
+    rooms: list = field(default_factory=list)
+
+
+class FindingStore:
+    """
+    Compact, columnar storage for the findings of one validation.
+    
+    Codes, severities and layers are interned to small integers, coordinates
+    go into float arrays (NaN for findings without a location), and only
+    handles and messages stay as Python strings. ValidationError objects are
+    rebuilt on access through FindingView, so a pathological drawing with
+    hundreds of thousands of findings costs a few columns instead of one
+    object graph per finding.
+    
+    Findings are grouped by segment (one per rule, in rule order) so the
+    report keeps the per-validator ordering even when rules emit
+    interleaved. With max_per_code set, findings beyond the cap are only
+    counted in suppressed. With a budget, every finding is counted against
+    it, suppressed ones included; see ValidationBudget.
+    """
+    
+    SEVERITIES = list(Severity)
+    SEVERITY_IDS = {severity: i for i, severity in enumerate(SEVERITIES)}
+    
+    def __init__(self, max_per_code: Optional[int] = None, budget: Optional["ValidationBudget"] = None):
+        self.max_per_code = max_per_code
+        self.budget = budget
+        self.code_names = []
+        self.layer_names = [None]
+        self._code_ids = {}
+        self._layer_ids = {None: 0}
+        self.codes = array("H")
+        self.severities = array("B")
+        self.layers = array("H")
+        self.segments = array("H")
+        self.x = array("d")
+        self.y = array("d")
+        self.z = array("d")
+        self.handles = []
+        self.messages = []
+        self.code_counts = {}
+        self.suppressed = {}
+        self._segment_count = 0
+        self._views = None
+    
+    def __len__(self) -> int:
+        return len(self.codes)
+    
+    def sink(self) -> "FindingSink":
+        """A list-like append target for one new segment."""
+        self._segment_count += 1
+        return FindingSink(self, self._segment_count - 1)
+    
+    def extend(self, findings) -> None:
+        """Add findings as a new segment."""
+        sink = self.sink()
+        for finding in findings:
+            sink.append(finding)
+    
+    def add(self, finding: ValidationError, segment: int) -> None:
+        self._add(finding, segment)
+        if self.budget is not None:
+            self.budget.count(finding)
+    
+    def _add(self, finding: ValidationError, segment: int) -> None:
+        code = finding.code
+        count = self.code_counts.get(code, 0)
+        if self.max_per_code is not None and count >= self.max_per_code:
+            self.suppressed[code] = self.suppressed.get(code, 0) + 1
+            return
+        self.code_counts[code] = count + 1
+        
+        code_id = self._code_ids.get(code)
+        if code_id is None:
+            code_id = self._code_ids[code] = len(self.code_names)
+            self.code_names.append(code)
+        layer_id = self._layer_ids.get(finding.layer)
+        if layer_id is None:
+            layer_id = self._layer_ids[finding.layer] = len(self.layer_names)
+            self.layer_names.append(finding.layer)
+        
+        self.codes.append(code_id)
+        self.severities.append(self.SEVERITY_IDS[finding.severity])
+        self.layers.append(layer_id)
+        self.segments.append(segment)
+        loc = finding.location
+        if loc is None:
+            self.x.append(math.nan)
+            self.y.append(math.nan)
+            self.z.append(math.nan)
+        else:
+            self.x.append(loc.x)
+            self.y.append(loc.y)
+            self.z.append(loc.z)
+        self.handles.append(finding.entity_handle)
+        self.messages.append(finding.message)
+        self._views = None
+    
+    def get(self, row: int) -> ValidationError:
+        x = self.x[row]
+        return ValidationError(
+            code=self.code_names[self.codes[row]],
+            message=self.messages[row],
+            severity=self.SEVERITIES[self.severities[row]],
+            location=None if x != x else Location(x=x, y=self.y[row], z=self.z[row]),
+            entity_handle=self.handles[row],
+            layer=self.layer_names[self.layers[row]]
+        )
+    
+    def _build_views(self) -> None:
+        if self._views is None:
+            order = sorted(range(len(self.codes)), key=self.segments.__getitem__)
+            error = self.SEVERITY_IDS[Severity.ERROR]
+            warning = self.SEVERITY_IDS[Severity.WARNING]
+            severities = self.severities
+            self._views = (
+                FindingView(self, array("I", (row for row in order if severities[row] == error))),
+                FindingView(self, array("I", (row for row in order if severities[row] == warning)))
+            )
+    
+    def errors(self) -> "FindingView":
+        self._build_views()
+        return self._views[0]
+    
+    def warnings(self) -> "FindingView":
+        self._build_views()
+        return self._views[1]
+
+
+class FindingSink:
+    """Append target handed to one rule; forwards into its FindingStore segment."""
+    
+    __slots__ = ("store", "segment")
+    
+    def __init__(self, store: FindingStore, segment: int):
+        self.store = store
+        self.segment = segment
+    
+    def append(self, finding: ValidationError) -> None:
+        self.store.add(finding, self.segment)
+    
+    def extend(self, findings) -> None:
+        for finding in findings:
+            self.store.add(finding, self.segment)
+
+
+class BudgetExhausted(Exception):
+    """Raised out of a validation run once its ValidationBudget is used up."""
+
+
+class ValidationBudget:
+    """
+    Error and time limits of an early-exit validation.
+    
+    count() is fed every finding and raises BudgetExhausted once max_errors
+    ERROR findings were seen; check_time() raises once the deadline has
+    passed. stopped names the limit that ended the run ("errors", "time").
+    """
+    
+    def __init__(self, max_errors: Optional[int] = None, seconds: Optional[float] = None):
+        self.max_errors = max_errors
+        self.deadline = time.perf_counter() + seconds if seconds is not None else None
+        self.errors = 0
+        self.stopped = None
+    
+    def count(self, finding: ValidationError) -> None:
+        if finding.severity is Severity.ERROR:
+            self.errors += 1
+            if self.max_errors is not None and self.errors >= self.max_errors:
+                self.stopped = "errors"
+                raise BudgetExhausted(self.stopped)
+        self.check_time()
+    
+    def check_time(self) -> None:
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            self.stopped = "time"
+            raise BudgetExhausted(self.stopped)
+
+
+class FindingView(Sequence):
+    """Read-only sequence of ValidationErrors over selected FindingStore rows."""
+    
+    def __init__(self, store: FindingStore, rows: array):
+        self.store = store
+        self.rows = rows
+    
+    def __len__(self) -> int:
+        return len(self.rows)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.store.get(row) for row in self.rows[index]]
+        return self.store.get(self.rows[index])
+    
+    def __iter__(self):
+        get = self.store.get
+        for row in self.rows:
+            yield get(row)
 
 
 # =============================================================================
@@ -100,22 +397,320 @@ FORBIDDEN_ENTITY_TYPES = {"SPLINE", "ELLIPSE", "MULTILINE", "OLE2FRAME", "OLEFRA
 # AOID format pattern: e.g., 2011.DM.04.045
 AOID_PATTERN = re.compile(r"^\d{4}\.[A-Z]{2}\.\d{2}\.\d{3}$")
 
+# Layers whose polylines must be closed polygons
+POLYGON_LAYERS = {"R_RAUMPOLYGON", "R_RAUMPOLYGON-ABZUG", "R_GESCHOSSPOLYGON"}
+
 # Layers allowed to contain text entities
 TEXT_ALLOWED_LAYERS = {"V_PLANLAYOUT", "V_ACHSEN", "V_TEXT", "R_AOID"}
 
 # Minimum room area in m²
 MIN_ROOM_AREA_M2 = 0.25
 
+# Allowed difference between DWG net room area and room table area:
+# the larger of an absolute tolerance in m² and a percentage of the table area
+AREA_TOLERANCE_M2 = 0.1
+AREA_TOLERANCE_PCT = 1.0
+
+# Endpoint gaps: LINE and open LWPOLYLINE endpoints on these layers that are
+# closer than GAP_TOLERANCE_MM but further apart than GAP_COINCIDENT_MM
+GAP_LAYERS = {"A_ARCHITEKTUR"} | POLYGON_LAYERS
+GAP_TOLERANCE_MM = 5.0
+GAP_COINCIDENT_MM = 0.01
+
+# Layer findings that end a staged validation after the dwglayers precheck
+PRECHECK_FATAL_CODES = {"LAYER_MISSING"}
+
+
+# =============================================================================
+# Rule Sets
+# =============================================================================
+
+# Rule set equivalent to the constants above, in the bbl_rules.yaml layout
+DEFAULT_RULE_SET = {
+    "version": "BBL CAD-Richtlinie v1.0",
+    "layers": {
+        "required": [
+            {"name": name, "color": spec["color"], "allowed_entities": sorted(spec["allowed_entities"])}
+            for name, spec in BBL_REQUIRED_LAYERS.items()
+        ],
+        "system": sorted(SYSTEM_LAYERS),
+    },
+    "geometry": {
+        "room_polygons": {
+            "min_area_m2": MIN_ROOM_AREA_M2,
+            "area_tolerance_m2": AREA_TOLERANCE_M2,
+            "area_tolerance_pct": AREA_TOLERANCE_PCT,
+        },
+        "polygon_layers": sorted(POLYGON_LAYERS),
+        "endpoint_gaps": {
+            "layers": sorted(GAP_LAYERS),
+            "tolerance_mm": GAP_TOLERANCE_MM,
+            "coincident_mm": GAP_COINCIDENT_MM,
+        },
+        "forbidden_entity_types": sorted(FORBIDDEN_ENTITY_TYPES),
+    },
+    "text": {
+        "allowed_font": "Arial",
+        "color": "BYLAYER",
+        "allowed_layers": sorted(TEXT_ALLOWED_LAYERS),
+    },
+    "aoid": {"pattern": AOID_PATTERN.pattern},
+}
+
+
+@dataclass(frozen=True, eq=False)
+class RulePlan:
+    """
+    Immutable, precompiled form of a rule set.
+
+    Layer names and entity types are interned to small integer IDs: required
+    layers take IDs 0..len(required_layers) - 1 in rule set order, system
+    layers follow. allowed_entities[layer_id] is a bitmask over entity type
+    IDs, so "may this type sit on this layer" is one lookup and one AND.
+    layer_type_matrix holds the same answer as a flat row-major byte matrix
+    of len(layer_names) rows by len(entity_types) + 1 columns, the last
+    column standing for every type no layer allows; system layer rows allow
+    everything. Plans are shared between validators and threads and never change after
+    compile_rule_set; pass rule set paths, not plans, to worker processes.
+    """
+    version: str
+    digest: str
+    layer_names: tuple
+    layer_ids: MappingProxyType
+    layer_colors: tuple
+    required_layers: tuple
+    system_layers: frozenset
+    known_layers: frozenset
+    entity_types: tuple
+    entity_type_ids: MappingProxyType
+    allowed_entities: tuple
+    layer_type_matrix: bytes
+    forbidden_entity_types: frozenset
+    polygon_layers: frozenset
+    text_allowed_layers: frozenset
+    text_font: str
+    text_color: int
+    aoid_pattern: re.Pattern
+    min_room_area_m2: float
+    area_tolerance_m2: float
+    area_tolerance_pct: float
+    gap_layers: frozenset
+    gap_tolerance_mm: float
+    gap_coincident_mm: float
+
+    def layer_id(self, name: str) -> int:
+        """Interned ID of a layer, -1 for layers the rule set does not know."""
+        return self.layer_ids.get(name, -1)
+
+    def type_id(self, etype: str) -> int:
+        """Interned ID of an entity type, -1 for types no layer allows."""
+        return self.entity_type_ids.get(etype, -1)
+
+    def matrix_index(self, layer: str, etype: str) -> int:
+        """Cell of (layer, etype) in layer_type_matrix, -1 for unknown layers."""
+        layer_id = self.layer_ids.get(layer, -1)
+        if layer_id < 0:
+            return -1
+        columns = len(self.entity_types) + 1
+        return layer_id * columns + self.entity_type_ids.get(etype, columns - 1)
+
+    def allows(self, layer: str, etype: str) -> bool:
+        """True if the rule set allows entity type etype on a required layer."""
+        layer_id = self.layer_ids.get(layer, -1)
+        type_id = self.entity_type_ids.get(etype, -1)
+        if layer_id < 0 or layer_id >= len(self.allowed_entities) or type_id < 0:
+            return False
+        return bool(self.allowed_entities[layer_id] >> type_id & 1)
+
+
+_NAMED_COLORS = {"BYLAYER": 256, "BYBLOCK": 0}
+
+
+def _color_index(value) -> int:
+    """ACI color number; BYLAYER and BYBLOCK by name."""
+    if isinstance(value, str) and value.upper() in _NAMED_COLORS:
+        return _NAMED_COLORS[value.upper()]
+    return int(value)
+
+
+def compile_rule_set(spec: dict, digest: str = "") -> RulePlan:
+    """
+    Compile a rule set (the bbl_rules.yaml layout, as a dict) into a RulePlan.
+
+    Sections and keys that are left out fall back to DEFAULT_RULE_SET.
+    Raises ValueError for a malformed rule set.
+    """
+    def section(*keys):
+        value, default = spec, DEFAULT_RULE_SET
+        for key in keys:
+            value = value.get(key, {}) if isinstance(value, dict) else {}
+            default = default.get(key, {})
+        return value if value not in ({}, None) else default
+
+    required = section("layers", "required")
+    if not isinstance(required, list):
+        raise ValueError("layers.required must be a list")
+    try:
+        layer_names = [sys.intern(str(layer["name"])) for layer in required]
+        layer_colors = tuple(_color_index(layer["color"]) for layer in required)
+        layer_types = [{str(etype).upper() for etype in layer.get("allowed_entities", ())} for layer in required]
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"invalid layers.required entry: {e}") from None
+    if len(set(layer_names)) != len(layer_names):
+        raise ValueError("duplicate layer in layers.required")
+
+    system = [sys.intern(str(name)) for name in section("layers", "system") if name not in layer_names]
+    all_layers = tuple(layer_names + sorted(set(system)))
+
+    entity_type_ids = {sys.intern(etype): i for i, etype in enumerate(sorted(set().union(*layer_types)))}
+    allowed_entities = tuple(sum(1 << entity_type_ids[etype] for etype in types) for types in layer_types)
+
+    columns = len(entity_type_ids) + 1
+    matrix = bytearray(len(all_layers) * columns)
+    for layer_id, mask in enumerate(allowed_entities):
+        for type_id in range(columns - 1):
+            matrix[layer_id * columns + type_id] = mask >> type_id & 1
+    matrix[len(allowed_entities) * columns:] = b"\x01" * ((len(all_layers) - len(allowed_entities)) * columns)
+
+    pattern = section("aoid", "pattern")
+    try:
+        aoid_pattern = re.compile(pattern)
+    except re.error as e:
+        raise ValueError(f"invalid aoid.pattern {pattern!r}: {e}") from None
+
+    return RulePlan(
+        version=str(spec.get("version", "")) or digest[:12],
+        digest=digest,
+        layer_names=all_layers,
+        layer_ids=MappingProxyType({name: i for i, name in enumerate(all_layers)}),
+        layer_colors=layer_colors,
+        required_layers=tuple(layer_names),
+        system_layers=frozenset(system),
+        known_layers=frozenset(all_layers),
+        entity_types=tuple(entity_type_ids),
+        entity_type_ids=MappingProxyType(entity_type_ids),
+        allowed_entities=allowed_entities,
+        layer_type_matrix=bytes(matrix),
+        forbidden_entity_types=frozenset(str(t).upper() for t in section("geometry", "forbidden_entity_types")),
+        polygon_layers=frozenset(section("geometry", "polygon_layers")),
+        text_allowed_layers=frozenset(section("text", "allowed_layers")),
+        text_font=str(section("text", "allowed_font")),
+        text_color=_color_index(section("text", "color")),
+        aoid_pattern=aoid_pattern,
+        min_room_area_m2=float(section("geometry", "room_polygons", "min_area_m2")),
+        area_tolerance_m2=float(section("geometry", "room_polygons", "area_tolerance_m2")),
+        area_tolerance_pct=float(section("geometry", "room_polygons", "area_tolerance_pct")),
+        gap_layers=frozenset(section("geometry", "endpoint_gaps", "layers")),
+        gap_tolerance_mm=float(section("geometry", "endpoint_gaps", "tolerance_mm")),
+        gap_coincident_mm=float(section("geometry", "endpoint_gaps", "coincident_mm")),
+    )
+
+
+DEFAULT_RULE_PLAN = compile_rule_set(DEFAULT_RULE_SET)
+
+# Compiled plans by content hash, and content hashes by (path, mtime, size)
+_rule_plans: dict[str, RulePlan] = {}
+_rule_files: dict[tuple, str] = {}
+_rule_lock = threading.Lock()
+
+
+def load_rule_plan(path: Path) -> RulePlan:
+    """
+    Load and compile a YAML or JSON rule set file.
+
+    Compiled plans are cached by the SHA-256 of the file content, so any
+    number of rule set versions can be used side by side and a rule set is
+    only compiled once per process. An unchanged file (same mtime and size)
+    is not even re-read.
+    """
+    path = Path(path).resolve()
+    st = path.stat()
+    file_key = (str(path), st.st_mtime_ns, st.st_size)
+    with _rule_lock:
+        digest = _rule_files.get(file_key)
+        if digest is not None:
+            return _rule_plans[digest]
+
+    data = path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    with _rule_lock:
+        plan = _rule_plans.get(digest)
+    if plan is None:
+        if path.suffix.lower() in (".yaml", ".yml"):
+            if not YAML_AVAILABLE:
+                raise RuntimeError(f"PyYAML not installed, cannot read {path.name}")
+            spec = yaml.safe_load(data)
+        else:
+            spec = json.loads(data)
+        if not isinstance(spec, dict):
+            raise ValueError(f"{path.name}: rule set must be a mapping")
+        plan = compile_rule_set(spec, digest)
+
+    with _rule_lock:
+        plan = _rule_plans.setdefault(digest, plan)
+        _rule_files[file_key] = digest
+    return plan
+
+
+def resolve_rule_plan(rules) -> RulePlan:
+    """A RulePlan as is, a rule set path loaded via load_rule_plan, or the default plan for None."""
+    if rules is None:
+        return DEFAULT_RULE_PLAN
+    if isinstance(rules, RulePlan):
+        return rules
+    return load_rule_plan(rules)
+
 
 # =============================================================================
 # LibreDWG Parser Wrapper
 # =============================================================================
 
+# Tables kept resident when streaming; everything else is skipped or streamed
+STREAMED_TABLES = ("LAYER", "STYLE")
+
+MODEL_SPACE_PREFIX = "blocks.*Model_Space.entities"
+
+
+def _build_json_value(events, event: str, value):
+    """Consume ijson events for one value starting at (event, value) and return it."""
+    builder = ijson.ObjectBuilder()
+    builder.event(event, value)
+    depth = 1 if event in ("start_map", "start_array") else 0
+    while depth:
+        _, event, value = next(events)
+        builder.event(event, value)
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+    return builder.value
+
+
+class StreamParseError(RuntimeError):
+    """dwgread failed while the model space of a streamed parse was being read."""
+
+
 class LibreDWGParser:
     """Wrapper around LibreDWG CLI tools."""
     
-    def __init__(self, dwgread_path: str = "dwgread"):
+    def __init__(self, dwgread_path: str = "dwgread", timeout: float = 60,
+                 dwglayers_path: str = "dwglayers"):
         self.dwgread_path = dwgread_path
+        self.dwglayers_path = dwglayers_path
+        self.timeout = timeout
+        self._version = None
+    
+    def version(self) -> str:
+        """dwgread version string, part of the parse cache key."""
+        if self._version is None:
+            result = subprocess.run(
+                [self.dwgread_path, "--version"],
+                capture_output=True,
+                text=True,
+                timeout=10
+            )
+            self._version = result.stdout.strip() or result.stderr.strip()
+        return self._version
     
     def parse_dwg_to_json(self, dwg_path: Path) -> dict:
         """
@@ -132,7 +727,7 @@ class LibreDWGParser:
                 [self.dwgread_path, "-O", "JSON", str(dwg_path), "-o", json_path],
                 capture_output=True,
                 text=True,
-                timeout=60
+                timeout=self.timeout
             )
             
             if result.returncode != 0:
@@ -143,6 +738,105 @@ class LibreDWGParser:
         finally:
             Path(json_path).unlink(missing_ok=True)
     
+    def stream_dwg_to_json(self, dwg_path: Path) -> dict:
+        """
+        Convert DWG to JSON incrementally, reading dwgread output from a pipe.
+        
+        Returns a drawing dict like parse_dwg_to_json, but only the header,
+        the small tables (LAYER, STYLE) and the other block definitions (for
+        INSERT expansion) are resident: model space entities is a one-shot
+        iterator that builds each entity as it arrives. Block definitions
+        that follow model space in the output are added to the blocks dict
+        once the iterator is exhausted. Objects are skipped without being
+        materialized.
+        
+        In production, runs:
+            dwgread -O JSON input.dwg
+        """
+        if not IJSON_AVAILABLE:
+            raise RuntimeError("ijson not installed, streaming parse unavailable")
+        
+        stderr = tempfile.TemporaryFile()
+        proc = subprocess.Popen(
+            [self.dwgread_path, "-O", "JSON", str(dwg_path)],
+            stdout=subprocess.PIPE,
+            stderr=stderr
+        )
+        timed_out = threading.Event()
+        
+        def kill():
+            timed_out.set()
+            proc.kill()
+        
+        timer = threading.Timer(self.timeout, kill)
+        timer.start()
+        events = ijson.parse(proc.stdout, use_float=True)
+        
+        def close():
+            timer.cancel()
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+            proc.stdout.close()
+            stderr.seek(0)
+            message = stderr.read().decode(errors="replace")
+            stderr.close()
+            return message
+        
+        def failure(detail) -> str:
+            # A killed dwgread leaves nothing useful on stderr
+            if timed_out.is_set():
+                return f"{Path(self.dwgread_path).name} timed out after {self.timeout} s"
+            return f"dwgread failed: {detail}"
+        
+        def read_block(name: str) -> None:
+            _, event, value = next(events)
+            blocks[name] = _build_json_value(events, event, value)
+        
+        # Read up to the start of the model space entity array
+        header = {}
+        tables = {name: [] for name in STREAMED_TABLES}
+        table_prefixes = {f"tables.{name}.item": name for name in STREAMED_TABLES}
+        blocks = {}
+        try:
+            for prefix, event, value in events:
+                if prefix == "header" and event == "start_map":
+                    header = _build_json_value(events, event, value)
+                elif prefix in table_prefixes and event == "start_map":
+                    tables[table_prefixes[prefix]].append(_build_json_value(events, event, value))
+                elif prefix == "blocks" and event == "map_key" and value != "*Model_Space":
+                    read_block(value)
+                elif prefix == MODEL_SPACE_PREFIX and event == "start_array":
+                    break
+        except Exception:
+            raise RuntimeError(failure(close()))
+        
+        def entities():
+            failed = None
+            try:
+                for prefix, event, value in events:
+                    if prefix == MODEL_SPACE_PREFIX + ".item" and event == "start_map":
+                        yield _build_json_value(events, event, value)
+                    elif prefix == MODEL_SPACE_PREFIX and event == "end_array":
+                        break
+                for prefix, event, value in events:
+                    if prefix == "blocks" and event == "map_key":
+                        read_block(value)
+            except ijson.JSONError as e:
+                failed = e
+            finally:
+                message = close()
+            if failed is not None or proc.returncode != 0:
+                raise StreamParseError(failure(message or failed))
+        
+        blocks["*Model_Space"] = {"entities": entities()}
+        return {
+            "header": header,
+            "tables": tables,
+            "blocks": blocks,
+            "objects": []
+        }
+    
     def get_layers(self, dwg_path: Path) -> list[str]:
         """
         Get layer list using dwglayers command.
@@ -151,7 +845,7 @@ class LibreDWGParser:
             dwglayers input.dwg
         """
         result = subprocess.run(
-            ["dwglayers", str(dwg_path)],
+            [self.dwglayers_path, str(dwg_path)],
             capture_output=True,
             text=True,
             timeout=30
@@ -163,6 +857,286 @@ class LibreDWGParser:
         return result.stdout.strip().split("\n")
 
 
+# =============================================================================
+# LibreDWG Library Backend
+# =============================================================================
+
+# dwg_read_file() results at or above this are fatal (DWG_ERR_CRITICAL)
+DWG_ERR_CRITICAL = 128
+
+# C side of the library backend, compiled by cffi against the dwg.h
+# installed with libredwg: the compiler lays out Dwg_Data and Bit_Chain, so
+# a header that lacks a field fails the build instead of corrupting memory
+LIBREDWG_CDEF = """
+int plan_check_read_json(const char *path, int critical, int *read_error, char **buffer, size_t *size);
+void free(void *);
+"""
+
+LIBREDWG_SOURCE = r"""
+#ifndef _GNU_SOURCE
+#define _GNU_SOURCE
+#endif
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <dwg.h>
+
+/* Exported by libredwg, but only declared in its internal out_json.h */
+extern int dwg_write_json (Bit_Chain *dat, Dwg_Data *dwg);
+
+/* dwgread -O JSON into an open_memstream() buffer; returns the write error */
+static int
+plan_check_read_json (const char *path, int critical, int *read_error, char **buffer, size_t *size)
+{
+  Dwg_Data dwg;
+  Bit_Chain dat;
+  int error;
+
+  *buffer = NULL;
+  *size = 0;
+  memset (&dwg, 0, sizeof (dwg));
+  *read_error = dwg_read_file (path, &dwg);
+  if (*read_error >= critical)
+    {
+      dwg_free (&dwg);
+      return 0;
+    }
+  memset (&dat, 0, sizeof (dat));
+  dat.version = dwg.header.version;
+  dat.from_version = dwg.header.from_version;
+  dat.codepage = dwg.header.codepage;
+  dat.fh = open_memstream (buffer, size);
+  if (dat.fh == NULL)
+    {
+      dwg_free (&dwg);
+      return -1;
+    }
+  error = dwg_write_json (&dat, &dwg);
+  fclose (dat.fh);
+  dwg_free (&dwg);
+  return error;
+}
+"""
+
+
+def default_build_dir() -> Path:
+    """Where compiled library bindings are kept: $XDG_CACHE_HOME/plan-check."""
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "plan-check"
+
+
+def libredwg_version(library_path: str, version: Optional[str] = None) -> str:
+    """
+    Release of the libredwg build at library_path, part of the parse cache
+    key. The library has no runtime version call, so unless version is
+    given the dwgread of the same build is asked: the one installed next to
+    it (prefix/bin for prefix/lib), or for a bare soname the one on PATH.
+    """
+    if version is not None:
+        return version
+    path = Path(library_path)
+    if path.is_absolute():
+        dwgread = path.resolve().parent.parent / "bin" / "dwgread"
+    else:
+        dwgread = Path(shutil.which("dwgread") or "dwgread")
+    if not dwgread.exists():
+        return "unknown"
+    result = subprocess.run([str(dwgread), "--version"], capture_output=True, text=True, timeout=10)
+    return result.stdout.strip() or result.stderr.strip() or "unknown"
+
+
+def build_libredwg_binding(library_path: str, version: str, build_dir: Optional[Path] = None) -> Path:
+    """
+    Compile the cffi extension of the library backend against the headers
+    installed with the library at library_path (prefix/include for
+    prefix/lib, the compiler's search path for a bare soname) and return
+    its path. Builds are kept in build_dir per library file, release and
+    source, so only the first call after an upgrade compiles. Raises
+    RuntimeError if cffi or a C compiler is missing or the headers do not
+    match what the binding uses.
+    """
+    try:
+        import cffi
+    except ImportError:
+        raise RuntimeError("cffi not installed, use the dwgread backend") from None
+    
+    options = {"libraries": ["redwg"]}
+    path = Path(library_path)
+    identity = [library_path, version, LIBREDWG_CDEF, LIBREDWG_SOURCE]
+    if path.is_absolute():
+        lib_dir = path.resolve().parent
+        options.update(include_dirs=[str(lib_dir.parent / "include")], library_dirs=[str(lib_dir)],
+                       runtime_library_dirs=[str(lib_dir)])
+        stat = path.stat()
+        identity += [stat.st_size, stat.st_mtime_ns]
+    name = "_plan_check_libredwg_" + hashlib.sha256(repr(identity).encode()).hexdigest()[:16]
+    build_dir = Path(build_dir or default_build_dir())
+    target = build_dir / (name + importlib.machinery.EXTENSION_SUFFIXES[0])
+    if target.exists():
+        return target
+    
+    build_dir.mkdir(parents=True, exist_ok=True)
+    ffi = cffi.FFI()
+    ffi.cdef(LIBREDWG_CDEF)
+    ffi.set_source(name, LIBREDWG_SOURCE, **options)
+    # Build in a private directory and rename, so workers starting at the
+    # same time never load a half-written module
+    with tempfile.TemporaryDirectory(dir=build_dir) as tmp:
+        try:
+            built = ffi.compile(tmpdir=tmp)
+        except Exception as e:
+            raise RuntimeError(f"cannot build the libredwg binding against the installed headers ({e}); "
+                               f"use the dwgread backend") from e
+        os.replace(built, target)
+    return target
+
+
+class LibreDWGLibrary:
+    """
+    cffi binding to libredwg: reads a DWG with dwg_read_file() and writes
+    its JSON with dwg_write_json() into an open_memstream() buffer, the same
+    two calls dwgread makes, without a process or a temp file. binding is
+    the extension built by build_libredwg_binding.
+    """
+
+    def __init__(self, binding: Path):
+        name = Path(binding).name.split(".")[0]
+        loader = importlib.machinery.ExtensionFileLoader(name, str(binding))
+        spec = importlib.util.spec_from_file_location(name, binding, loader=loader)
+        module = importlib.util.module_from_spec(spec)
+        loader.exec_module(module)
+        self.ffi = module.ffi
+        self.lib = module.lib
+
+    def read_json_bytes(self, dwg_path: Path) -> bytes:
+        """JSON of the drawing, as dwgread -O JSON would print it."""
+        ffi = self.ffi
+        read_error = ffi.new("int *")
+        buffer = ffi.new("char **")
+        size = ffi.new("size_t *")
+        error = self.lib.plan_check_read_json(os.fsencode(dwg_path), DWG_ERR_CRITICAL, read_error, buffer, size)
+        try:
+            raw = ffi.unpack(buffer[0], size[0]) if buffer[0] != ffi.NULL else b""
+        finally:
+            self.lib.free(buffer[0])
+        if read_error[0] >= DWG_ERR_CRITICAL:
+            raise RuntimeError(f"libredwg failed to read {dwg_path} (error 0x{read_error[0]:x})")
+        if error < 0:
+            raise RuntimeError("open_memstream() failed")
+        if error >= DWG_ERR_CRITICAL:
+            raise RuntimeError(f"libredwg failed to write JSON for {dwg_path} (error 0x{error:x})")
+        return raw
+
+
+_worker_library = None
+
+
+def _init_library_worker(binding: str) -> None:
+    global _worker_library
+    _worker_library = LibreDWGLibrary(Path(binding))
+
+
+def _library_json_bytes(dwg_path: str) -> bytes:
+    return _worker_library.read_json_bytes(dwg_path)
+
+
+class LibreDWGLibraryParser:
+    """
+    Parser backend on the libredwg shared library instead of the CLI tools.
+    
+    A pool of workers >= 1 long-lived processes, each holding the library
+    loaded once, converts drawings and sends the JSON back over a pipe; a
+    conversion that exceeds the timeout or kills its worker gets the pool
+    restarted and raises RuntimeError, like a failing dwgread. There is no
+    in-process mode, which could neither time out nor survive a crash. The
+    binding is compiled against the library's own headers on first use
+    (see build_libredwg_binding). max_tasks_per_worker recycles workers to
+    bound leaks in libredwg.
+    
+    There is no cheaper layer listing than the conversion itself, so
+    get_layers keeps the drawing it converted and the parse of the same,
+    unchanged file that follows the precheck takes it instead of converting
+    again. stream_dwg_to_json returns the parsed drawing as well.
+    """
+    
+    def __init__(self, library_path: Optional[str] = None, timeout: float = 60,
+                 workers: int = 1, max_tasks_per_worker: Optional[int] = 500,
+                 version: Optional[str] = None, build_dir: Optional[Path] = None):
+        if workers < 1:
+            raise ValueError("the library backend needs at least one worker process")
+        if library_path is None:
+            # ctypes.util is a noticeable share of the import time, load it here
+            import ctypes.util
+            library_path = ctypes.util.find_library("redwg")
+        self.library_path = library_path
+        if self.library_path is None:
+            raise RuntimeError("libredwg not found")
+        self.libredwg_version = libredwg_version(self.library_path, version)
+        self.binding = build_libredwg_binding(self.library_path, self.libredwg_version, build_dir)
+        self.timeout = timeout
+        self.workers = workers
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self._pool = None
+        self._converted = None
+    
+    def version(self) -> str:
+        """
+        Library identity, part of the parse cache key. Size and mtime are
+        only known for a library_path that is a file path, not a soname.
+        """
+        path = Path(self.library_path)
+        try:
+            stat = path.stat()
+        except OSError:
+            return f"libredwg {self.libredwg_version}:{path.name}"
+        return f"libredwg {self.libredwg_version}:{path.name}:{stat.st_size}:{stat.st_mtime_ns}"
+    
+    def _convert(self, dwg_path: Path) -> dict:
+        import multiprocessing
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(
+                self.workers,
+                initializer=_init_library_worker,
+                initargs=(str(self.binding),),
+                maxtasksperchild=self.max_tasks_per_worker
+            )
+        try:
+            raw = self._pool.apply_async(_library_json_bytes, (str(dwg_path),)).get(self.timeout)
+        except multiprocessing.TimeoutError:
+            # A hung or crashed worker never answers; start over with a fresh pool
+            self.close()
+            raise RuntimeError(f"libredwg gave no result within {self.timeout} s (hung or crashed)")
+        return json.loads(raw)
+    
+    @staticmethod
+    def _file_key(dwg_path: Path) -> tuple:
+        stat = os.stat(dwg_path)
+        return str(dwg_path), stat.st_size, stat.st_mtime_ns
+    
+    def parse_dwg_to_json(self, dwg_path: Path) -> dict:
+        converted, self._converted = self._converted, None
+        if converted is not None and converted[0] == self._file_key(dwg_path):
+            return converted[1]
+        return self._convert(dwg_path)
+    
+    def stream_dwg_to_json(self, dwg_path: Path) -> dict:
+        return self.parse_dwg_to_json(dwg_path)
+    
+    def get_layers(self, dwg_path: Path) -> list[str]:
+        """Layer names of a full conversion, which is kept for the parse that follows."""
+        self._converted = None
+        key = self._file_key(dwg_path)
+        dwg_json = self._convert(dwg_path)
+        self._converted = (key, dwg_json)
+        return [layer["name"] for layer in dwg_json.get("tables", {}).get("LAYER", [])]
+    
+    def close(self) -> None:
+        self._converted = None
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+
 # =============================================================================
 # Mock Parser (for testing without LibreDWG installed)
 # =============================================================================
@@ -173,6 +1147,17 @@ class MockDWGParser:
     Used for development/testing when LibreDWG is not installed.
     """
     
+    def version(self) -> str:
+        return "mock"
+    
+    def stream_dwg_to_json(self, dwg_path: Path) -> dict:
+        """Mock data is small, streaming returns the same structure."""
+        return self.parse_dwg_to_json(dwg_path)
+    
+    def get_layers(self, dwg_path: Path) -> list[str]:
+        """Layer names of the sample structure, as dwglayers would list them."""
+        return [layer["name"] for layer in self.parse_dwg_to_json(dwg_path)["tables"]["LAYER"]]
+    
     def parse_dwg_to_json(self, dwg_path: Path) -> dict:
         """Return a sample DWG structure for testing."""
         return {
@@ -275,443 +1260,4107 @@ class MockDWGParser:
         }
 
 
+PARSER_BACKENDS = ("cli", "library", "mock")
+
+
+def create_parser(backend: str = "cli", timeout: float = 60, **options):
+    """
+    Parser for a backend name: "cli" (dwgread/dwglayers processes),
+    "library" (libredwg via cffi, see LibreDWGLibraryParser) or "mock".
+    Extra options go to the parser class.
+    """
+    if backend == "cli":
+        return LibreDWGParser(timeout=timeout, **options)
+    if backend == "library":
+        return LibreDWGLibraryParser(timeout=timeout, **options)
+    if backend == "mock":
+        return MockDWGParser()
+    raise ValueError(f"unknown parser backend '{backend}'")
+
+
 # =============================================================================
-# Validators
+# Parse Result Cache
 # =============================================================================
 
-def validate_layers(dwg_json: dict) -> list[ValidationError]:
-    """Validate layer structure according to BBL CAD-Richtlinie."""
-    errors = []
+class ParseCache:
+    """
+    On-disk cache of parsed drawings, keyed by the SHA-256 of the DWG content
+    plus the converter version, so re-uploads of an unchanged DWG skip dwgread.
     
-    # Build layer lookup
-    layers = {}
-    for layer in dwg_json.get("tables", {}).get("LAYER", []):
-        layers[layer["name"]] = layer
+    Entries are stored as msgpack when available, otherwise as pickle, and
+    the directory is kept under max_bytes by evicting the least recently used
+    entries (file mtime is refreshed on every hit). The cache directory must
+    be private to the service: pickle entries are trusted on load.
+    """
     
-    # Check required layers exist with correct colors
-    for layer_name, spec in BBL_REQUIRED_LAYERS.items():
-        if layer_name not in layers:
-            errors.append(ValidationError(
-                code="LAYER_MISSING",
-                message=f"Erforderlicher Layer '{layer_name}' fehlt",
-                severity=Severity.ERROR,
-                layer=layer_name
-            ))
-        else:
-            actual_color = layers[layer_name].get("color", -1)
-            expected_color = spec["color"]
-            if actual_color != expected_color:
-                errors.append(ValidationError(
-                    code="LAYER_COLOR_WRONG",
-                    message=f"Layer '{layer_name}' hat Farbe {actual_color}, erwartet {expected_color}",
-                    severity=Severity.ERROR,
-                    layer=layer_name
-                ))
+    def __init__(self, cache_dir: Path, max_bytes: int = 2 * 1024 ** 3):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.suffix = ".msgpack" if MSGPACK_AVAILABLE else ".pickle"
     
-    # Check for unauthorized layers
-    allowed_layers = set(BBL_REQUIRED_LAYERS.keys()) | SYSTEM_LAYERS
-    for layer_name in layers:
-        if layer_name not in allowed_layers:
-            errors.append(ValidationError(
+    def key(self, dwg_path: Path, parser_version: str) -> str:
+        digest = hashlib.sha256()
+        with open(dwg_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        digest.update(b"\0" + parser_version.encode())
+        return digest.hexdigest()
+    
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.suffix}"
+    
+    def get(self, key: str) -> Optional[dict]:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            dwg_json = msgpack.unpackb(data) if MSGPACK_AVAILABLE else pickle.loads(data)
+        except Exception:
+            path.unlink(missing_ok=True)
+            return None
+        os.utime(path)
+        return dwg_json
+    
+    def put(self, key: str, dwg_json: dict) -> None:
+        if MSGPACK_AVAILABLE:
+            data = msgpack.packb(dwg_json)
+        else:
+            data = pickle.dumps(dwg_json, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            return
+        
+        # Write then rename so concurrent readers never see a partial entry;
+        # the temp name is per thread, executor threads may write the same key
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        self._evict()
+    
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob(f"*{self.suffix}"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+# =============================================================================
+# Room Tables
+# =============================================================================
+
+# Part of the room table cache key; bump when the column layout changes
+ROOM_TABLE_FORMAT = "room-table-1"
+
+
+def _room_area(value) -> float:
+    """Area cell as float m², NaN if empty or not a number ("1'234,5" is accepted)."""
+    if value is None or value == "":
+        return math.nan
+    if isinstance(value, str):
+        value = value.strip().replace("'", "").replace(",", ".")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class RoomTable(Mapping):
+    """
+    Room table (Raumliste) held column-wise: AOIDs, names and areas in m²
+    (NaN where missing) as parallel columns, plus an AOID -> row index.
+
+    Reads like the former dict of {"aoid", "name", "area"} dicts, which are
+    built per lookup. If an AOID occurs twice, the later row wins the index.
+    """
+
+    def __init__(self, aoids: Optional[list] = None, names: Optional[list] = None,
+                 areas: Optional[array] = None):
+        self.aoids = aoids if aoids is not None else []
+        self.names = names if names is not None else []
+        self.areas = areas if areas is not None else array("d")
+        self.rows = {aoid: i for i, aoid in enumerate(self.aoids)}
+
+    def append(self, aoid: str, name: Optional[str], area: float) -> None:
+        self.rows[aoid] = len(self.aoids)
+        self.aoids.append(aoid)
+        self.names.append(name)
+        self.areas.append(area)
+
+    def __getitem__(self, aoid: str) -> dict:
+        i = self.rows[aoid]
+        area = self.areas[i]
+        return {"aoid": aoid, "name": self.names[i], "area": None if math.isnan(area) else area}
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def to_columns(self) -> dict:
+        return {"aoids": self.aoids, "names": self.names, "areas": self.areas.tobytes()}
+
+    @classmethod
+    def from_columns(cls, columns: dict) -> "RoomTable":
+        areas = array("d")
+        areas.frombytes(columns["areas"])
+        return cls(list(columns["aoids"]), list(columns["names"]), areas)
+
+
+def _xlsx_rows(path: Path):
+    import openpyxl
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        yield from wb.active.iter_rows(min_row=2, max_col=3, values_only=True)  # Skip header
+    finally:
+        wb.close()
+
+
+def _csv_rows(path: Path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        sample = f.read(64 * 1024)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        rows = csv.reader(f, dialect)
+        next(rows, None)  # Skip header
+        yield from rows
+
+
+def _parquet_rows(path: Path):
+    import pyarrow.parquet as pq
+    parquet = pq.ParquetFile(path)
+    columns = parquet.schema_arrow.names[:3]
+    for batch in parquet.iter_batches(columns=columns):
+        yield from zip(*(column.to_pylist() for column in batch.columns))
+
+
+_ROOM_TABLE_READERS = {".xlsx": _xlsx_rows, ".xlsm": _xlsx_rows, ".csv": _csv_rows, ".parquet": _parquet_rows}
+
+
+def load_room_table(path: Path, cache: Optional[ParseCache] = None) -> RoomTable:
+    """
+    Load a BBL room table from XLSX, CSV or Parquet into a RoomTable.
+
+    All formats share the Excel layout: a header row, then AOID, name and
+    area in the first three columns; rows without an AOID are skipped. Rows
+    are streamed straight into the columns. With a cache, the parsed
+    columns are stored under the SHA-256 of the file content, so an
+    unchanged room table is read back without parsing.
+    """
+    path = Path(path)
+    reader = _ROOM_TABLE_READERS.get(path.suffix.lower())
+    if reader is None:
+        raise ValueError(f"unsupported room table format '{path.suffix}'")
+    if reader is _parquet_rows and not PYARROW_AVAILABLE:
+        raise RuntimeError("pyarrow not installed, cannot read Parquet room tables")
+
+    key = None
+    if cache is not None:
+        key = cache.key(path, ROOM_TABLE_FORMAT)
+        columns = cache.get(key)
+        if columns is not None:
+            return RoomTable.from_columns(columns)
+
+    table = RoomTable()
+    append = table.append
+    for row in reader(path):
+        if not row or not row[0]:  # AOID column
+            continue
+        append(
+            str(row[0]).strip(),
+            str(row[1]) if len(row) > 1 and row[1] not in (None, "") else None,
+            _room_area(row[2]) if len(row) > 2 else math.nan
+        )
+
+    if cache is not None:
+        cache.put(key, table.to_columns())
+    return table
+
+
+# =============================================================================
+# Synthetic Drawings (benchmarks and scale tests)
+# =============================================================================
+
+# Defects the generator can inject, one per affected room
+SYNTHETIC_DEFECTS = (
+    "z_not_zero",        # Z_NOT_ZERO
+    "not_closed",        # POLYLINE_NOT_CLOSED
+    "width",             # POLYLINE_WIDTH_NOT_ZERO
+    "overlap",           # ROOMS_OVERLAP
+    "aoid_format",       # AOID_FORMAT_INVALID (+ AOID_MISSING_IN_DWG)
+    "aoid_outside",      # AOID_OUTSIDE_ROOM
+    "aoid_duplicate",    # AOID_DUPLICATE (+ AOID_MISSING_IN_DWG)
+    "not_in_table",      # AOID_NOT_IN_EXCEL
+    "area",              # AREA_MISMATCH
+    "wrong_font",        # TEXT_WRONG_FONT
+    "forbidden",         # FORBIDDEN_ENTITY_TYPE, an extra SPLINE
+    "wall_gap",          # ENDPOINT_GAP, 2.3 mm between two wall pieces
+)
+
+
+@dataclass
+class SyntheticSpec:
+    """
+    Shape of a generated drawing. Rooms sit on a grid of 6 x 5 m cells, each
+    an elliptic room polygon with vertices_per_room vertices, its AOID text
+    at the center and lines_per_room wall LINEs around it. block_inserts
+    INSERTs of one block_size-entity furniture block are spread over the
+    rooms. Each room gets one defect from defect_kinds with probability
+    error_rate. Equal specs give identical drawings.
+    """
+    floors: int = 1
+    rooms_per_floor: int = 100
+    vertices_per_room: int = 4
+    lines_per_room: int = 8
+    block_inserts: int = 0
+    block_size: int = 20
+    error_rate: float = 0.0
+    defect_kinds: tuple = SYNTHETIC_DEFECTS
+    building: str = "2011"
+    seed: int = 0
+
+    @classmethod
+    def for_entities(cls, entities: int, **overrides) -> "SyntheticSpec":
+        """Spec whose floor has about the given number of model space entities."""
+        spec = cls(**overrides)
+        per_room = 2 + spec.lines_per_room
+        spec.rooms_per_floor = max(1, (entities - spec.block_inserts) // per_room)
+        return spec
+
+    def aoid(self, floor: int, room: int) -> str:
+        # Three digits per room number; the two-letter wing code takes the
+        # thousands so AOIDs stay valid on very large floors
+        wing = chr(ord("A") + room // 26000 % 26) + chr(ord("A") + room // 1000 % 26)
+        return f"{self.building}.{wing}.{floor % 100:02d}.{room % 1000:03d}"
+
+
+@dataclass
+class SyntheticDrawing:
+    floor: int
+    dwg_json: dict
+    room_table: RoomTable
+    defects: dict = field(default_factory=dict)  # defect kind -> rooms affected
+
+    @property
+    def entity_count(self) -> int:
+        return len(self.dwg_json["blocks"]["*Model_Space"]["entities"])
+
+
+_SYNTHETIC_CELL = (6000.0, 5000.0)
+_SYNTHETIC_ROOM = (2500.0, 2000.0)  # Semi-axes of the room polygons in mm
+
+
+def _synthetic_polygon(vertices: int) -> list[tuple[float, float]]:
+    """Room polygon around the origin; every room is a translated copy."""
+    rx, ry = _SYNTHETIC_ROOM
+    step = 2 * math.pi / vertices
+    return [(rx * math.cos(k * step + step / 2), ry * math.sin(k * step + step / 2)) for k in range(vertices)]
+
+
+def _shoelace_m2(points: list[tuple[float, float]]) -> float:
+    twice = sum(x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(points, points[1:] + points[:1]))
+    return abs(twice) / 2 / 1e6
+
+
+def generate_drawing(spec: SyntheticSpec, floor: int = 0) -> SyntheticDrawing:
+    """Generate one floor of a synthetic project as LibreDWG-shaped JSON plus its room table."""
+    # Millions of small dicts: cyclic GC passes would dominate the run time
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _generate_drawing(spec, floor)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _generate_drawing(spec: SyntheticSpec, floor: int) -> SyntheticDrawing:
+    rng = random.Random(f"{spec.seed}/{floor}")
+    kinds = tuple(spec.defect_kinds)
+    cell_w, cell_h = _SYNTHETIC_CELL
+    columns = max(1, math.isqrt(spec.rooms_per_floor))
+    template = _synthetic_polygon(max(3, spec.vertices_per_room))
+    area = _shoelace_m2(template)
+    # Shift that makes a room overlap its neighbour without covering its AOID
+    overlap_shift = 0.9 * (cell_w - max(x for x, _ in template))
+    wall = (cell_w - 200.0) / max(1, spec.lines_per_room)
+    prefix = f"{floor:X}."
+    entities = []
+    table = RoomTable()
+    defects = {}
+    handles = itertools.count(1)
+
+    def handle() -> str:
+        return f"{prefix}{next(handles):X}"
+
+    for room in range(spec.rooms_per_floor):
+        defect = rng.choice(kinds) if kinds and rng.random() < spec.error_rate else None
+        if defect is not None:
+            defects[defect] = defects.get(defect, 0) + 1
+        cx = (room % columns + 0.5) * cell_w
+        cy = (room // columns + 0.5) * cell_h
+        aoid = spec.aoid(floor, room)
+
+        px = cx
+        if defect == "overlap":
+            px += -overlap_shift if room % columns == columns - 1 else overlap_shift
+        entities.append({
+            "type": "LWPOLYLINE",
+            "handle": handle(),
+            "layer": "R_RAUMPOLYGON",
+            "color": 256,
+            "flag": 0 if defect == "not_closed" else 1,
+            "const_width": 10.0 if defect == "width" else 0.0,
+            "points": [{"x": px + x, "y": cy + y, "z": 0.0} for x, y in template]
+        })
+        if defect == "z_not_zero":
+            entities[-1]["points"][0]["z"] = 50.0
+
+        text = aoid
+        if defect == "aoid_format":
+            text = aoid.replace(".", "-")
+        elif defect == "aoid_duplicate" and room:
+            text = spec.aoid(floor, room - 1)
+        tx, ty = (cx + cell_w / 2 - 100.0, cy + cell_h / 2 - 100.0) if defect == "aoid_outside" else (px, cy)
+        entities.append({
+            "type": "TEXT",
+            "handle": handle(),
+            "layer": "R_AOID",
+            "color": 256,
+            "insertion_point": {"x": tx, "y": ty, "z": 0.0},
+            "height": 100.0,
+            "text_value": text,
+            "style": "BadFont" if defect == "wrong_font" else "Standard"
+        })
+        if defect != "not_in_table":
+            table.append(aoid, f"Raum {room}", round(area * (1.1 if defect == "area" else 1.0), 2))
+
+        x0, y0 = cx - cell_w / 2 + 100.0, cy - cell_h / 2 + 100.0
+        gap_piece = spec.lines_per_room // 2 if defect == "wall_gap" else -1
+        for k in range(spec.lines_per_room):
+            # Wall along the cell border, split into lines_per_room pieces
+            entities.append({
+                "type": "LINE",
+                "handle": handle(),
+                "layer": "A_ARCHITEKTUR",
+                "color": 256,
+                "start": {"x": x0 + k * wall + (2.3 if k == gap_piece else 0.0), "y": y0, "z": 0.0},
+                "end": {"x": x0 + (k + 1) * wall, "y": y0, "z": 0.0}
+            })
+        if defect == "forbidden":
+            entities.append({"type": "SPLINE", "handle": handle(), "layer": "A_ARCHITEKTUR", "color": 256})
+
+    blocks = {"*Model_Space": {"entities": entities}}
+    if spec.block_inserts:
+        blocks["MOEBEL"] = {
+            "base_point": {"x": 0.0, "y": 0.0, "z": 0.0},
+            "entities": [{
+                "type": "LINE",
+                "handle": f"B{k:X}",
+                "layer": "0",
+                "color": 256,
+                "start": {"x": 0.0, "y": float(k) * 10.0, "z": 0.0},
+                "end": {"x": 500.0, "y": float(k) * 10.0, "z": 0.0}
+            } for k in range(spec.block_size)]
+        }
+        for k in range(spec.block_inserts):
+            room = k % spec.rooms_per_floor
+            entities.append({
+                "type": "INSERT",
+                "handle": handle(),
+                "layer": "A_ARCHITEKTUR",
+                "color": 256,
+                "name": "MOEBEL",
+                "insertion_point": {"x": (room % columns) * cell_w + 300.0 + (k // spec.rooms_per_floor) % 8 * 50.0,
+                                    "y": (room // columns) * cell_h + 300.0, "z": 0.0},
+                "rotation": rng.choice((0.0, math.pi / 2))
+            })
+
+    dwg_json = {
+        "header": {"version": "AC1027", "codepage": 30},
+        "tables": {
+            "LAYER": [{"type": "LAYER", "name": name, "color": color, "flag": 0}
+                      for name, color in [("0", 7), *zip(DEFAULT_RULE_PLAN.required_layers,
+                                                         DEFAULT_RULE_PLAN.layer_colors)]],
+            "STYLE": [
+                {"name": "Standard", "font_file": "arial.ttf"},
+                {"name": "BadFont", "font_file": "times.ttf"},
+            ]
+        },
+        "blocks": blocks,
+        "objects": []
+    }
+    return SyntheticDrawing(floor, dwg_json, table, defects)
+
+
+def generate_project(spec: SyntheticSpec):
+    """Yield one SyntheticDrawing per floor."""
+    for floor in range(spec.floors):
+        yield generate_drawing(spec, floor)
+
+
+class SyntheticDWGParser(MockDWGParser):
+    """
+    Parser stand-in that returns generated drawings: the floor is taken from
+    the trailing digits of the file name ("floor_03.dwg"), default 0. The
+    last generated floor is kept, so repeated validations of the same floor
+    do not time the generator.
+    """
+
+    def __init__(self, spec: SyntheticSpec):
+        self.spec = spec
+        self._last = None
+
+    def version(self) -> str:
+        return f"synthetic-{self.spec.seed}"
+
+    def floor(self, dwg_path: Path) -> int:
+        digits = re.search(r"(\d+)$", Path(dwg_path).stem) if dwg_path else None
+        return int(digits.group(1)) % self.spec.floors if digits else 0
+
+    def drawing(self, dwg_path: Path) -> SyntheticDrawing:
+        floor = self.floor(dwg_path)
+        if self._last is None or self._last.floor != floor:
+            self._last = generate_drawing(self.spec, floor)
+        return self._last
+
+    def parse_dwg_to_json(self, dwg_path: Path) -> dict:
+        return self.drawing(dwg_path).dwg_json
+
+
+# =============================================================================
+# Instrumentation
+# =============================================================================
+
+class Span:
+    """One timed stage or validator call; hooks see it on start and end."""
+
+    __slots__ = ("name", "kind", "attrs", "parent", "wall_ms", "cpu_ms", "child_cpu_ms", "peak_kib", "_child_peak")
+
+    def __init__(self, name: str, kind: str, attrs: dict, parent: Optional["Span"]):
+        self.name = name
+        self.kind = kind
+        self.attrs = attrs
+        self.parent = parent
+        self.wall_ms = 0.0
+        self.cpu_ms = 0.0
+        self.child_cpu_ms = 0.0
+        self.peak_kib = None
+        self._child_peak = 0
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+
+def _children_cpu() -> float:
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+class Instrumentation:
+    """
+    Timing of one validation run, aggregated per stage and per validator.
+
+    span() measures wall time, CPU time of the calling thread and CPU time
+    of finished child processes (dwgread, dwglayers); with trace_memory the
+    tracemalloc peak of every span is recorded too (nested spans report
+    their own peak, parents the maximum). Each hook is called as
+    hook("start", span) and hook("end", span), which is enough to feed
+    logging or OpenTelemetryHook. summary() is what ends up in
+    stats["profile"].
+    """
+
+    def __init__(self, hooks=(), trace_memory: bool = False):
+        self.hooks = list(hooks)
+        self.trace_memory = trace_memory
+        self.records = {"stages": {}, "validators": {}}
+        self._stack = []
+        self._started_tracemalloc = False
+
+    @contextmanager
+    def span(self, name: str, kind: str = "stages", **attrs):
+        parent = self._stack[-1] if self._stack else None
+        span = Span(name, kind, attrs, parent)
+        for hook in self.hooks:
+            hook("start", span)
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            if parent is not None:
+                parent._child_peak = max(parent._child_peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        self._stack.append(span)
+        wall, cpu, child_cpu = time.perf_counter(), time.thread_time(), _children_cpu()
+        try:
+            yield span
+        finally:
+            span.wall_ms = (time.perf_counter() - wall) * 1000
+            span.cpu_ms = (time.thread_time() - cpu) * 1000
+            span.child_cpu_ms = (_children_cpu() - child_cpu) * 1000
+            self._stack.pop()
+            if self.trace_memory:
+                peak = max(span._child_peak, tracemalloc.get_traced_memory()[1])
+                span.peak_kib = peak // 1024
+                if parent is not None:
+                    parent._child_peak = max(parent._child_peak, peak)
+                elif self._started_tracemalloc:
+                    tracemalloc.stop()
+                    self._started_tracemalloc = False
+            self.add(kind, name, span.wall_ms, span.cpu_ms, span.attrs.get("entities"),
+                     span.child_cpu_ms, span.peak_kib)
+            for hook in self.hooks:
+                hook("end", span)
+
+    def add(self, kind: str, name: str, wall_ms: float, cpu_ms: float, entities: Optional[int] = None,
+            child_cpu_ms: float = 0.0, peak_kib: Optional[int] = None, calls: int = 1) -> None:
+        """Accumulate a measurement taken outside span(), e.g. summed visit() times."""
+        record = self.records[kind].setdefault(name, {"calls": 0, "wall_ms": 0.0, "cpu_ms": 0.0})
+        record["calls"] += calls
+        record["wall_ms"] += wall_ms
+        record["cpu_ms"] += cpu_ms
+        if child_cpu_ms:
+            record["child_cpu_ms"] = record.get("child_cpu_ms", 0.0) + child_cpu_ms
+        if entities is not None:
+            record["entities"] = record.get("entities", 0) + entities
+        if peak_kib is not None:
+            record["peak_kib"] = max(record.get("peak_kib", 0), peak_kib)
+
+    def summary(self) -> dict:
+        summary = {
+            kind: {name: {k: round(v, 3) if isinstance(v, float) else v for k, v in record.items()}
+                   for name, record in records.items()}
+            for kind, records in self.records.items()
+        }
+        if RESOURCE_AVAILABLE:
+            summary["max_rss_kib"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return summary
+
+
+class OpenTelemetryHook:
+    """
+    Mirror Instrumentation spans into an OpenTelemetry tracer (or anything
+    with a compatible start_as_current_span), nested like the stages.
+    """
+
+    def __init__(self, tracer, prefix: str = "plan_check."):
+        self.tracer = tracer
+        self.prefix = prefix
+        self._open = {}
+
+    def __call__(self, event: str, span: Span) -> None:
+        if event == "start":
+            context = self.tracer.start_as_current_span(self.prefix + span.name, attributes=dict(span.attrs))
+            self._open[id(span)] = (context, context.__enter__())
+            return
+        context, otel_span = self._open.pop(id(span))
+        otel_span.set_attribute("wall_ms", span.wall_ms)
+        otel_span.set_attribute("cpu_ms", span.cpu_ms)
+        for key, value in span.attrs.items():
+            otel_span.set_attribute(key, value)
+        context.__exit__(None, None, None)
+
+
+def capture_profile(func, mode: str = "cprofile", top: int = 30):
+    """
+    Run func() once under cProfile ("cprofile") or tracemalloc
+    ("tracemalloc") and return its result and a text report of the top
+    functions by cumulative time, or the top allocation sites.
+    """
+    import cProfile
+    import pstats
+    out = io.StringIO()
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            result = func()
+        finally:
+            profiler.disable()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+    elif mode == "tracemalloc":
+        tracemalloc.start(25)
+        try:
+            result = func()
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        print(f"Peak traced memory: {peak / 1024 ** 2:.1f} MiB", file=out)
+        for stat in snapshot.statistics("lineno")[:top]:
+            print(stat, file=out)
+    else:
+        raise ValueError(f"unknown capture mode '{mode}'")
+    return result, out.getvalue()
+
+
+# =============================================================================
+# Single-Pass Rule Engine
+# =============================================================================
+
+def model_space_entities(dwg_json: dict) -> list:
+    """Return the model space entity list of a parsed drawing."""
+    return dwg_json.get("blocks", {}).get("*Model_Space", {}).get("entities", [])
+
+
+class EntityRule:
+    """
+    Base class for rules driven by the EntityDispatcher.
+
+    A rule subscribes to (entity type, layer) pairs; None acts as a wildcard.
+    The dispatcher calls begin() once, visit() for every matching entity and
+    finish() after the walk, which returns the collected findings. Rules
+    append findings to self.errors, which the dispatcher may replace with a
+    FindingStore sink. cost ranks finish() for early-exit runs: 0 for rules
+    that only look at single entities, 1 for block definitions, 2 for the
+    geometry passes.
+    """
+
+    subscriptions: tuple = ()
+    cost: int = 0
+
+    def accepts(self, etype: Optional[str], layer: Optional[str]) -> bool:
+        for sub_type, sub_layer in self.subscriptions:
+            if (sub_type is None or sub_type == etype) and (sub_layer is None or sub_layer == layer):
+                return True
+        return False
+
+    def begin(self, dwg_json: dict) -> None:
+        pass
+
+    def visit(self, entity: dict) -> None:
+        raise NotImplementedError
+
+    def finish(self) -> list[ValidationError]:
+        return []
+
+
+class EntityDispatcher:
+    """
+    Walks model space once and routes each entity to the rules subscribed
+    to its (type, layer) pair. Routes are resolved on first sight of a pair
+    and cached, so the per-entity cost is one dict lookup.
+    """
+
+    def __init__(self, rules: list[EntityRule]):
+        self.rules = list(rules)
+        self.entity_count = 0
+        self._routes: dict[tuple, tuple] = {}
+        self._visitors = [rule.visit for rule in self.rules]
+
+    def _resolve(self, key: tuple) -> tuple:
+        etype, layer = key
+        targets = tuple(visit for rule, visit in zip(self.rules, self._visitors) if rule.accepts(etype, layer))
+        self._routes[key] = targets
+        return targets
+
+    def run(self, dwg_json: dict, store: Optional[FindingStore] = None,
+            instrumentation: Optional[Instrumentation] = None):
+        """
+        Run all rules over the drawing; findings are returned in rule order.
+        
+        With a FindingStore, every rule appends straight into its own store
+        segment and the store is returned instead of a list. With an
+        Instrumentation, the time spent in each rule's visit() calls and
+        its finish() is recorded per rule class. If the store has a budget,
+        the walk checks its deadline every few thousand entities and rules
+        finish cheapest first (by cost), so BudgetExhausted ends the run
+        before the expensive passes; findings still come out in rule order.
+        """
+        timings = None
+        if instrumentation is not None:
+            timings = [[0.0, 0.0, 0] for _ in self.rules]
+            self._visitors = [_timed_visit(rule.visit, timing) for rule, timing in zip(self.rules, timings)]
+            self._routes = {}
+
+        for rule in self.rules:
+            if store is not None:
+                rule.errors = store.sink()
+            rule.begin(dwg_json)
+
+        budget = store.budget if store is not None else None
+        routes = self._routes
+        count = 0
+        entities = model_space_entities(dwg_json)
+        try:
+            for entity in entities:
+                count += 1
+                key = (entity.get("type"), entity.get("layer"))
+                targets = routes.get(key)
+                if targets is None:
+                    targets = self._resolve(key)
+                for visit in targets:
+                    visit(entity)
+                if budget is not None and not count & 4095:
+                    budget.check_time()
+        except BudgetExhausted:
+            # Stops a streamed dwgread right away
+            if hasattr(entities, "close"):
+                entities.close()
+            raise
+        finally:
+            self.entity_count = count
+
+        order = range(len(self.rules))
+        if budget is not None:
+            order = sorted(order, key=lambda i: self.rules[i].cost)
+        errors = []
+        for i in order:
+            rule = self.rules[i]
+            if budget is not None:
+                budget.check_time()
+            if timings is None:
+                findings = rule.finish()
+            else:
+                name = type(rule).__name__
+                wall, cpu, visited = timings[i]
+                instrumentation.add("validators", name, wall * 1000, cpu * 1000, visited, calls=0)
+                with instrumentation.span(name, "validators"):
+                    findings = rule.finish()
+            if store is None:
+                errors.extend(findings)
+        if timings is not None:
+            self._visitors = [rule.visit for rule in self.rules]
+            self._routes = {}
+        return errors if store is None else store
+
+
+def _timed_visit(visit, timing: list):
+    perf_counter, thread_time = time.perf_counter, time.thread_time
+
+    def timed(entity: dict) -> None:
+        wall, cpu = perf_counter(), thread_time()
+        visit(entity)
+        timing[0] += perf_counter() - wall
+        timing[1] += thread_time() - cpu
+        timing[2] += 1
+    return timed
+
+
+def run_rules(dwg_json: dict, rules: list[EntityRule]) -> list[ValidationError]:
+    """Convenience wrapper: dispatch a single pass over the given rules."""
+    return EntityDispatcher(rules).run(dwg_json)
+
+
+# =============================================================================
+# Geometry Model
+# =============================================================================
+
+class RoomIndex:
+    """
+    Spatial index over the room polygons of one drawing.
+
+    Built once and shared by the ROOMS_OVERLAP and AOID_OUTSIDE_ROOM checks:
+    an STRtree narrows each query to the rooms whose bounding boxes match,
+    and the exact predicate runs on prepared geometries.
+    """
+
+    def __init__(self):
+        self.handles = []
+        self.polygons = []
+        self.locations = []
+        self._tree = None
+        self._prepared = None
+
+    def __len__(self) -> int:
+        return len(self.polygons)
+
+    def add(self, handle: str, polygon, location: Location) -> None:
+        self.handles.append(handle)
+        self.polygons.append(polygon)
+        self.locations.append(location)
+        self._tree = None
+
+    def _build(self, prepared: bool = True) -> None:
+        if self._tree is None:
+            self._tree = shapely.STRtree(self.polygons)
+            self._prepared = None
+        if prepared and self._prepared is None:
+            from shapely.prepared import prep
+            self._prepared = [prep(poly) for poly in self.polygons]
+
+    def overlapping_pairs(self):
+        """Yield index pairs (i, j), i < j, of overlapping rooms in insertion order."""
+        self._build()
+        polygons = self.polygons
+        for i, poly in enumerate(polygons):
+            prepared = self._prepared[i]
+            for j in sorted(int(j) for j in self._tree.query(poly) if j > i):
+                if prepared.overlaps(polygons[j]):
+                    yield i, j
+
+    def contains(self, point) -> bool:
+        """True if any room polygon contains the point."""
+        self._build()
+        prepared = self._prepared
+        return any(prepared[int(j)].contains(point) for j in self._tree.query(point))
+
+    def locate(self, xs, ys):
+        """Index of the first room containing each point, -1 where none does (one bulk query)."""
+        found = np.full(len(xs), -1, dtype=np.int64)
+        if len(xs) and self.polygons:
+            self._build(prepared=False)
+            inputs, rooms = self._tree.query(shapely.points(xs, ys), predicate="within")
+            order = np.lexsort((rooms, inputs))
+            first_inputs, first = np.unique(inputs[order], return_index=True)
+            found[first_inputs] = rooms[order][first]
+        return found
+
+
+def near_pairs(xy, radius: float):
+    """
+    Index pairs (i, j), i < j, of the points in the (n, 2) array xy that are
+    at most radius apart, and their distances.
+
+    The points are hashed into a grid of radius-sized cells and sorted by
+    cell key, so every neighbour of a point sits in its own cell or one of
+    the eight around it. Each cell is compared with itself and four of its
+    neighbours by searchsorted over the sorted keys: O(n log n) for the sort
+    plus the number of candidate pairs, and no Python loop over points.
+    """
+    n = len(xy)
+    if n < 2 or radius <= 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+    origin = xy.min(axis=0)
+    local = xy - origin
+    # Coarser cells for huge extents keep the keys within int64
+    cell = max(radius, float(local.max()) / 2 ** 30)
+    cells = np.floor(local / cell).astype(np.int64)
+    # One spare row so a cell's lower neighbour never wraps into the previous column
+    rows = int(cells[:, 1].max()) + 2
+    keys = cells[:, 0] * rows + cells[:, 1]
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    # Occupied cells: sorted positions bounds[c]:bounds[c + 1] lie in cell_keys[c]
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    cell_keys = keys[starts]
+    bounds = np.append(starts, n)
+    cell_of = np.repeat(np.arange(len(starts)), np.diff(bounds))
+
+    first, second = [], []
+    positions = np.arange(n)
+    for dx, dy in ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1)):
+        if dx == dy == 0:
+            lo, hi = positions + 1, bounds[cell_of + 1]
+        else:
+            target = cell_keys + (dx * rows + dy)
+            found = np.minimum(np.searchsorted(cell_keys, target), len(cell_keys) - 1)
+            hit = cell_keys[found] == target
+            lo = np.where(hit, bounds[found], 0)[cell_of]
+            hi = np.where(hit, bounds[found + 1], 0)[cell_of]
+        counts = hi - lo
+        total = int(counts.sum())
+        if not total:
+            continue
+        src = np.repeat(positions, counts)
+        dst = np.arange(total) - np.repeat(np.cumsum(counts) - counts - lo, counts)
+        first.append(order[src])
+        second.append(order[dst])
+    if not first:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+
+    i, j = np.concatenate(first), np.concatenate(second)
+    dist = np.hypot(*(local[i] - local[j]).T)
+    near = dist <= radius
+    i, j, dist = i[near], j[near], dist[near]
+    return np.minimum(i, j), np.maximum(i, j), dist
+
+
+class GeometryModel(EntityRule):
+    """
+    Per-drawing geometry of all LWPOLYLINE entities, built once in the
+    dispatcher pass and read by every geometry-aware validator.
+
+    Vertices are packed column-wise: one contiguous (N, 3) float64 array for
+    all polylines plus an offsets array, so polyline i owns the rows
+    vertices[offsets[i]:offsets[i + 1]]. Per-polyline attributes (flag,
+    width, closure layer) are parallel arrays and the batch checks in
+    GeometryRule run over all polylines at once. Room polygons
+    (R_RAUMPOLYGON with at least three vertices) get a cached shapely polygon
+    and share one RoomIndex.
+    """
+
+    subscriptions = (("LWPOLYLINE", None),)
+    cost = 2
+
+    def __init__(self, polygon_layers: frozenset = DEFAULT_RULE_PLAN.polygon_layers):
+        self.polygon_layers = polygon_layers
+        self.handles = []
+        self.layers = []
+        self.rooms = []
+        self._points = []
+        self._counts = []
+        self._flags = []
+        self._widths = []
+        self._polygon_layer = []
+        self._packed = False
+        self._polygons = {}
+        self._room_index = None
+        self._room_bounds = None
+        self._areas = None
+
+    @classmethod
+    def from_dwg_json(cls, dwg_json: dict, polygon_layers: frozenset = DEFAULT_RULE_PLAN.polygon_layers) -> "GeometryModel":
+        model = cls(polygon_layers)
+        run_rules(dwg_json, [model])
+        return model
+
+    def __len__(self) -> int:
+        return len(self.handles)
+
+    def visit(self, entity: dict) -> None:
+        points = entity.get("points", [])
+        layer = entity.get("layer", "?")
+
+        if len(points) >= 3 and layer == "R_RAUMPOLYGON":
+            self.rooms.append(len(self.handles))
+
+        self.handles.append(entity.get("handle", "?"))
+        self.layers.append(layer)
+        self._flags.append(entity.get("flag", 0))
+        self._widths.append(entity.get("const_width", 0))
+        self._polygon_layer.append(layer in self.polygon_layers)
+        self._counts.append(len(points))
+        self._points.extend([(p["x"], p["y"], p.get("z", 0)) for p in points])
+
+    def finish(self) -> list[ValidationError]:
+        self.pack()
+        return []
+
+    def pack(self) -> None:
+        """Convert the collected vertex and attribute lists into NumPy arrays."""
+        if self._packed:
+            return
+        self.vertices = np.array(self._points, dtype=np.float64).reshape(-1, 3)
+        self.counts = np.array(self._counts, dtype=np.int64)
+        self.offsets = np.zeros(len(self._counts) + 1, dtype=np.int64)
+        np.cumsum(self.counts, out=self.offsets[1:])
+        self.flags = np.array(self._flags, dtype=np.int64)
+        self.widths = np.array(self._widths, dtype=np.float64)
+        self.polygon_layer = np.array(self._polygon_layer, dtype=bool)
+        # Values as the drawing has them (an int stays an int) for the rows
+        # findings point at: first vertices, vertices off Z=0 and widths
+        rows = np.union1d(self.offsets[:-1][self.counts > 0], np.flatnonzero(self.vertices[:, 2]))
+        self._raw_points = {row: self._points[row] for row in rows.tolist()}
+        self._raw_widths = {i: self._widths[i] for i in np.flatnonzero(self.widths).tolist()}
+        self._points = self._counts = self._flags = self._widths = self._polygon_layer = None
+        self._packed = True
+
+    def coords(self, i: int):
+        """(n, 3) view of the vertices of polyline i."""
+        return self.vertices[self.offsets[i]:self.offsets[i + 1]]
+
+    def location(self, i: int, vertex: int = 0) -> Location:
+        row = int(self.offsets[i]) + vertex
+        raw = self._raw_points.get(row)
+        x, y, z = raw if raw is not None else self.vertices[row].tolist()
+        return Location(x=x, y=y, z=z)
+
+    def width(self, i: int):
+        """const_width of polyline i as given in the drawing."""
+        return self._raw_widths.get(i, 0)
+
+    def first_nonzero_z(self):
+        """
+        Polylines with a vertex off Z=0, and the index of the first such
+        vertex within each of them.
+        """
+        bad = np.flatnonzero(self.vertices[:, 2] != 0)
+        owners = np.searchsorted(self.offsets, bad, side="right") - 1
+        polylines, first = np.unique(owners, return_index=True)
+        return polylines, bad[first] - self.offsets[polylines]
+
+    def areas(self):
+        """Shoelace area of every polyline (0 for fewer than three vertices)."""
+        if self._areas is None:
+            areas = np.zeros(len(self.handles), dtype=np.float64)
+            nonempty = np.flatnonzero(self.counts)
+            if nonempty.size:
+                starts = self.offsets[:-1]
+                owners = np.repeat(np.arange(len(self.handles)), self.counts)
+                # Coordinates relative to each polyline's first vertex keep
+                # the products small for survey-sized (LV95) coordinates
+                xy = self.vertices[:, :2] - self.vertices[starts[owners], :2]
+                following = np.arange(len(xy)) + 1
+                following[self.offsets[1:][nonempty] - 1] = starts[nonempty]
+                cross = xy[:, 0] * xy[following, 1] - xy[following, 0] * xy[:, 1]
+                areas[nonempty] = np.abs(np.add.reduceat(cross, starts[nonempty])) / 2
+            areas[self.counts < 3] = 0.0
+            self._areas = areas
+        return self._areas
+
+    def area(self, i: int) -> float:
+        return float(self.areas()[i])
+
+    def bounds(self, i: int) -> tuple:
+        xy = self.coords(i)[:, :2]
+        (minx, miny), (maxx, maxy) = xy.min(axis=0), xy.max(axis=0)
+        return float(minx), float(miny), float(maxx), float(maxy)
+
+    def bounds_array(self):
+        """(n, 4) array of minx, miny, maxx, maxy per polyline, NaN for empty ones."""
+        out = np.full((len(self.handles), 4), np.nan)
+        nonempty = np.flatnonzero(self.counts)
+        if nonempty.size:
+            starts = self.offsets[:-1][nonempty]
+            xy = self.vertices[:, :2]
+            out[nonempty, :2] = np.minimum.reduceat(xy, starts, axis=0)
+            out[nonempty, 2:] = np.maximum.reduceat(xy, starts, axis=0)
+        return out
+
+    def room_bounds(self):
+        """(len(rooms), 4) bounds array of the room polygons, in room order."""
+        if self._room_bounds is None:
+            self._room_bounds = self.bounds_array()[self.rooms].reshape(-1, 4)
+        return self._room_bounds
+
+    def polygon(self, i: int):
+        """Shapely polygon of polyline i, constructed on first use."""
+        poly = self._polygons.get(i)
+        if poly is None:
+            poly = shapely.Polygon(self.coords(i)[:, :2])
+            self._polygons[i] = poly
+        return poly
+
+    def polygons(self, indices: list[int]) -> list:
+        """Shapely polygons of the given polylines; uncached ones are built in one vectorized call."""
+        missing = [i for i in indices if i not in self._polygons]
+        if missing:
+            idx = np.array(missing, dtype=np.int64)
+            counts = self.counts[idx]
+            owners = np.repeat(np.arange(len(idx)), counts)
+            rows = np.arange(owners.size) + np.repeat(self.offsets[idx] - (np.cumsum(counts) - counts), counts)
+            try:
+                built = shapely.polygons(shapely.linearrings(self.vertices[rows, :2], indices=owners))
+            except (shapely.errors.GEOSException, ValueError):
+                built = None
+            if built is None or len(built) != len(missing):
+                # A degenerate ring: build one by one so the failing polyline raises as before
+                built = [shapely.Polygon(self.coords(i)[:, :2]) for i in missing]
+            self._polygons.update(zip(missing, built))
+        return [self._polygons[i] for i in indices]
+
+    def is_valid(self, i: int) -> bool:
+        return self.polygon(i).is_valid
+
+    @property
+    def room_index(self) -> RoomIndex:
+        if self._room_index is None:
+            self._room_index = RoomIndex()
+            for i, poly in zip(self.rooms, self.polygons(self.rooms)):
+                self._room_index.add(self.handles[i], poly, self.location(i))
+        return self._room_index
+
+    def locate_rooms(self, xs, ys):
+        """
+        Index into rooms of the first room containing each point, -1 where
+        none does. A few points only test the rooms whose bounding boxes
+        hold them; more use one bulk query of the RoomIndex.
+        """
+        if len(xs) > 64:
+            return self.room_index.locate(xs, ys)
+        bounds = self.room_bounds()
+        found = np.full(len(xs), -1, dtype=np.int64)
+        for t, (x, y) in enumerate(zip(xs.tolist(), ys.tolist())):
+            candidates = np.flatnonzero(
+                (bounds[:, 0] <= x) & (x <= bounds[:, 2]) & (bounds[:, 1] <= y) & (y <= bounds[:, 3])
+            )
+            point = shapely.Point(x, y)
+            found[t] = next((k for k in candidates.tolist() if self.polygon(self.rooms[k]).contains(point)), -1)
+        return found
+
+    @classmethod
+    def splice(cls, previous: "GeometryModel", fresh: "GeometryModel", source) -> "GeometryModel":
+        """
+        Model of the polylines previous + fresh selected by the index array
+        source, in that order, without visiting any entity: the packed
+        arrays are gathered row-wise and built polygons are carried over.
+        """
+        previous.pack()
+        fresh.pack()
+        model = cls(previous.polygon_layers)
+        split = len(previous)
+        shift = len(previous.vertices)
+        handles = previous.handles + fresh.handles
+        layers = previous.layers + fresh.layers
+        counts = np.concatenate((previous.counts, fresh.counts))
+        starts = np.concatenate((previous.offsets[:-1], fresh.offsets[:-1] + shift))
+        is_room = np.zeros(len(counts), dtype=bool)
+        is_room[previous.rooms] = True
+        is_room[np.array(fresh.rooms, dtype=np.int64) + split] = True
+
+        index = source.tolist()
+        model.handles = [handles[i] for i in index]
+        model.layers = [layers[i] for i in index]
+        model.rooms = np.flatnonzero(is_room[source]).tolist()
+        model.counts = counts[source]
+        model.offsets = np.zeros(len(source) + 1, dtype=np.int64)
+        np.cumsum(model.counts, out=model.offsets[1:])
+        rows = np.arange(model.offsets[-1]) + np.repeat(starts[source] - model.offsets[:-1], model.counts)
+        model.vertices = np.concatenate((previous.vertices, fresh.vertices))[rows]
+        model.flags = np.concatenate((previous.flags, fresh.flags))[source]
+        model.widths = np.concatenate((previous.widths, fresh.widths))[source]
+        model.polygon_layer = np.concatenate((previous.polygon_layer, fresh.polygon_layer))[source]
+
+        # Raw values and polygons follow their polyline to its new index
+        target = np.full(len(counts), -1, dtype=np.int64)
+        target[source] = np.arange(len(source))
+        raw_points = list(previous._raw_points.items()) + [(row + shift, raw) for row, raw in fresh._raw_points.items()]
+        if raw_points:
+            old_rows = np.array([row for row, _ in raw_points], dtype=np.int64)
+            owners = np.searchsorted(starts, old_rows, side="right") - 1
+            # Empty polylines share their start with the next one; the row belongs to the last
+            new_rows = np.where(target[owners] >= 0, model.offsets[:-1][target[owners]] + old_rows - starts[owners], -1)
+            model._raw_points = {row: raw for row, (_, raw) in zip(new_rows.tolist(), raw_points) if row >= 0}
+        else:
+            model._raw_points = {}
+        raw_widths = list(previous._raw_widths.items()) + [(i + split, w) for i, w in fresh._raw_widths.items()]
+        model._raw_widths = {int(target[i]): w for i, w in raw_widths if target[i] >= 0}
+        polygons = list(previous._polygons.items()) + [(i + split, poly) for i, poly in fresh._polygons.items()]
+        model._polygons = {int(target[i]): poly for i, poly in polygons if target[i] >= 0}
+        model._points = model._counts = model._flags = model._widths = model._polygon_layer = None
+        model._packed = True
+        return model
+
+
+# =============================================================================
+# Validators
+# =============================================================================
+
+def validate_layers(dwg_json: dict, rules: RulePlan = DEFAULT_RULE_PLAN) -> list[ValidationError]:
+    """Validate layer structure according to BBL CAD-Richtlinie."""
+    errors = []
+    
+    # Build layer lookup
+    layers = {}
+    for layer in dwg_json.get("tables", {}).get("LAYER", []):
+        layers[layer["name"]] = layer
+    
+    # Check required layers exist with correct colors
+    for layer_name, expected_color in zip(rules.required_layers, rules.layer_colors):
+        if layer_name not in layers:
+            errors.append(ValidationError(
+                code="LAYER_MISSING",
+                message=f"Erforderlicher Layer '{layer_name}' fehlt",
+                severity=Severity.ERROR,
+                layer=layer_name
+            ))
+        else:
+            actual_color = layers[layer_name].get("color", -1)
+            if actual_color != expected_color:
+                errors.append(ValidationError(
+                    code="LAYER_COLOR_WRONG",
+                    message=f"Layer '{layer_name}' hat Farbe {actual_color}, erwartet {expected_color}",
+                    severity=Severity.ERROR,
+                    layer=layer_name
+                ))
+    
+    # Check for unauthorized layers
+    for layer_name in layers:
+        if layer_name not in rules.known_layers:
+            errors.append(ValidationError(
                 code="LAYER_UNAUTHORIZED",
                 message=f"Nicht autorisierter Layer '{layer_name}' gefunden",
                 severity=Severity.WARNING,
-                layer=layer_name
+                layer=layer_name
+            ))
+    
+    return errors
+
+
+def validate_layer_names(layer_names: list[str], rules: RulePlan = DEFAULT_RULE_PLAN) -> list[ValidationError]:
+    """
+    Name-only layer check for the dwglayers precheck: required layers
+    present, no unauthorized layers. Colors need the full parse.
+    """
+    errors = []
+    present = {name.strip() for name in layer_names if name.strip()}
+    
+    for layer_name in rules.required_layers:
+        if layer_name not in present:
+            errors.append(ValidationError(
+                code="LAYER_MISSING",
+                message=f"Erforderlicher Layer '{layer_name}' fehlt",
+                severity=Severity.ERROR,
+                layer=layer_name
+            ))
+    
+    for layer_name in sorted(present - rules.known_layers):
+        errors.append(ValidationError(
+            code="LAYER_UNAUTHORIZED",
+            message=f"Nicht autorisierter Layer '{layer_name}' gefunden",
+            severity=Severity.WARNING,
+            layer=layer_name
+        ))
+    
+    return errors
+
+
+def precheck_result(dwg_path: Path, layer_names: list[str],
+                    fatal_codes: set = PRECHECK_FATAL_CODES,
+                    rules: RulePlan = DEFAULT_RULE_PLAN) -> Optional[ValidationResult]:
+    """
+    Stage 1 of a staged validation. Returns the final result if the layer
+    structure is fatally wrong, or None if the full parse should run.
+    """
+    findings = validate_layer_names(layer_names, rules)
+    if not any(e.code in fatal_codes for e in findings):
+        return None
+    
+    errors = [e for e in findings if e.severity == Severity.ERROR]
+    warnings = [e for e in findings if e.severity == Severity.WARNING]
+    return ValidationResult(
+        file_path=str(dwg_path),
+        valid=False,
+        errors=errors,
+        warnings=warnings,
+        stats={
+            "layers_found": len(layer_names),
+            "error_count": len(errors),
+            "warning_count": len(warnings),
+            "precheck": "failed"
+        }
+    )
+
+
+def entity_location(entity: dict) -> Optional[Location]:
+    """Insertion point or first vertex of an entity, if it has either."""
+    if "insertion_point" in entity:
+        pt = entity["insertion_point"]
+        return Location(x=pt["x"], y=pt["y"], z=pt.get("z", 0))
+    if "points" in entity and entity["points"]:
+        pt = entity["points"][0]
+        return Location(x=pt["x"], y=pt["y"], z=pt.get("z", 0))
+    return None
+
+
+class ForbiddenEntityRule(EntityRule):
+    """Check for forbidden entity types."""
+
+    def __init__(self, rules: RulePlan = DEFAULT_RULE_PLAN):
+        self.subscriptions = tuple((etype, None) for etype in sorted(rules.forbidden_entity_types))
+        self.errors = []
+
+    def visit(self, entity: dict) -> None:
+        etype = entity.get("type", "UNKNOWN")
+        self.errors.append(ValidationError(
+            code="FORBIDDEN_ENTITY_TYPE",
+            message=f"Verbotener Entitätstyp '{etype}' gefunden",
+            severity=Severity.ERROR,
+            entity_handle=entity.get("handle"),
+            layer=entity.get("layer"),
+            location=entity_location(entity)
+        ))
+
+    def finish(self) -> list[ValidationError]:
+        return self.errors
+
+
+class LayerEntityRule(EntityRule):
+    """
+    Check entity types against the allowed_entities of their layer.
+
+    The check happens in accepts(), which the dispatcher calls once per
+    distinct (type, layer) pair: one cell of the rule plan's layer x type
+    matrix decides whether the pair violates the rule set. Compliant
+    entities are never routed here, violating ones are only counted, and
+    finish() reports one finding per (layer, type) pair with the count and
+    the first offending entity. Unknown layers (LAYER_UNAUTHORIZED) and
+    forbidden types (FORBIDDEN_ENTITY_TYPE) are left to their own checks.
+    """
+
+    def __init__(self, rules: RulePlan = DEFAULT_RULE_PLAN):
+        self.rules = rules
+        self.counts = {}
+        self.first = {}
+        self.errors = []
+
+    def accepts(self, etype: Optional[str], layer: Optional[str]) -> bool:
+        rules = self.rules
+        if etype in rules.forbidden_entity_types:
+            return False
+        cell = rules.matrix_index(layer, etype)
+        return cell >= 0 and not rules.layer_type_matrix[cell]
+
+    def visit(self, entity: dict) -> None:
+        key = (entity.get("layer"), entity.get("type"))
+        count = self.counts.get(key)
+        if count is None:
+            self.first[key] = entity
+            count = 0
+        self.counts[key] = count + 1
+
+    def finish(self) -> list[ValidationError]:
+        rules = self.rules
+        for (layer, etype), count in self.counts.items():
+            mask = rules.allowed_entities[rules.layer_ids[layer]]
+            allowed = [t for i, t in enumerate(rules.entity_types) if mask >> i & 1]
+            first = self.first[(layer, etype)]
+            self.errors.append(ValidationError(
+                code="ENTITY_TYPE_NOT_ALLOWED_ON_LAYER",
+                message=f"{count}x Entitätstyp '{etype}' auf Layer '{layer}' - erlaubt: {', '.join(allowed)}",
+                severity=Severity.ERROR,
+                entity_handle=first.get("handle"),
+                layer=layer,
+                location=entity_location(first)
+            ))
+        return self.errors
+
+
+class GeometryRule(EntityRule):
+    """
+    Validate geometry: closed polylines, Z=0, no overlaps, minimum area.
+
+    Reads everything from a GeometryModel filled in the same pass. Closure,
+    Z, width and area are evaluated as array operations over all polylines;
+    only polylines with a finding are visited in Python, in drawing order.
+    """
+
+    cost = 2
+
+    def __init__(self, model: GeometryModel, check_overlaps: bool = True,
+                 rules: RulePlan = DEFAULT_RULE_PLAN):
+        self.model = model
+        self.check_overlaps = check_overlaps
+        self.min_room_area_m2 = rules.min_room_area_m2
+        self.errors = []
+
+    def visit(self, entity: dict) -> None:
+        pass
+
+    def finish(self) -> list[ValidationError]:
+        errors = self.errors
+        model = self.model
+        model.pack()
+        count = len(model)
+
+        nonempty = model.counts > 0
+        not_closed = nonempty & model.polygon_layer & ((model.flags & 1) == 0)
+        wide = nonempty & (model.widths != 0)
+
+        z_polylines, z_vertex = model.first_nonzero_z()
+        z_bad = np.zeros(count, dtype=bool)
+        z_bad[z_polylines] = True
+        z_first = dict(zip(z_polylines.tolist(), z_vertex.tolist()))
+
+        is_room = np.zeros(count, dtype=bool)
+        is_room[model.rooms] = True
+        too_small = is_room & (model.areas() / 1_000_000 < self.min_room_area_m2)  # mm² to m²
+
+        invalid = np.zeros(count, dtype=bool)
+        if SHAPELY_AVAILABLE and model.rooms:
+            # One vectorized build and validity test; room_index reuses the polygons
+            invalid[model.rooms] = ~shapely.is_valid(model.polygons(model.rooms))
+
+        for i in np.flatnonzero(not_closed | z_bad | wide | too_small | invalid).tolist():
+            handle = model.handles[i]
+            layer = model.layers[i]
+            loc = model.location(i)
+
+            # Check closure (for room polygons)
+            if not_closed[i]:
+                errors.append(ValidationError(
+                    code="POLYLINE_NOT_CLOSED",
+                    message=f"Raumpolygon ist nicht geschlossen",
+                    severity=Severity.ERROR,
+                    entity_handle=handle,
+                    layer=layer,
+                    location=loc
+                ))
+
+            # Check Z-coordinates, only report once per polyline
+            if z_bad[i]:
+                bad_loc = model.location(i, z_first[i])
+                errors.append(ValidationError(
+                    code="Z_NOT_ZERO",
+                    message=f"Z-Koordinate ist nicht 0 (gefunden: {bad_loc.z})",
+                    severity=Severity.ERROR,
+                    entity_handle=handle,
+                    layer=layer,
+                    location=bad_loc
+                ))
+
+            # Check polyline width
+            if wide[i]:
+                errors.append(ValidationError(
+                    code="POLYLINE_WIDTH_NOT_ZERO",
+                    message=f"Polylinienbreite ist {model.width(i)}, erwartet 0",
+                    severity=Severity.ERROR,
+                    entity_handle=handle,
+                    layer=layer,
+                    location=loc
+                ))
+
+            # Check minimum area
+            if too_small[i]:
+                area_m2 = model.area(i) / 1_000_000
+                errors.append(ValidationError(
+                    code="ROOM_TOO_SMALL",
+                    message=f"Raumfläche {area_m2:.3f} m² < {self.min_room_area_m2} m²",
+                    severity=Severity.ERROR,
+                    entity_handle=handle,
+                    layer=layer,
+                    location=loc
+                ))
+
+            # Check polygon validity
+            if invalid[i]:
+                errors.append(ValidationError(
+                    code="POLYGON_INVALID",
+                    message=f"Ungültiges Polygon: {shapely.is_valid_reason(model.polygon(i))}",
+                    severity=Severity.ERROR,
+                    entity_handle=handle,
+                    layer=layer,
+                    location=loc
+                ))
+
+        # Check for overlapping rooms
+        if SHAPELY_AVAILABLE and model.rooms and self.check_overlaps:
+            room_index = model.room_index
+            for i, j in room_index.overlapping_pairs():
+                h1, h2 = room_index.handles[i], room_index.handles[j]
+                errors.append(ValidationError(
+                    code="ROOMS_OVERLAP",
+                    message=f"Raumpolygone {h1} und {h2} überlappen sich",
+                    severity=Severity.ERROR,
+                    entity_handle=h1,
+                    layer="R_RAUMPOLYGON",
+                    location=room_index.locations[i]
+                ))
+
+        return errors
+
+
+class GapRule(EntityRule):
+    """
+    Report endpoints that almost but not quite meet.
+
+    Collects both endpoints of every LINE and every open LWPOLYLINE on the
+    gap layers; closed polylines have no free ends. The pairs closer than
+    gap_tolerance_mm come from one near_pairs grid query over all endpoints.
+    Endpoints within gap_coincident_mm of another count as connected; a
+    free endpoint on the same layer as a near one is reported once, with its
+    nearest partner and the gap size. An open polyline with at least three
+    vertices may pair with itself, which is the near-closed room polygon.
+    Findings sit at the free endpoint, the first one for two free ends.
+    """
+
+    cost = 2
+
+    def __init__(self, rules: RulePlan = DEFAULT_RULE_PLAN):
+        layers = sorted(rules.gap_layers)
+        self.subscriptions = tuple((etype, layer) for layer in layers for etype in ("LINE", "LWPOLYLINE"))
+        self.layer_index = {layer: k for k, layer in enumerate(layers)}
+        self.tolerance = rules.gap_tolerance_mm
+        self.coincident = rules.gap_coincident_mm
+        self.handles = []
+        self.layers = []
+        self._closable = []
+        self._points = []
+        self.errors = []
+
+    def visit(self, entity: dict) -> None:
+        if entity.get("type") == "LINE":
+            start, end = entity.get("start"), entity.get("end")
+            if not start or not end:
+                return
+            closable = False
+        else:
+            points = entity.get("points", [])
+            if entity.get("flag", 0) & 1 or len(points) < 2:
+                return
+            start, end = points[0], points[-1]
+            closable = len(points) >= 3
+        self.handles.append(entity.get("handle", "?"))
+        self.layers.append(entity.get("layer", "?"))
+        self._closable.append(closable)
+        self._points += (start["x"], start["y"], start.get("z", 0.0), end["x"], end["y"], end.get("z", 0.0))
+
+    def pack(self) -> None:
+        """Convert the collected endpoints into arrays; endpoints 2k and 2k + 1 belong to entity k."""
+        if self._points is None:
+            return
+        self.points = np.array(self._points, dtype=np.float64).reshape(-1, 3)
+        self.layer_ids = np.array([self.layer_index[layer] for layer in self.layers], dtype=np.int64)
+        self.closable = np.array(self._closable, dtype=bool)
+        self._points = self._closable = None
+
+    @classmethod
+    def splice(cls, previous: "GapRule", fresh: "GapRule", source, rules: RulePlan = DEFAULT_RULE_PLAN) -> "GapRule":
+        """GapRule over the entities previous + fresh selected by the index array source, already packed."""
+        previous.pack()
+        fresh.pack()
+        rule = cls(rules)
+        index = source.tolist()
+        handles = previous.handles + fresh.handles
+        layers = previous.layers + fresh.layers
+        rule.handles = [handles[i] for i in index]
+        rule.layers = [layers[i] for i in index]
+        rule.points = np.concatenate((previous.points, fresh.points)).reshape(-1, 6)[source].reshape(-1, 3)
+        rule.layer_ids = np.concatenate((previous.layer_ids, fresh.layer_ids))[source]
+        rule.closable = np.concatenate((previous.closable, fresh.closable))[source]
+        rule._points = rule._closable = None
+        return rule
+
+    def finish(self) -> list[ValidationError]:
+        errors = self.errors
+        self.pack()
+        points = self.points
+        i, j, dist = near_pairs(points[:, :2], self.tolerance)
+
+        layers = self.layer_ids
+        closable = self.closable
+        same = i // 2 == j // 2
+        keep = (layers[i // 2] == layers[j // 2]) & (~same | closable[i // 2])
+        i, j, dist = i[keep], j[keep], dist[keep]
+
+        coincident = dist <= self.coincident
+        connected = np.zeros(len(points), dtype=bool)
+        connected[i[coincident]] = True
+        connected[j[coincident]] = True
+
+        # Nearest partner of every free endpoint, each pair reported once
+        gap = ~coincident
+        ends = np.concatenate((i[gap], j[gap]))
+        partners = np.concatenate((j[gap], i[gap]))
+        sizes = np.concatenate((dist[gap], dist[gap]))
+        free = ~connected[ends]
+        ends, partners, sizes = ends[free], partners[free], sizes[free]
+        order = np.lexsort((partners, sizes, ends))
+        _, nearest = np.unique(ends[order], return_index=True)
+        nearest = order[nearest]
+        ends, partners, sizes = ends[nearest], partners[nearest], sizes[nearest]
+        pairs = np.minimum(ends, partners) * len(points) + np.maximum(ends, partners)
+        _, unique = np.unique(pairs, return_index=True)
+        unique.sort()
+
+        for a, b, size in zip(ends[unique].tolist(), partners[unique].tolist(), sizes[unique].tolist()):
+            x, y, z = points[a].tolist()
+            handle = self.handles[a // 2]
+            if a // 2 == b // 2:
+                message = f"Anfangs- und Endpunkt berühren sich nicht (Lücke: {size:.3g}mm)"
+            else:
+                message = f"Endpunkte von {handle} und {self.handles[b // 2]} berühren sich nicht (Lücke: {size:.3g}mm)"
+            errors.append(ValidationError(
+                code="ENDPOINT_GAP",
+                message=message,
+                severity=Severity.WARNING,
+                entity_handle=handle,
+                layer=self.layers[a // 2],
+                location=Location(x=x, y=y, z=z)
+            ))
+        return errors
+
+
+class AoidRule(EntityRule):
+    """
+    Validate AOID text entities and cross-check with Excel.
+
+    Room containment is answered by the RoomIndex of the GeometryModel filled
+    in the same pass; without a model the AOID_OUTSIDE_ROOM check is skipped.
+    """
+
+    subscriptions = (("TEXT", "R_AOID"), ("MTEXT", "R_AOID"))
+    cost = 2
+
+    def __init__(self, excel_rooms: Optional[dict] = None, model: Optional[GeometryModel] = None,
+                 rules: RulePlan = DEFAULT_RULE_PLAN):
+        self.excel_rooms = excel_rooms
+        self.model = model
+        self.aoid_pattern = rules.aoid_pattern
+        self.aoid_texts = []
+        self.errors = []
+
+    def visit(self, entity: dict) -> None:
+        pt = entity.get("insertion_point", {})
+        self.aoid_texts.append({
+            "handle": entity.get("handle"),
+            "value": entity.get("text_value", "").strip(),
+            "location": Location(x=pt.get("x", 0), y=pt.get("y", 0))
+        })
+
+    def inside_room(self, text: dict) -> bool:
+        location = text["location"]
+        return self.model.room_index.contains(shapely.Point(location.x, location.y))
+
+    def finish(self) -> list[ValidationError]:
+        errors = self.errors
+        model = self.model
+        excel_rooms = self.excel_rooms
+        aoid_pattern = self.aoid_pattern
+        found_aoids = set()
+
+        for text in self.aoid_texts:
+            aoid = text["value"]
+
+            # Check format
+            if not aoid_pattern.match(aoid):
+                errors.append(ValidationError(
+                    code="AOID_FORMAT_INVALID",
+                    message=f"AOID '{aoid}' entspricht nicht dem Format (z.B. 2011.DM.04.045)",
+                    severity=Severity.ERROR,
+                    entity_handle=text["handle"],
+                    layer="R_AOID",
+                    location=text["location"]
+                ))
+                continue
+
+            # Check uniqueness
+            if aoid in found_aoids:
+                errors.append(ValidationError(
+                    code="AOID_DUPLICATE",
+                    message=f"AOID '{aoid}' kommt mehrfach vor",
+                    severity=Severity.ERROR,
+                    entity_handle=text["handle"],
+                    layer="R_AOID",
+                    location=text["location"]
+                ))
+            found_aoids.add(aoid)
+
+            # Check if AOID is inside a room polygon
+            if SHAPELY_AVAILABLE and model is not None and model.rooms:
+                if not self.inside_room(text):
+                    errors.append(ValidationError(
+                        code="AOID_OUTSIDE_ROOM",
+                        message=f"AOID '{aoid}' liegt nicht innerhalb eines Raumpolygons",
+                        severity=Severity.ERROR,
+                        entity_handle=text["handle"],
+                        layer="R_AOID",
+                        location=text["location"]
+                    ))
+
+        # Cross-check with Excel
+        if excel_rooms:
+            excel_aoids = set(excel_rooms.keys())
+
+            for aoid in found_aoids - excel_aoids:
+                errors.append(ValidationError(
+                    code="AOID_NOT_IN_EXCEL",
+                    message=f"AOID '{aoid}' in DWG, aber nicht in Raumtabelle",
+                    severity=Severity.ERROR
+                ))
+
+            for aoid in excel_aoids - found_aoids:
+                errors.append(ValidationError(
+                    code="AOID_MISSING_IN_DWG",
+                    message=f"AOID '{aoid}' in Raumtabelle, aber nicht in DWG",
+                    severity=Severity.ERROR
+                ))
+
+        return errors
+
+
+class AreaRule(EntityRule):
+    """
+    Reconcile room areas with the room table (AREA_MISMATCH).
+
+    Every AOID text is joined to the first room polygon containing it with
+    one bulk RoomIndex query, every R_RAUMPOLYGON-ABZUG deduction to the
+    room containing its representative point. A room's net area is its
+    shoelace area minus the areas of its deductions, all taken from the
+    GeometryModel's area array; deductions are assumed to lie inside their
+    room. Net areas that differ from the table by more than the rule set
+    tolerance are reported. The joined room areas are kept in self.rooms,
+    in the shape of the UI's geometry records.
+    """
+
+    subscriptions = (("TEXT", "R_AOID"), ("MTEXT", "R_AOID"))
+    cost = 2
+
+    def __init__(self, excel_rooms: Optional[dict] = None, model: Optional[GeometryModel] = None,
+                 rules: RulePlan = DEFAULT_RULE_PLAN):
+        self.excel_rooms = excel_rooms
+        self.model = model
+        self.tolerance_m2 = rules.area_tolerance_m2
+        self.tolerance_pct = rules.area_tolerance_pct
+        self.values = []
+        self.xs = array("d")
+        self.ys = array("d")
+        self.rooms = []
+        self.errors = []
+
+    def visit(self, entity: dict) -> None:
+        pt = entity.get("insertion_point", {})
+        self.values.append(entity.get("text_value", "").strip())
+        self.xs.append(pt.get("x", 0))
+        self.ys.append(pt.get("y", 0))
+
+    def locate_texts(self):
+        """Index into model.rooms of the room holding each AOID text, -1 where none does."""
+        return self.model.room_index.locate(np.frombuffer(self.xs), np.frombuffer(self.ys))
+
+    def net_areas(self):
+        """Net area in m² of every room, in room order."""
+        model = self.model
+        areas = model.areas()
+        net = areas[model.rooms]
+        deductions = np.flatnonzero((np.array(model.layers) == "R_RAUMPOLYGON-ABZUG") & (model.counts >= 3))
+        if deductions.size:
+            points = shapely.get_coordinates(shapely.point_on_surface(model.polygons(deductions.tolist())))
+            owner = model.room_index.locate(points[:, 0], points[:, 1])
+            inside = owner >= 0
+            np.subtract.at(net, owner[inside], areas[deductions[inside]])
+        return net / 1_000_000  # mm² to m²
+
+    def finish(self) -> list[ValidationError]:
+        errors = self.errors
+        model = self.model
+        if not (SHAPELY_AVAILABLE and model is not None and model.rooms and self.values):
+            return errors
+
+        room_of = self.locate_texts()
+        net = self.net_areas()
+        excel_rooms = self.excel_rooms or {}
+        seen = set()
+
+        for t in np.flatnonzero(room_of >= 0).tolist():
+            aoid = self.values[t]
+            if aoid in seen:
+                continue
+            seen.add(aoid)
+            i = model.rooms[room_of[t]]
+            area = float(net[room_of[t]])
+            status = "ok"
+
+            expected = _room_area(excel_rooms[aoid]["area"]) if aoid in excel_rooms else math.nan
+            if not math.isnan(expected):
+                diff = area - expected
+                if abs(diff) > max(self.tolerance_m2, abs(expected) * self.tolerance_pct / 100):
+                    status = "error"
+                    errors.append(ValidationError(
+                        code="AREA_MISMATCH",
+                        message=(f"Fläche von AOID '{aoid}': DWG {area:.2f} m², "
+                                 f"Raumtabelle {expected:.2f} m² (Differenz {diff:+.2f} m²)"),
+                        severity=Severity.ERROR,
+                        entity_handle=model.handles[i],
+                        layer="R_RAUMPOLYGON",
+                        location=Location(x=self.xs[t], y=self.ys[t])
+                    ))
+
+            self.rooms.append({
+                "type": "room",
+                "aoid": aoid,
+                "area": round(area, 2),
+                "excel_area": None if math.isnan(expected) else expected,
+                "handle": model.handles[i],
+                "status": status
+            })
+
+        return errors
+
+
+class TextEntityRule(EntityRule):
+    """
+    Validate text entities: correct layer, font, color.
+
+    Inside a block definition (in_block=True) text on layer 0 takes the
+    layer of the INSERT and BYBLOCK color is accepted.
+    """
+
+    subscriptions = (("TEXT", None), ("MTEXT", None))
+
+    def __init__(self, rules: RulePlan = DEFAULT_RULE_PLAN, in_block: bool = False):
+        self.allowed_layers = rules.text_allowed_layers
+        self.in_block = in_block
+        self.font = rules.text_font
+        self.colors = {rules.text_color, 0} if in_block else {rules.text_color}
+        self.errors = []
+        self.styles = {}
+
+    def begin(self, dwg_json: dict) -> None:
+        # Get text styles
+        for style in dwg_json.get("tables", {}).get("STYLE", []):
+            self.styles[style["name"]] = style
+
+    def visit(self, entity: dict) -> None:
+        errors = self.errors
+        handle = entity.get("handle")
+        layer = entity.get("layer", "?")
+        pt = entity.get("insertion_point", {})
+        loc = Location(x=pt.get("x", 0), y=pt.get("y", 0))
+
+        # Check layer
+        if layer not in self.allowed_layers and not (self.in_block and layer == "0"):
+            errors.append(ValidationError(
+                code="TEXT_WRONG_LAYER",
+                message=f"Text auf Layer '{layer}' - nur erlaubt auf {set(self.allowed_layers)}",
+                severity=Severity.ERROR,
+                entity_handle=handle,
+                layer=layer,
+                location=loc
+            ))
+
+        # Check font
+        style_name = entity.get("style", "Standard")
+        if style_name in self.styles:
+            font = self.styles[style_name].get("font_file", "").lower()
+            if font and self.font.lower() not in font:
+                errors.append(ValidationError(
+                    code="TEXT_WRONG_FONT",
+                    message=f"Text verwendet Schriftart '{font}', nur {self.font} erlaubt",
+                    severity=Severity.ERROR,
+                    entity_handle=handle,
+                    layer=layer,
+                    location=loc
+                ))
+
+        # Check color is BYLAYER
+        color = entity.get("color", 256)
+        if color not in self.colors:
+            errors.append(ValidationError(
+                code="COLOR_NOT_BYLAYER",
+                message=f"Text hat explizite Farbe {color}, sollte BYLAYER sein",
+                severity=Severity.WARNING,
+                entity_handle=handle,
+                layer=layer,
+                location=loc
+            ))
+
+    def finish(self) -> list[ValidationError]:
+        return self.errors
+
+
+class StatsRule(EntityRule):
+    """Count room polygons and AOID texts for ValidationResult.stats."""
+
+    subscriptions = ((None, "R_RAUMPOLYGON"), (None, "R_AOID"))
+
+    def __init__(self):
+        self.counts = {"R_RAUMPOLYGON": 0, "R_AOID": 0}
+
+    def visit(self, entity: dict) -> None:
+        self.counts[entity.get("layer")] += 1
+
+
+def validate_entity_types(dwg_json: dict, rules: RulePlan = DEFAULT_RULE_PLAN) -> list[ValidationError]:
+    """Check for forbidden entity types."""
+    return run_rules(dwg_json, [ForbiddenEntityRule(rules)])
+
+
+def validate_layer_entities(dwg_json: dict, rules: RulePlan = DEFAULT_RULE_PLAN) -> list[ValidationError]:
+    """Check entity types against the allowed_entities of their layer."""
+    return run_rules(dwg_json, [LayerEntityRule(rules)])
+
+
+def validate_geometry(dwg_json: dict, rules: RulePlan = DEFAULT_RULE_PLAN) -> list[ValidationError]:
+    """Validate geometry: closed polylines, Z=0, no overlaps, minimum area."""
+    if not NUMPY_AVAILABLE:
+        return []
+    model = GeometryModel(rules.polygon_layers)
+    return run_rules(dwg_json, [model, GeometryRule(model, rules=rules)])
+
+
+def validate_endpoint_gaps(dwg_json: dict, rules: RulePlan = DEFAULT_RULE_PLAN) -> list[ValidationError]:
+    """Report LINE and open polyline endpoints that miss each other by less than the gap tolerance."""
+    if not NUMPY_AVAILABLE:
+        return []
+    return run_rules(dwg_json, [GapRule(rules)])
+
+
+def validate_aoids(dwg_json: dict, excel_rooms: Optional[dict] = None,
+                   rules: RulePlan = DEFAULT_RULE_PLAN) -> list[ValidationError]:
+    """Validate AOID text entities and cross-check with Excel."""
+    if not NUMPY_AVAILABLE:
+        return run_rules(dwg_json, [AoidRule(excel_rooms, rules=rules)])
+    model = GeometryModel(rules.polygon_layers)
+    return run_rules(dwg_json, [model, AoidRule(excel_rooms, model, rules)])
+
+
+def validate_text_entities(dwg_json: dict, rules: RulePlan = DEFAULT_RULE_PLAN) -> list[ValidationError]:
+    """Validate text entities: correct layer, font, color."""
+    return run_rules(dwg_json, [TextEntityRule(rules)])
+
+
+def build_entity_rules(excel_rooms: Optional[dict] = None,
+                       rules: RulePlan = DEFAULT_RULE_PLAN) -> list[EntityRule]:
+    """Entity rules of a full validation, in report order, sharing one GeometryModel."""
+    entity_rules = [ForbiddenEntityRule(rules), LayerEntityRule(rules)]
+    geometry = None
+    if NUMPY_AVAILABLE:
+        geometry = GeometryModel(rules.polygon_layers)
+        entity_rules += [geometry, GeometryRule(geometry, rules=rules), GapRule(rules)]
+    entity_rules.append(AoidRule(excel_rooms, geometry, rules))
+    if geometry is not None:
+        entity_rules.append(AreaRule(excel_rooms, geometry, rules))
+    entity_rules += [TextEntityRule(rules), BlockRule(rules)]
+    return entity_rules
+
+
+# =============================================================================
+# Block References
+# =============================================================================
+
+IDENTITY_TRANSFORM = (1.0, 0.0, 0.0, 0.0,
+                      0.0, 1.0, 0.0, 0.0,
+                      0.0, 0.0, 1.0, 0.0)
+
+
+def insert_transform(insert: dict, base_point: dict) -> tuple:
+    """
+    Row-major 3x4 affine matrix of an INSERT, mapping block coordinates to
+    the coordinates of the containing block: p' = ins + R * S * (p - base).
+    Rotation is in radians, as dwgread writes it.
+    """
+    ins = insert.get("insertion_point", {})
+    scale = insert.get("scale", {})
+    sx, sy, sz = scale.get("x", 1.0), scale.get("y", 1.0), scale.get("z", 1.0)
+    bx, by, bz = base_point.get("x", 0.0), base_point.get("y", 0.0), base_point.get("z", 0.0)
+    c, s = math.cos(insert.get("rotation", 0.0)), math.sin(insert.get("rotation", 0.0))
+    return (c * sx, -s * sy, 0.0, ins.get("x", 0.0) - (c * sx * bx - s * sy * by),
+            s * sx, c * sy, 0.0, ins.get("y", 0.0) - (s * sx * bx + c * sy * by),
+            0.0, 0.0, sz, ins.get("z", 0.0) - sz * bz)
+
+
+def compose_transforms(outer: tuple, inner: tuple) -> tuple:
+    """Matrix of applying inner first, then outer."""
+    out = []
+    for r in range(3):
+        row = outer[4 * r:4 * r + 4]
+        for c in range(4):
+            value = sum(row[k] * inner[4 * k + c] for k in range(3))
+            out.append(value + row[3] if c == 3 else value)
+    return tuple(out)
+
+
+def transform_location(m: tuple, loc: Optional[Location]) -> Optional[Location]:
+    if loc is None:
+        return None
+    x, y, z = loc.x, loc.y, loc.z
+    return Location(
+        x=m[0] * x + m[1] * y + m[2] * z + m[3],
+        y=m[4] * x + m[5] * y + m[6] * z + m[7],
+        z=m[8] * x + m[9] * y + m[10] * z + m[11]
+    )
+
+
+class BlockRule(EntityRule):
+    """
+    Validate the block definitions referenced by model space INSERTs.
+
+    Each block definition is validated once (forbidden types, polyline
+    geometry, text) and its findings are memoized per block name, in block
+    coordinates. Nested INSERTs inside a block fold their child block's
+    memoized findings in through the composed transform. Every model space
+    INSERT then only projects the memoized findings of its block into world
+    coordinates, so a furniture block inserted thousands of times is
+    checked once. Projected findings carry the INSERT's handle; the message
+    names the block and the entity inside it.
+    """
+
+    subscriptions = (("INSERT", None),)
+    cost = 1
+
+    def __init__(self, rules: RulePlan = DEFAULT_RULE_PLAN):
+        self.rules = rules
+        self.blocks = {}
+        self.inserts = []
+        self.memo = {}
+        self.errors = []
+        self._active = set()
+        self._reported = set()
+
+    def begin(self, dwg_json: dict) -> None:
+        # A streamed drawing fills the dict by the end of the model space walk
+        self.blocks = dwg_json.get("blocks", {})
+        self.tables = dwg_json.get("tables", {})
+
+    def visit(self, entity: dict) -> None:
+        self.inserts.append(entity)
+
+    def block_findings(self, name: str, insert: dict) -> list:
+        """Memoized (finding, transform to block coordinates, defining block) triples of a block."""
+        findings = self.memo.get(name)
+        if findings is not None:
+            return findings
+
+        block = self.blocks.get(name)
+        if block is None or name in self._active:
+            if name not in self._reported:
+                self._reported.add(name)
+                missing = block is None
+                self.errors.append(ValidationError(
+                    code="BLOCK_NOT_FOUND" if missing else "BLOCK_RECURSIVE",
+                    message=(f"Blockdefinition '{name}' fehlt" if missing
+                             else f"Block '{name}' referenziert sich selbst"),
+                    severity=Severity.WARNING,
+                    entity_handle=insert.get("handle"),
+                    layer=insert.get("layer"),
+                    location=entity_location(insert)
+                ))
+            return []
+
+        self._active.add(name)
+        rules = self.rules
+        entities = block.get("entities", [])
+        block_rules = [ForbiddenEntityRule(rules)]
+        if NUMPY_AVAILABLE:
+            model = GeometryModel(rules.polygon_layers)
+            block_rules += [model, GeometryRule(model, check_overlaps=False, rules=rules)]
+        block_rules.append(TextEntityRule(rules, in_block=True))
+        own = run_rules({"tables": self.tables, "blocks": {"*Model_Space": {"entities": entities}}}, block_rules)
+        findings = [(finding, IDENTITY_TRANSFORM, name) for finding in own]
+
+        for entity in entities:
+            if entity.get("type") != "INSERT":
+                continue
+            child = entity.get("name")
+            nested = self.block_findings(child, entity)
+            if nested:
+                m = insert_transform(entity, self.blocks[child].get("base_point", {}))
+                findings.extend((f, compose_transforms(m, inner), block) for f, inner, block in nested)
+
+        self._active.discard(name)
+        self.memo[name] = findings
+        return findings
+
+    def finish(self) -> list[ValidationError]:
+        errors = self.errors
+        for insert in self.inserts:
+            name = insert.get("name")
+            findings = self.block_findings(name, insert)
+            if not findings:
+                continue
+            m = insert_transform(insert, self.blocks[name].get("base_point", {}))
+            for finding, inner, block in findings:
+                errors.append(ValidationError(
+                    code=finding.code,
+                    message=f"{finding.message} (Block '{block}', Entität {finding.entity_handle})",
+                    severity=finding.severity,
+                    entity_handle=insert.get("handle"),
+                    layer=finding.layer,
+                    location=transform_location(compose_transforms(m, inner), finding.location)
+                ))
+        return errors
+
+
+# =============================================================================
+# Incremental Re-Validation
+# =============================================================================
+
+def _fingerprint(value) -> int:
+    return zlib.crc32(marshal.dumps(value, 2))
+
+
+def _fingerprints(entities) -> map:
+    """
+    Content fingerprint of every entity: the CRC-32 of its marshal bytes.
+
+    marshal is the cheapest exact serialization of parsed JSON and version 2
+    writes no back-references, whose use depends on reference counts, so
+    equal entities always give equal bytes. Key order counts: a reordered
+    entity merely counts as changed. The maps keep the loop in C; a
+    cryptographic digest would cost more than the rest of an incremental
+    run, and a change is only missed if the CRC of that same handle collides.
+    """
+    return map(zlib.crc32, map(marshal.dumps, entities, itertools.repeat(2)))
+
+
+@dataclass
+class ValidationSnapshot:
+    """
+    State of one validated submission that the next submission of the same
+    floor is diffed against: the model space handles in drawing order with
+    their fingerprints, per-entity findings keyed by handle, the packed
+    GeometryModel and GapRule endpoints, the entities the drawing-wide rules
+    visit, and the room results. positions holds the drawing position of
+    every polyline ("model"), endpoint pair ("gaps") and member entity
+    ("members"), so the next run splices them by array operations.
+    """
+    tables_digest: int
+    handles: list = field(default_factory=list)
+    position: dict = field(default_factory=dict)
+    fingerprints: object = None
+    entity_findings: dict = field(default_factory=dict)
+    model: Optional[GeometryModel] = None
+    gaps: Optional[GapRule] = None
+    members: list = field(default_factory=list)
+    positions: dict = field(default_factory=dict)
+    overlaps: list = field(default_factory=list)
+    text_rooms: dict = field(default_factory=dict)
+
+
+# Rules whose findings depend on a single entity, in report order
+PER_ENTITY_RULES = ("forbidden", "geometry", "text")
+
+
+class IncrementalAoidRule(AoidRule):
+    """AoidRule that takes the room of each AOID text from run_incremental instead of querying the RoomIndex."""
+
+    def __init__(self, excel_rooms: Optional[dict], model: GeometryModel, text_rooms: dict,
+                 rules: RulePlan = DEFAULT_RULE_PLAN):
+        super().__init__(excel_rooms, model, rules)
+        self.text_rooms = text_rooms
+
+    def inside_room(self, text: dict) -> bool:
+        return self.text_rooms[text["handle"]] >= 0
+
+
+class IncrementalAreaRule(AreaRule):
+    """AreaRule that takes the room of each AOID text from run_incremental instead of querying the RoomIndex."""
+
+    def __init__(self, excel_rooms: Optional[dict], model: GeometryModel, room_of,
+                 rules: RulePlan = DEFAULT_RULE_PLAN):
+        super().__init__(excel_rooms, model, rules)
+        self.room_of = room_of
+
+    def locate_texts(self):
+        return self.room_of
+
+
+def _group_by_handle(findings) -> dict:
+    grouped = {}
+    for finding in findings:
+        grouped.setdefault(finding.entity_handle, []).append(finding)
+    return grouped
+
+
+def _merge_order(previous_positions, fresh_positions, remap, changed):
+    """
+    Splice order of a snapshot structure: indices into its previous entries
+    followed by the fresh entries of the changed entities, in drawing order,
+    and their drawing positions. remap translates previous positions to
+    current ones (-1 for removed handles; None if the handles kept their
+    order); previous entries of changed entities drop out.
+    """
+    if remap is not None:
+        previous_positions = remap[previous_positions]
+    keep = previous_positions >= 0
+    keep[keep] = ~changed[previous_positions[keep]]
+    source = np.concatenate((np.flatnonzero(keep), np.arange(len(fresh_positions)) + len(previous_positions)))
+    positions = np.concatenate((previous_positions, np.asarray(fresh_positions, dtype=np.int64)))[source]
+    order = np.argsort(positions, kind="stable")
+    return source[order], positions[order]
+
+
+def run_incremental(dwg_json: dict, excel_rooms: Optional[dict],
+                    previous: Optional[ValidationSnapshot],
+                    max_findings_per_code: Optional[int] = None,
+                    rules: RulePlan = DEFAULT_RULE_PLAN):
+    """
+    Validate a drawing against the snapshot of the previous submission.
+
+    Only entities whose handle is new or whose fingerprint changed are
+    visited. Per-entity rules (forbidden types, polyline geometry, text) run
+    on them and the findings of unchanged handles are reused. Their
+    polylines and endpoints are spliced into the snapshot's packed
+    GeometryModel and GapRule arrays, so the endpoint gap check is one array
+    pass that touches no unchanged entity. The drawing-wide rules (per-layer
+    type counts, AOID and area checks, blocks, stats) only re-visit the
+    entities subscribed to them, kept in the snapshot. ROOMS_OVERLAP is only
+    re-tested for changed rooms against rooms whose bounding boxes touch
+    them, and the room of an AOID text only looked up again if the text
+    changed or a changed or removed room's bounding box covers it. The
+    result matches a full validation, in the same order.
+
+    Returns (store, counts, diff, rooms, snapshot), or None when the drawing
+    cannot be diffed (missing or duplicate handles, or NumPy unavailable).
+    """
+    entities = list(model_space_entities(dwg_json))
+    handles = [entity.get("handle") for entity in entities]
+    if not NUMPY_AVAILABLE or None in handles:
+        return None
+    count = len(handles)
+
+    # A different rule set invalidates the snapshot like changed tables do
+    tables_digest = _fingerprint([rules.digest, rules.version, dwg_json.get("tables", {})])
+    fingerprints = np.fromiter(_fingerprints(entities), dtype=np.uint32, count=count)
+    if previous is not None and previous.tables_digest != tables_digest:
+        previous = None
+    remap = None
+    removed = 0
+    if previous is not None and handles == previous.handles:
+        # The usual revision: the same handles in the same order
+        position = previous.position
+        changed = fingerprints != previous.fingerprints
+    else:
+        position = dict(zip(handles, range(count)))
+        if len(position) != count:
+            return None
+        changed = np.ones(count, dtype=bool)
+        if previous is not None:
+            # Previous position -> current position, -1 for removed handles
+            remap = np.fromiter(map(position.get, previous.handles, itertools.repeat(-1)),
+                                dtype=np.int64, count=len(previous.handles))
+            kept = remap >= 0
+            changed[remap[kept]] = fingerprints[remap[kept]] != previous.fingerprints[kept]
+            removed = len(remap) - int(np.count_nonzero(kept))
+    changed_positions = np.flatnonzero(changed).tolist()
+    changed_entities = [entities[k] for k in changed_positions]
+    changed_handles = {handles[k] for k in changed_positions}
+
+    # Per-entity rules and the geometry of the changed entities only
+    changed_drawing = {
+        "tables": dwg_json.get("tables", {}),
+        "blocks": {"*Model_Space": {"entities": changed_entities}}
+    }
+    changed_model = GeometryModel(rules.polygon_layers)
+    entity_rules = {
+        "forbidden": ForbiddenEntityRule(rules),
+        "geometry": GeometryRule(changed_model, check_overlaps=False, rules=rules),
+        "text": TextEntityRule(rules),
+    }
+    run_rules(changed_drawing, [entity_rules["forbidden"], changed_model,
+                                entity_rules["geometry"], entity_rules["text"]])
+
+    entity_findings = {}
+    for name in PER_ENTITY_RULES:
+        merged = {}
+        if previous is not None:
+            merged = {h: found for h, found in previous.entity_findings[name].items()
+                      if h in position and h not in changed_handles}
+        merged.update(_group_by_handle(entity_rules[name].errors))
+        entity_findings[name] = {h: merged[h] for h in sorted(merged, key=position.__getitem__)}
+
+    # Route the changed entities: endpoints to the gap check, members to the
+    # drawing-wide rules
+    member_rules = [LayerEntityRule(rules), AoidRule(rules=rules), AreaRule(rules=rules), BlockRule(rules), StatsRule()]
+    fresh_gaps = GapRule(rules)
+    gap_positions = []
+    fresh_members = []
+    member_positions = []
+    routes = {}
+    for k, entity in zip(changed_positions, changed_entities):
+        key = (entity.get("type"), entity.get("layer"))
+        route = routes.get(key)
+        if route is None:
+            route = routes[key] = (fresh_gaps.accepts(*key), any(rule.accepts(*key) for rule in member_rules))
+        if route[0]:
+            before = len(fresh_gaps.handles)
+            fresh_gaps.visit(entity)
+            if len(fresh_gaps.handles) > before:
+                gap_positions.append(k)
+        if route[1]:
+            fresh_members.append(entity)
+            member_positions.append(k)
+    model_positions = [position[h] for h in changed_model.handles]
+
+    # Splice them into the previous geometry, endpoints and members
+    model, gaps, members = changed_model, fresh_gaps, fresh_members
+    positions = {
+        "model": np.array(model_positions, dtype=np.int64),
+        "gaps": np.array(gap_positions, dtype=np.int64),
+        "members": np.array(member_positions, dtype=np.int64)
+    }
+    if previous is not None:
+        source, positions["model"] = _merge_order(previous.positions["model"], model_positions, remap, changed)
+        model = GeometryModel.splice(previous.model, changed_model, source)
+        source, positions["gaps"] = _merge_order(previous.positions["gaps"], gap_positions, remap, changed)
+        gaps = GapRule.splice(previous.gaps, fresh_gaps, source, rules)
+        source, positions["members"] = _merge_order(previous.positions["members"], member_positions, remap, changed)
+        merged = previous.members + fresh_members
+        members = [merged[i] for i in source.tolist()]
+
+    # Room of every AOID text: reused unless the text changed or a changed
+    # or removed room's bounding box covers it
+    room_handles = [model.handles[i] for i in model.rooms]
+    texts = [e for e in members if e.get("type") in ("TEXT", "MTEXT") and e.get("layer") == "R_AOID"]
+    text_handles = [e.get("handle") for e in texts]
+    room_of = np.full(len(texts), -1, dtype=np.int64)
+    if SHAPELY_AVAILABLE and model.rooms and texts:
+        xs = np.array([e.get("insertion_point", {}).get("x", 0) for e in texts], dtype=np.float64)
+        ys = np.array([e.get("insertion_point", {}).get("y", 0) for e in texts], dtype=np.float64)
+        redo = np.ones(len(texts), dtype=bool)
+        if previous is not None:
+            room_index = {h: k for k, h in enumerate(room_handles)}
+            old_rooms = previous.positions["model"][previous.model.rooms]
+            if remap is not None:
+                old_rooms = remap[old_rooms]
+            gone = old_rooms < 0
+            gone[~gone] = changed[old_rooms[~gone]]
+            boxes = np.concatenate((model.room_bounds()[changed[positions["model"][model.rooms]]],
+                                    previous.model.room_bounds()[gone]))
+            for t, h in enumerate(text_handles):
+                room = previous.text_rooms.get(h, False)
+                if room is not False and h not in changed_handles:
+                    redo[t] = False
+                    # A room that is gone has its box in boxes, so the text is redone
+                    room_of[t] = room_index.get(room, -1)
+            for x0, y0, x1, y1 in boxes.tolist():
+                redo |= (x0 <= xs) & (xs <= x1) & (y0 <= ys) & (ys <= y1)
+        redo = np.flatnonzero(redo)
+        room_of[redo] = model.locate_rooms(xs[redo], ys[redo])
+    text_rooms = dict(zip(text_handles, [room_handles[k] if k >= 0 else None for k in room_of.tolist()]))
+
+    # One pass over the members for the per-layer type counts, AOID checks,
+    # areas, blocks and stats
+    layer_rule = LayerEntityRule(rules)
+    aoid_rule = IncrementalAoidRule(excel_rooms, model, dict(zip(text_handles, room_of.tolist())), rules)
+    area_rule = IncrementalAreaRule(excel_rooms, model, room_of, rules)
+    block_rule = BlockRule(rules)
+    stats_rule = StatsRule()
+    member_drawing = {**dwg_json, "blocks": {**dwg_json.get("blocks", {}), "*Model_Space": {"entities": members}}}
+    EntityDispatcher([layer_rule, aoid_rule, area_rule, block_rule, stats_rule]).run(member_drawing)
+    gaps.finish()
+
+    # Overlaps: keep pairs of unchanged rooms, re-test pairs with a changed room
+    overlaps = []
+    if SHAPELY_AVAILABLE and model.rooms:
+        from shapely.prepared import prep
+        room_changed = changed[positions["model"][model.rooms]]
+        if previous is not None:
+            room_index = {h: k for k, h in enumerate(room_handles)}
+            for h1, h2 in previous.overlaps:
+                k, m = room_index.get(h1), room_index.get(h2)
+                if k is not None and m is not None and not room_changed[k] and not room_changed[m]:
+                    overlaps.append((min(k, m), max(k, m)))
+        bounds = model.room_bounds()
+        for k in np.flatnonzero(room_changed).tolist():
+            x0, y0, x1, y1 = bounds[k]
+            candidates = np.flatnonzero(
+                (bounds[:, 0] <= x1) & (x0 <= bounds[:, 2]) & (bounds[:, 1] <= y1) & (y0 <= bounds[:, 3])
+            )
+            prepared = prep(model.polygon(model.rooms[k]))
+            for m in candidates.tolist():
+                if m == k or (room_changed[m] and m < k):
+                    continue
+                if prepared.overlaps(model.polygon(model.rooms[m])):
+                    overlaps.append((min(k, m), max(k, m)))
+        overlaps.sort()
+
+    # Assemble in the order of a full validation
+    store = FindingStore(max_findings_per_code)
+    store.extend(validate_layers(dwg_json, rules))
+    store.extend(itertools.chain.from_iterable(entity_findings["forbidden"].values()))
+    store.extend(layer_rule.errors)
+    geometry_sink = store.sink()
+    geometry_sink.extend(itertools.chain.from_iterable(entity_findings["geometry"].values()))
+    for k, m in overlaps:
+        h1, h2 = room_handles[k], room_handles[m]
+        geometry_sink.append(ValidationError(
+            code="ROOMS_OVERLAP",
+            message=f"Raumpolygone {h1} und {h2} überlappen sich",
+            severity=Severity.ERROR,
+            entity_handle=h1,
+            layer="R_RAUMPOLYGON",
+            location=model.location(model.rooms[k])
+        ))
+    store.extend(gaps.errors)
+    store.extend(aoid_rule.errors)
+    store.extend(area_rule.errors)
+    store.extend(itertools.chain.from_iterable(entity_findings["text"].values()))
+    store.extend(block_rule.errors)
+
+    snapshot = ValidationSnapshot(
+        tables_digest=tables_digest,
+        handles=handles,
+        position=position,
+        fingerprints=fingerprints,
+        entity_findings=entity_findings,
+        model=model,
+        gaps=gaps,
+        members=members,
+        positions=positions,
+        overlaps=[(room_handles[k], room_handles[m]) for k, m in overlaps],
+        text_rooms=text_rooms
+    )
+    counts = {
+        "total_entities": count,
+        "layers_found": len(dwg_json.get("tables", {}).get("LAYER", [])),
+        "room_polygons": stats_rule.counts["R_RAUMPOLYGON"],
+        "aoid_texts": stats_rule.counts["R_AOID"],
+    }
+    diff = {
+        "changed": len(changed_positions),
+        "removed": removed,
+        "reused": count - len(changed_positions)
+    }
+    return store, counts, diff, area_rule.rooms, snapshot
+
+
+# =============================================================================
+# Project AOID Index
+# =============================================================================
+
+class ProjectAoidIndex:
+    """
+    Persistent AOID registry of one project, for uniqueness across the
+    floors and buildings of a project without re-parsing their drawings.
+    
+    Every accepted document (one floor plan, keyed by its name in the
+    project) owns the AOIDs it contained when it was accepted, with entity
+    handle and location. Checking a new floor is one indexed lookup per
+    AOID, O(k log n) for k new AOIDs against n registered ones, and
+    accepting it replaces the document's previous entries. accept()
+    repeats the check inside the write transaction, so workers validating
+    two floors at once cannot both register the same AOID.
+    
+    Stored in SQLite; one file per project, e.g. next to the parse cache as
+    projects/<project id>.sqlite. Connections are opened per call, so an
+    index can be shared by threads and processes.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS aoids (
+            aoid TEXT NOT NULL,
+            document TEXT NOT NULL,
+            handle TEXT,
+            x REAL,
+            y REAL,
+            PRIMARY KEY (aoid, document)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS aoids_by_document ON aoids (document);
+        CREATE TABLE IF NOT EXISTS documents (
+            document TEXT PRIMARY KEY,
+            accepted_at REAL NOT NULL,
+            aoid_count INTEGER NOT NULL
+        );
+    """
+    
+    # Bound parameters per lookup, below SQLite's historic limit of 999
+    CHUNK = 500
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(self.SCHEMA)
+    
+    @contextmanager
+    def _connect(self):
+        import sqlite3
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    def _conflicts(self, db, document: str, aoids) -> dict:
+        conflicts = {}
+        aoids = list(dict.fromkeys(aoids))
+        for start in range(0, len(aoids), self.CHUNK):
+            chunk = aoids[start:start + self.CHUNK]
+            rows = db.execute(
+                f"SELECT aoid, document, handle FROM aoids WHERE aoid IN ({','.join('?' * len(chunk))}) "
+                "AND document != ? ORDER BY aoid, document",
+                (*chunk, document)
+            )
+            for aoid, other, handle in rows:
+                conflicts.setdefault(aoid, (other, handle))
+        return conflicts
+    
+    def conflicts(self, document: str, aoids) -> dict:
+        """AOIDs that other documents already registered: aoid -> (document, handle)."""
+        with self._connect() as db:
+            return self._conflicts(db, document, aoids)
+    
+    def accept(self, document: str, entries) -> dict:
+        """
+        Register a document's (aoid, handle, location) entries in place of
+        its previous ones; handle and location may be None. If another
+        document holds one of the AOIDs by now, nothing is written and the
+        conflicts are returned; an empty dict means accepted.
+        """
+        entries = list(entries)
+        with self._connect() as db:
+            # Closing the connection without COMMIT rolls back
+            db.execute("BEGIN IMMEDIATE")
+            conflicts = self._conflicts(db, document, (aoid for aoid, _, _ in entries))
+            if conflicts:
+                return conflicts
+            db.execute("DELETE FROM aoids WHERE document = ?", (document,))
+            db.executemany("INSERT OR REPLACE INTO aoids VALUES (?, ?, ?, ?, ?)", (
+                (aoid, document, handle, loc.x if loc else None, loc.y if loc else None)
+                for aoid, handle, loc in entries
             ))
+            db.execute("INSERT OR REPLACE INTO documents VALUES (?, ?, ?)",
+                       (document, time.time(), len({aoid for aoid, _, _ in entries})))
+            db.execute("COMMIT")
+        return {}
+    
+    def remove(self, document: str) -> int:
+        """Drop a document (deleted or superseded floor); returns the number of AOIDs released."""
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            released = db.execute("DELETE FROM aoids WHERE document = ?", (document,)).rowcount
+            db.execute("DELETE FROM documents WHERE document = ?", (document,))
+            db.execute("COMMIT")
+        return released
     
-    return errors
+    def lookup(self, aoid: str) -> list:
+        """(document, handle, location) of every registration of an AOID."""
+        with self._connect() as db:
+            rows = db.execute("SELECT document, handle, x, y FROM aoids WHERE aoid = ? ORDER BY document", (aoid,))
+            return [(document, handle, Location(x=x, y=y) if x is not None else None)
+                    for document, handle, x, y in rows]
+    
+    def documents(self) -> dict:
+        """Accepted documents and their AOID counts."""
+        with self._connect() as db:
+            return dict(db.execute("SELECT document, aoid_count FROM documents ORDER BY document"))
+
+
+def project_aoid_findings(conflicts: dict, entries) -> list[ValidationError]:
+    """AOID_DUPLICATE_PROJECT findings for the entries whose AOID another document holds."""
+    return [
+        ValidationError(
+            code="AOID_DUPLICATE_PROJECT",
+            message=f"AOID '{aoid}' ist im Projekt bereits in '{conflicts[aoid][0]}' vergeben",
+            severity=Severity.ERROR,
+            entity_handle=handle,
+            layer="R_AOID",
+            location=location
+        )
+        for aoid, handle, location in entries
+        if aoid in conflicts
+    ]
+
+
+# =============================================================================
+# Main Validation Engine
+# =============================================================================
+
+# Execution modes of PlanCheckValidator
+VALIDATION_MODES = ("exhaustive", "fail-fast", "budgeted")
+
+
+class PlanCheckValidator:
+    """
+    Main validation engine combining all validators.
+    
+    With streaming=True (and ijson installed) model space entities are fed
+    to the rules straight from the dwgread pipe instead of loading the whole
+    JSON document first. With a cache_dir, parsed drawings are reused across
+    uploads of the same DWG content; streamed parses are not stored, since
+    that would mean materializing the whole drawing. With precheck=True a
+    cheap dwglayers call runs first, and drawings with any of the
+    precheck_fatal_codes are rejected without the full dwgread conversion.
+    Findings are kept in a FindingStore; max_findings_per_code caps how many
+    are kept per code, the rest are counted in stats["suppressed_findings"].
+    rules is a RulePlan or the path of a YAML/JSON rule set (default: the
+    built-in BBL rules). With profile=True every run records wall/CPU time
+    and entity counts per stage and per validator in stats["profile"]
+    (trace_memory adds tracemalloc peaks); profile_hooks receive the spans
+    as they start and end, see Instrumentation. backend selects the
+    parser: "cli" runs dwgread/dwglayers per file, "library" converts
+    through libredwg in long-lived workers (see create_parser).
+    
+    mode is one of VALIDATION_MODES: "exhaustive" runs every validator to
+    completion, "fail-fast" stops at the first ERROR and "budgeted" after
+    max_errors ERRORs or time_budget seconds, whichever comes first. Early
+    exits run the cheap checks before the geometry passes and report
+    stats["budget"]; a stopped run is never valid, even without errors.
+    
+    aoid_index is the path of the project's ProjectAoidIndex. The AOIDs of
+    each drawing are then checked against the floors accepted before
+    (AOID_DUPLICATE_PROJECT), and a drawing that validates without errors
+    is accepted into the index under its document name (default: the DWG
+    file name), replacing its previous revision. The outcome is in
+    stats["project_aoids"].
+    """
+    
+    def __init__(self, use_mock_parser: bool = False, streaming: bool = False,
+                 cache_dir: Optional[Path] = None, cache_max_bytes: int = 2 * 1024 ** 3,
+                 dwg_timeout: float = 60, precheck: bool = False,
+                 precheck_fatal_codes: set = PRECHECK_FATAL_CODES,
+                 max_findings_per_code: Optional[int] = None, rules=None,
+                 profile: bool = False, profile_hooks=(), trace_memory: bool = False,
+                 backend: str = "cli", mode: str = "exhaustive", max_errors: Optional[int] = None,
+                 time_budget: Optional[float] = None, aoid_index: Optional[Path] = None):
+        if mode not in VALIDATION_MODES:
+            raise ValueError(f"unknown validation mode '{mode}'")
+        if mode == "budgeted" and max_errors is None and time_budget is None:
+            raise ValueError("budgeted mode needs max_errors or time_budget")
+        if use_mock_parser:
+            self.parser = MockDWGParser()
+        else:
+            self.parser = create_parser(backend, dwg_timeout)
+        self.streaming = streaming and IJSON_AVAILABLE
+        self.streaming_requested = streaming
+        self.cache = ParseCache(cache_dir, cache_max_bytes) if cache_dir else None
+        self.precheck = precheck
+        self.precheck_fatal_codes = precheck_fatal_codes
+        self.max_findings_per_code = max_findings_per_code
+        self.rules = resolve_rule_plan(rules)
+        self.profile = profile
+        self.profile_hooks = list(profile_hooks)
+        self.trace_memory = trace_memory
+        self.mode = mode
+        self.max_errors = max_errors
+        self.time_budget = time_budget
+        self.aoid_index = ProjectAoidIndex(aoid_index) if aoid_index else None
+    
+    def validate(self, dwg_path: Path, excel_path: Optional[Path] = None,
+                 document: Optional[str] = None) -> ValidationResult:
+        """Run full validation on a DWG file."""
+        instrumentation = self._instrumentation()
+        budget = self._budget()
+        with self._span(instrumentation, "validate", file=str(dwg_path)):
+            result = self._validate(dwg_path, excel_path, instrumentation, budget, document)
+        if instrumentation is not None:
+            result.stats["profile"] = instrumentation.summary()
+        return result
+    
+    def _validate(self, dwg_path: Path, excel_path: Optional[Path],
+                  instrumentation: Optional[Instrumentation],
+                  budget: Optional[ValidationBudget], document: Optional[str] = None) -> ValidationResult:
+        result = self._precheck(dwg_path, instrumentation)
+        if result is not None:
+            return result
+        
+        # Parse DWG, or reuse a cached parse of the same content
+        try:
+            with self._span(instrumentation, "parse") as span:
+                dwg_json, cache_status = self._load_drawing(dwg_path)
+                if span is not None:
+                    span.set(cache=cache_status or "off", streaming=self.streaming)
+        except Exception as e:
+            return self._parse_error(dwg_path, e)
+        
+        result = self.validate_drawing(dwg_path, dwg_json, excel_path, instrumentation, budget, document)
+        if cache_status and result.stats:
+            result.stats["parse_cache"] = cache_status
+        return result
+    
+    def _precheck(self, dwg_path: Path, instrumentation: Optional[Instrumentation]) -> Optional[ValidationResult]:
+        """
+        Stage 1: layer names only. Returns the result of a drawing with a
+        fatal layer finding; a failing dwglayers call falls back to the full
+        parse.
+        """
+        if not self.precheck:
+            return None
+        with self._span(instrumentation, "precheck"):
+            try:
+                layer_names = self.parser.get_layers(dwg_path)
+            except Exception:
+                return None
+            if layer_names is None:
+                return None
+            return precheck_result(dwg_path, layer_names, self.precheck_fatal_codes, self.rules)
+    
+    def validate_drawing(self, dwg_path: Path, dwg_json: dict, excel_path: Optional[Path] = None,
+                         instrumentation: Optional[Instrumentation] = None,
+                         budget: Optional[ValidationBudget] = None,
+                         document: Optional[str] = None) -> ValidationResult:
+        """Run all validators on an already parsed drawing."""
+        if budget is None:
+            budget = self._budget()
+        
+        # Parse the room table if provided; if that fails, the drawing is
+        # still validated, just without the cross-checks
+        with self._span(instrumentation, "excel") as span:
+            excel_rooms, excel_error = self._load_excel(excel_path)
+            if span is not None and excel_rooms is not None:
+                span.set(entities=len(excel_rooms))
+        
+        # Run all validators: layers come from the tables, everything else
+        # is dispatched from a single walk over model space
+        stats_rule = StatsRule()
+        entity_rules = build_entity_rules(excel_rooms, self.rules)
+        dispatcher = EntityDispatcher(entity_rules + [stats_rule])
+        store = FindingStore(self.max_findings_per_code, budget)
+        document = document or Path(dwg_path).name
+        project_aoids = None
+        try:
+            # Cheapest first: room table and layer table findings can end an
+            # early-exit run before model space is walked at all
+            if budget is not None:
+                budget.check_time()
+            if excel_error is not None:
+                store.extend([excel_error])
+            with self._span(instrumentation, "layers") as span:
+                store.extend(validate_layers(dwg_json, self.rules))
+                if span is not None:
+                    span.set(entities=len(dwg_json.get("tables", {}).get("LAYER", [])))
+            # A streamed parse is consumed here, so its time shows up
+            # under "dispatch" rather than "parse"
+            with self._span(instrumentation, "dispatch") as span:
+                dispatcher.run(dwg_json, store, instrumentation)
+                if span is not None:
+                    span.set(entities=dispatcher.entity_count)
+            if self.aoid_index is not None:
+                aoid_rule = next(rule for rule in entity_rules if isinstance(rule, AoidRule))
+                with self._span(instrumentation, "project_aoids") as span:
+                    project_aoids = self._check_project_aoids(document, aoid_rule.aoid_texts, store)
+                    if span is not None:
+                        span.set(entities=len(project_aoids))
+        except BudgetExhausted:
+            entities = model_space_entities(dwg_json)
+            if hasattr(entities, "close"):
+                entities.close()
+        except StreamParseError as e:
+            # A streamed parse can still fail after the tables were read;
+            # other errors of the rules or the AOID index are not parse errors
+            return self._parse_error(dwg_path, e)
+        
+        stopped = budget is not None and budget.stopped is not None
+        accepted = False
+        if project_aoids is not None and not stopped and not store.errors():
+            accepted = self._accept_project_aoids(document, project_aoids, store)
+        
+        # Separate errors and warnings (views over the store, no copies)
+        errors = store.errors()
+        warnings = store.warnings()
+        
+        # Collect stats
+        stats = {
+            "total_entities": dispatcher.entity_count,
+            "layers_found": len(dwg_json.get("tables", {}).get("LAYER", [])),
+            "room_polygons": stats_rule.counts["R_RAUMPOLYGON"],
+            "aoid_texts": stats_rule.counts["R_AOID"],
+            "error_count": len(errors),
+            "warning_count": len(warnings)
+        }
+        if store.suppressed:
+            stats["suppressed_findings"] = dict(store.suppressed)
+        missing = self._missing_capabilities(excel_path)
+        if missing:
+            stats["missing_capabilities"] = missing
+        if budget is not None:
+            stats["budget"] = {"mode": self.mode, "stopped": budget.stopped, "errors_seen": budget.errors}
+        if project_aoids is not None:
+            stats["project_aoids"] = {"document": document, "checked": len(project_aoids), "accepted": accepted}
+        
+        return ValidationResult(
+            file_path=str(dwg_path),
+            valid=len(errors) == 0 and not stopped,
+            errors=errors,
+            warnings=warnings,
+            stats=stats,
+            rooms=next((rule.rooms for rule in entity_rules if isinstance(rule, AreaRule)), [])
+        )
+    
+    def validate_incremental(self, dwg_path: Path, previous: Optional[ValidationSnapshot] = None,
+                             excel_path: Optional[Path] = None,
+                             document: Optional[str] = None) -> tuple[ValidationResult, Optional[ValidationSnapshot]]:
+        """
+        Validate a new revision of a floor against the snapshot of the
+        previous submission; see run_incremental. Returns the result and the
+        snapshot to pass to the next revision. Drawings that cannot be diffed
+        get a full validation and no snapshot.
+        
+        precheck and profile apply as in validate(); a drawing rejected by
+        the precheck keeps the previous snapshot. The early-exit modes stop
+        before every entity is checked, which leaves nothing to diff the
+        next revision against, so outside "exhaustive" mode this is a plain
+        validate() run that passes the previous snapshot on unchanged.
+        """
+        if self.mode != "exhaustive":
+            return self.validate(dwg_path, excel_path, document), previous
+        instrumentation = self._instrumentation()
+        with self._span(instrumentation, "validate", file=str(dwg_path)):
+            result, snapshot = self._validate_incremental(dwg_path, previous, excel_path, instrumentation, document)
+        if instrumentation is not None:
+            result.stats["profile"] = instrumentation.summary()
+        return result, snapshot
+    
+    def _validate_incremental(self, dwg_path: Path, previous: Optional[ValidationSnapshot],
+                              excel_path: Optional[Path], instrumentation: Optional[Instrumentation],
+                              document: Optional[str]) -> tuple[ValidationResult, Optional[ValidationSnapshot]]:
+        result = self._precheck(dwg_path, instrumentation)
+        if result is not None:
+            return result, previous
+        
+        try:
+            with self._span(instrumentation, "parse") as span:
+                dwg_json, cache_status = self._load_drawing(dwg_path)
+                model_space = dwg_json.get("blocks", {}).get("*Model_Space", {})
+                model_space["entities"] = list(model_space.get("entities", []))
+                if span is not None:
+                    span.set(cache=cache_status or "off", streaming=self.streaming)
+        except Exception as e:
+            return self._parse_error(dwg_path, e), previous
+        
+        with self._span(instrumentation, "excel"):
+            excel_rooms, excel_error = self._load_excel(excel_path)
+        if excel_error is not None:
+            # Cross-check findings of the snapshot would be stale
+            return self.validate_drawing(dwg_path, dwg_json, excel_path, instrumentation, document=document), None
+        
+        with self._span(instrumentation, "incremental") as span:
+            outcome = run_incremental(dwg_json, excel_rooms, previous, self.max_findings_per_code, self.rules)
+            if span is not None and outcome is not None:
+                span.set(entities=outcome[2]["changed"])
+        if outcome is None:
+            return self.validate_drawing(dwg_path, dwg_json, excel_path, instrumentation, document=document), None
+        
+        store, counts, diff, rooms, snapshot = outcome
+        project_aoids = None
+        if self.aoid_index is not None:
+            # Other floors may have been accepted since the snapshot, so the
+            # project check always runs on all AOIDs of the revision
+            document = document or Path(dwg_path).name
+            texts = [
+                {
+                    "handle": entity.get("handle"),
+                    "value": entity.get("text_value", "").strip(),
+                    "location": Location(x=entity.get("insertion_point", {}).get("x", 0),
+                                         y=entity.get("insertion_point", {}).get("y", 0))
+                }
+                for entity in snapshot.members
+                if entity.get("layer") == "R_AOID" and entity.get("type") in ("TEXT", "MTEXT")
+            ]
+            with self._span(instrumentation, "project_aoids") as span:
+                project_aoids = self._check_project_aoids(document, texts, store)
+                if span is not None:
+                    span.set(entities=len(project_aoids))
+            accepted = not store.errors() and self._accept_project_aoids(document, project_aoids, store)
+        errors = store.errors()
+        warnings = store.warnings()
+        stats = {
+            **counts,
+            "error_count": len(errors),
+            "warning_count": len(warnings),
+            "incremental": diff
+        }
+        if store.suppressed:
+            stats["suppressed_findings"] = dict(store.suppressed)
+        missing = self._missing_capabilities(excel_path)
+        if missing:
+            stats["missing_capabilities"] = missing
+        if project_aoids is not None:
+            stats["project_aoids"] = {"document": document, "checked": len(project_aoids), "accepted": accepted}
+        
+        return ValidationResult(
+            file_path=str(dwg_path),
+            valid=len(errors) == 0,
+            errors=errors,
+            warnings=warnings,
+            stats=stats,
+            rooms=rooms
+        ), snapshot
+    
+    def _check_project_aoids(self, document: str, texts: list, store: FindingStore) -> list:
+        """
+        Report the AOIDs of a drawing that other documents of the project
+        hold. Returns the (aoid, handle, location) entries of its well-formed
+        AOIDs, first occurrence each, for _accept_project_aoids.
+        """
+        pattern = self.rules.aoid_pattern
+        entries = {}
+        for text in texts:
+            aoid = text["value"]
+            if aoid not in entries and pattern.match(aoid):
+                entries[aoid] = (aoid, text["handle"], text["location"])
+        entries = list(entries.values())
+        conflicts = self.aoid_index.conflicts(document, [aoid for aoid, _, _ in entries])
+        store.extend(project_aoid_findings(conflicts, entries))
+        return entries
+    
+    def _accept_project_aoids(self, document: str, entries: list, store: FindingStore) -> bool:
+        """Register an error-free drawing's AOIDs; a floor accepted meanwhile can still conflict."""
+        conflicts = self.aoid_index.accept(document, entries)
+        try:
+            store.extend(project_aoid_findings(conflicts, entries))
+        except BudgetExhausted:
+            pass
+        return not conflicts
+    
+    def _load_drawing(self, dwg_path: Path) -> tuple[dict, Optional[str]]:
+        """Return the parsed drawing and the cache status ("hit", "miss" or None)."""
+        if self.cache is None:
+            if self.streaming:
+                return self.parser.stream_dwg_to_json(dwg_path), None
+            return self.parser.parse_dwg_to_json(dwg_path), None
+        
+        key = self.cache.key(dwg_path, self.parser.version())
+        dwg_json = self.cache.get(key)
+        if dwg_json is not None:
+            return dwg_json, "hit"
+        
+        if self.streaming:
+            return self.parser.stream_dwg_to_json(dwg_path), "miss"
+        dwg_json = self.parser.parse_dwg_to_json(dwg_path)
+        self.cache.put(key, dwg_json)
+        return dwg_json, "miss"
+    
+    def _load_excel(self, excel_path: Optional[Path]) -> tuple[Optional[RoomTable], Optional[ValidationError]]:
+        """Return the parsed room table, or an EXCEL_PARSE_ERROR finding."""
+        if not excel_path:
+            return None, None
+        if Path(excel_path).suffix.lower() in (".xlsx", ".xlsm") and not OPENPYXL_AVAILABLE:
+            return None, None
+        try:
+            return load_room_table(excel_path, self.cache), None
+        except Exception as e:
+            return None, ValidationError(
+                code="EXCEL_PARSE_ERROR",
+                message=f"Raumtabelle konnte nicht gelesen werden: {e}",
+                severity=Severity.ERROR
+            )
+    
+    def _missing_capabilities(self, excel_path: Optional[Path]) -> dict:
+        """Optional packages this run would have used, with the checks skipped without them."""
+        missing = [name for name, available in (("numpy", NUMPY_AVAILABLE), ("shapely", SHAPELY_AVAILABLE))
+                   if not available]
+        suffix = Path(excel_path).suffix.lower() if excel_path else ""
+        if suffix in (".xlsx", ".xlsm") and not OPENPYXL_AVAILABLE:
+            missing.append("openpyxl")
+        if suffix == ".parquet" and not PYARROW_AVAILABLE:
+            missing.append("pyarrow")
+        if self.streaming_requested and not IJSON_AVAILABLE:
+            missing.append("ijson")
+        return {name: OPTIONAL_CAPABILITIES[name] for name in missing}
+    
+    def _budget(self) -> Optional[ValidationBudget]:
+        if self.mode == "exhaustive":
+            return None
+        if self.mode == "fail-fast":
+            return ValidationBudget(max_errors=1)
+        return ValidationBudget(self.max_errors, self.time_budget)
+    
+    def _instrumentation(self) -> Optional[Instrumentation]:
+        if not self.profile:
+            return None
+        return Instrumentation(self.profile_hooks, self.trace_memory)
+    
+    @staticmethod
+    def _span(instrumentation: Optional[Instrumentation], name: str, **attrs):
+        if instrumentation is None:
+            return nullcontext()
+        return instrumentation.span(name, **attrs)
+    
+    def _parse_error(self, dwg_path: Path, exc: Exception) -> ValidationResult:
+        return ValidationResult(
+            file_path=str(dwg_path),
+            valid=False,
+            errors=[ValidationError(
+                code="PARSE_ERROR",
+                message=f"DWG konnte nicht gelesen werden: {exc}",
+                severity=Severity.ERROR
+            )]
+        )
+
+
+# =============================================================================
+# Async Validation Service
+# =============================================================================
+
+class AsyncLibreDWGParser:
+    """
+    asyncio wrapper around the LibreDWG CLI tools for use in a web backend.
+    
+    Conversions run as asyncio subprocesses, so no thread is held while
+    dwgread works, and a semaphore caps how many run at once. Create one
+    instance per event loop.
+    """
+    
+    def __init__(self, dwgread_path: str = "dwgread", dwglayers_path: str = "dwglayers",
+                 timeout: float = 60, max_concurrent: int = 4):
+        self.dwgread_path = dwgread_path
+        self.dwglayers_path = dwglayers_path
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+    
+    async def _run(self, args: list[str]) -> bytes:
+        async with self._semaphore:
+            proc = await asyncio.create_subprocess_exec(
+                *args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), self.timeout)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                raise RuntimeError(f"{Path(args[0]).name} timed out after {self.timeout} s")
+            except asyncio.CancelledError:
+                proc.kill()
+                await proc.wait()
+                raise
+            
+            if proc.returncode != 0:
+                raise RuntimeError(f"{Path(args[0]).name} failed: {stderr.decode(errors='replace')}")
+            return stdout
+    
+    async def read_json_bytes(self, dwg_path: Path) -> bytes:
+        """
+        Raw dwgread JSON output, left undecoded so that decoding can happen
+        together with validation in an executor.
+        
+        In production, runs:
+            dwgread -O JSON input.dwg
+        """
+        return await self._run([self.dwgread_path, "-O", "JSON", str(dwg_path)])
+    
+    async def parse_dwg_to_json(self, dwg_path: Path, executor=None) -> dict:
+        raw = await self.read_json_bytes(dwg_path)
+        return await asyncio.get_running_loop().run_in_executor(executor, json.loads, raw)
+    
+    async def get_layers(self, dwg_path: Path) -> list[str]:
+        """
+        In production, runs:
+            dwglayers input.dwg
+        """
+        stdout = await self._run([self.dwglayers_path, str(dwg_path)])
+        return stdout.decode(errors="replace").strip().split("\n")
+
+
+_executor_validators: dict = {}
+
+
+def _validate_json_bytes(dwg_path: Path, raw: bytes, excel_path: Optional[Path],
+                         rules=None) -> ValidationResult:
+    """Decode dwgread output and validate it; runs inside an executor."""
+    validator = _executor_validators.get(rules)
+    if validator is None:
+        validator = _executor_validators.setdefault(rules, PlanCheckValidator(rules=rules))
+    try:
+        dwg_json = json.loads(raw)
+    except ValueError as e:
+        return validator._parse_error(dwg_path, e)
+    return validator.validate_drawing(dwg_path, dwg_json, excel_path)
+
+
+class AsyncPlanCheckValidator:
+    """
+    asyncio-native validation entry point.
+    
+    The dwgread conversion is awaited on a subprocess bounded by
+    max_concurrent_conversions; JSON decoding and the CPU-bound validators
+    run in the given executor (the loop's default thread pool if None). Pass
+    a ProcessPoolExecutor to spread validation over cores: only the raw
+    dwgread output and the ValidationResult cross the process boundary, so
+    with a process pool give rules as a rule set path rather than a RulePlan.
+    """
+    
+    def __init__(self, max_concurrent_conversions: int = 4, executor=None,
+                 dwg_timeout: float = 60, use_mock_parser: bool = False,
+                 precheck: bool = False, precheck_fatal_codes: set = PRECHECK_FATAL_CODES,
+                 rules=None):
+        self.parser = AsyncLibreDWGParser(timeout=dwg_timeout, max_concurrent=max_concurrent_conversions)
+        self.executor = executor
+        self.use_mock_parser = use_mock_parser
+        self.precheck = precheck
+        self.precheck_fatal_codes = precheck_fatal_codes
+        self.rules = rules
+        self.rule_plan = resolve_rule_plan(rules)
+    
+    async def validate(self, dwg_path: Path, excel_path: Optional[Path] = None) -> ValidationResult:
+        """Run full validation on a DWG file without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        
+        if self.precheck and not self.use_mock_parser:
+            try:
+                layer_names = await self.parser.get_layers(dwg_path)
+            except Exception:
+                layer_names = None
+            if layer_names is not None:
+                result = precheck_result(dwg_path, layer_names, self.precheck_fatal_codes, self.rule_plan)
+                if result is not None:
+                    return result
+        
+        if self.use_mock_parser:
+            raw = json.dumps(MockDWGParser().parse_dwg_to_json(dwg_path)).encode()
+        else:
+            try:
+                raw = await self.parser.read_json_bytes(dwg_path)
+            except Exception as e:
+                return ValidationResult(
+                    file_path=str(dwg_path),
+                    valid=False,
+                    errors=[ValidationError(
+                        code="PARSE_ERROR",
+                        message=f"DWG konnte nicht gelesen werden: {e}",
+                        severity=Severity.ERROR
+                    )]
+                )
+        
+        return await loop.run_in_executor(self.executor, _validate_json_bytes, dwg_path, raw, excel_path, self.rules)
+
+
+# =============================================================================
+# Reports
+# =============================================================================
+
+def build_report(result: ValidationResult) -> dict:
+    """JSON-serializable report of a validation result."""
+    return {
+        "file": result.file_path,
+        "valid": result.valid,
+        "stats": result.stats,
+        "errors": [
+            {
+                "code": e.code,
+                "message": e.message,
+                "severity": e.severity.value,
+                "handle": e.entity_handle,
+                "layer": e.layer,
+                "location": {"x": e.location.x, "y": e.location.y} if e.location else None
+            }
+            for e in result.errors
+        ],
+        "warnings": [
+            {
+                "code": w.code,
+                "message": w.message,
+                "severity": w.severity.value
+            }
+            for w in result.warnings
+        ],
+        "rooms": result.rooms
+    }
+
+
+def _dumps(value) -> bytes:
+    """Compact UTF-8 JSON; orjson when installed, the stdlib encoder otherwise."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def iter_findings(findings):
+    """
+    One report record per finding: code, message, severity, handle, layer,
+    location. A FindingView is read straight from the FindingStore columns,
+    so no ValidationError objects are rebuilt along the way.
+    """
+    if isinstance(findings, FindingView):
+        store = findings.store
+        codes, code_names = store.codes, store.code_names
+        layers, layer_names = store.layers, store.layer_names
+        severities = store.severities
+        severity_names = [severity.value for severity in FindingStore.SEVERITIES]
+        xs, ys, handles, messages = store.x, store.y, store.handles, store.messages
+        for row in findings.rows:
+            x = xs[row]
+            yield {
+                "code": code_names[codes[row]],
+                "message": messages[row],
+                "severity": severity_names[severities[row]],
+                "handle": handles[row],
+                "layer": layer_names[layers[row]],
+                "location": None if x != x else {"x": x, "y": ys[row]}
+            }
+        return
+    for e in findings:
+        yield {
+            "code": e.code,
+            "message": e.message,
+            "severity": e.severity.value,
+            "handle": e.entity_handle,
+            "layer": e.layer,
+            "location": {"x": e.location.x, "y": e.location.y} if e.location else None
+        }
+
+
+class ReportWriter:
+    """
+    Streams ValidationResults into a binary file object: an open file,
+    sys.stdout.buffer or socket.makefile("wb"). Findings are serialized in
+    chunks of chunk_size records, so memory stays bounded by one chunk
+    instead of growing with the report.
+    """
+    
+    format = None
+    chunk_size = 1024
+    
+    def __init__(self, out):
+        self.out = out
+        self.bytes_written = 0
+    
+    def write(self, result: ValidationResult) -> None:
+        raise NotImplementedError
+    
+    def close(self) -> None:
+        self.out.flush()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def _emit(self, data: bytes) -> None:
+        self.out.write(data)
+        self.bytes_written += len(data)
+    
+    def _emit_joined(self, parts, separator: bytes, continued: bool = False) -> int:
+        """
+        Write the byte strings from parts joined by separator, one chunk at a
+        time; continued also puts a separator in front of the first one.
+        Returns the number of parts written.
+        """
+        count = 0
+        for chunk in iter(lambda: list(itertools.islice(parts, self.chunk_size)), []):
+            data = separator.join(chunk)
+            self._emit(separator + data if continued or count else data)
+            count += len(chunk)
+        return count
+
+
+class JsonLinesReportWriter(ReportWriter):
+    """
+    Compact JSON Lines: one "result" record per file (validity, stats, rooms,
+    finding counts), followed by one "finding" record per error and warning.
+    Any number of results can share a stream.
+    """
+    
+    format = "jsonl"
+    
+    def write(self, result: ValidationResult) -> None:
+        self._emit(_dumps({
+            "type": "result",
+            "file": result.file_path,
+            "valid": result.valid,
+            "errors": len(result.errors),
+            "warnings": len(result.warnings),
+            "stats": result.stats,
+            "rooms": result.rooms
+        }) + b"\n")
+        for findings in (result.errors, result.warnings):
+            lines = (_dumps({"type": "finding", "file": result.file_path, **record}) + b"\n"
+                     for record in iter_findings(findings))
+            self._emit_joined(lines, b"")
+
+
+class JsonReportWriter(ReportWriter):
+    """
+    The build_report document, written incrementally: same keys and order,
+    compact separators. A JSON document holds one result; use JSON Lines or
+    SARIF for batches.
+    """
+    
+    format = "json"
+    
+    def __init__(self, out):
+        super().__init__(out)
+        self.written = False
+    
+    def write(self, result: ValidationResult) -> None:
+        if self.written:
+            raise ValueError("a JSON report holds a single result, use jsonl or sarif for batches")
+        self.written = True
+        self._emit(b'{"file":' + _dumps(result.file_path) +
+                   b',"valid":' + _dumps(result.valid) +
+                   b',"stats":' + _dumps(result.stats) + b',"errors":[')
+        self._emit_joined(map(_dumps, iter_findings(result.errors)), b",")
+        self._emit(b'],"warnings":[')
+        warnings = ({"code": w["code"], "message": w["message"], "severity": w["severity"]}
+                    for w in iter_findings(result.warnings))
+        self._emit_joined(map(_dumps, warnings), b",")
+        self._emit(b'],"rooms":' + _dumps(result.rooms) + b"}")
+
+
+SARIF_LEVELS = {"ERROR": "error", "WARNING": "warning", "INFO": "note"}
+
+
+class SarifReportWriter(ReportWriter):
+    """
+    SARIF 2.1.0 log with a single run for all written files, for code
+    scanning dashboards and other tooling. Results are streamed as they
+    come; the rule list and the artifacts (one per file, with validity and
+    stats as properties) are only known at the end and follow the results,
+    which JSON object order allows.
+    
+    CAD findings have no line/column region: the entity handle and layer
+    become a logical location and the drawing coordinates go into the
+    result properties.
+    """
+    
+    format = "sarif"
+    schema = "https://json.schemastore.org/sarif-2.1.0.json"
+    
+    def __init__(self, out):
+        super().__init__(out)
+        self.rule_ids = {}
+        self.artifacts = []
+        self.result_count = 0
+        self._emit(b'{"version":"2.1.0","$schema":' + _dumps(self.schema) + b',"runs":[{"results":[')
+    
+    def write(self, result: ValidationResult) -> None:
+        index = len(self.artifacts)
+        self.artifacts.append({
+            "location": {"uri": Path(result.file_path).as_posix()},
+            "properties": {"valid": result.valid, "stats": result.stats}
+        })
+        results = (self._result(record, index)
+                   for findings in (result.errors, result.warnings)
+                   for record in iter_findings(findings))
+        self.result_count += self._emit_joined(map(_dumps, results), b",", continued=self.result_count > 0)
+    
+    def _result(self, record: dict, artifact: int) -> dict:
+        code = record["code"]
+        rule_index = self.rule_ids.setdefault(code, len(self.rule_ids))
+        location = {"physicalLocation": {"artifactLocation": {"index": artifact}}}
+        names = [name for name in (record["layer"], record["handle"]) if name]
+        if names:
+            location["logicalLocations"] = [{
+                "name": names[-1],
+                "fullyQualifiedName": "/".join(names),
+                "kind": "element" if record["handle"] else "namespace"
+            }]
+        result = {
+            "ruleId": code,
+            "ruleIndex": rule_index,
+            "level": SARIF_LEVELS[record["severity"]],
+            "message": {"text": record["message"]},
+            "locations": [location]
+        }
+        if record["location"]:
+            result["properties"] = record["location"]
+        return result
+    
+    def close(self) -> None:
+        tool = {"driver": {"name": "plan-check", "rules": [{"id": code} for code in self.rule_ids]}}
+        self._emit(b'],"tool":' + _dumps(tool) + b',"artifacts":' + _dumps(self.artifacts) + b"}]}")
+        super().close()
+
+
+REPORT_FORMATS = {
+    "json": JsonReportWriter,
+    "jsonl": JsonLinesReportWriter,
+    "sarif": SarifReportWriter,
+}
+
+
+def create_report_writer(format: str, out) -> ReportWriter:
+    """Report writer for a format name ("json", "jsonl", "sarif") on a binary stream."""
+    try:
+        return REPORT_FORMATS[format](out)
+    except KeyError:
+        raise ValueError(f"unknown report format '{format}'") from None
+
+
+@contextmanager
+def open_report_output(target: Optional[str] = None):
+    """
+    Binary stream for a report target: a file path, "tcp://host:port" for a
+    socket, or stdout when target is None or "-".
+    """
+    if target is None or target == "-":
+        yield sys.stdout.buffer
+        sys.stdout.buffer.flush()
+    elif target.startswith("tcp://"):
+        import socket
+        host, _, port = target[len("tcp://"):].rpartition(":")
+        with socket.create_connection((host, int(port))) as sock, sock.makefile("wb") as out:
+            yield out
+    else:
+        with open(target, "wb") as out:
+            yield out
+
+
+class _PreviewFull(Exception):
+    pass
+
+
+class _PreviewSink:
+    """Write target that keeps the first limit bytes and then stops the writer."""
+    
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.data = bytearray()
+    
+    def write(self, data: bytes) -> None:
+        self.data += data[:self.limit - len(self.data)]
+        if len(self.data) >= self.limit:
+            raise _PreviewFull
+    
+    def flush(self) -> None:
+        pass
+
+
+def report_preview(result: ValidationResult, limit: int = 1000, format: str = "json") -> str:
+    """The first limit bytes of a report, without serializing the rest of it."""
+    sink = _PreviewSink(limit)
+    try:
+        with create_report_writer(format, sink) as writer:
+            writer.write(result)
+    except _PreviewFull:
+        pass
+    return sink.data.decode("utf-8", errors="ignore")
+
+
+# =============================================================================
+# Error Overlay Tiles
+# =============================================================================
+
+# Stroke colors per layer, as in the architecture doc; other layers are grey
+OVERLAY_LAYER_COLORS = {
+    "R_RAUMPOLYGON": "#00FF00",
+    "R_RAUMPOLYGON-ABZUG": "#FF0000",
+    "R_GESCHOSSPOLYGON": "#00FFFF",
+    "A_ARCHITEKTUR": "#888888",
+    "R_AOID": "#FF7F00",
+}
+OVERLAY_DEFAULT_COLOR = "#CCCCCC"
+
+# Marker colors by severity, indexed like FindingStore.SEVERITIES
+OVERLAY_SEVERITY_COLORS = ("#FF0000", "#FF9900", "#3366FF")
+
+# Primitive kinds of an OverlayTiles drawing
+_OPEN, _CLOSED, _TEXT = 0, 1, 2
+
+
+def simplify_points(points: list, tolerance: float) -> list:
+    """
+    Douglas-Peucker simplification of [(x, y), ...], after a radial pass that
+    drops vertices within tolerance of the last kept one. The first and
+    last point are always kept.
+    """
+    if len(points) < 3:
+        return points
+    tol2 = tolerance * tolerance
+    radial = [points[0]]
+    px, py = points[0]
+    for x, y in itertools.islice(points, 1, len(points) - 1):
+        if (x - px) ** 2 + (y - py) ** 2 > tol2:
+            radial.append((x, y))
+            px, py = x, y
+    radial.append(points[-1])
+    if len(radial) < 3:
+        return radial
+    
+    keep = bytearray(len(radial))
+    keep[0] = keep[-1] = 1
+    stack = [(0, len(radial) - 1)]
+    while stack:
+        first, last = stack.pop()
+        ax, ay = radial[first]
+        dx, dy = radial[last][0] - ax, radial[last][1] - ay
+        norm = dx * dx + dy * dy
+        worst, index = tol2, 0
+        for i in range(first + 1, last):
+            x, y = radial[i]
+            if norm:
+                cross = dx * (y - ay) - dy * (x - ax)
+                dist2 = cross * cross / norm
+            else:
+                dist2 = (x - ax) ** 2 + (y - ay) ** 2
+            if dist2 > worst:
+                worst, index = dist2, i
+        if index:
+            keep[index] = 1
+            stack.append((first, index))
+            stack.append((index, last))
+    return [point for point, kept in zip(radial, keep) if kept]
+
+
+def _arc_points(entity: dict, closed: bool) -> list:
+    """ARC or CIRCLE flattened to at most 5° steps."""
+    center = entity.get("center", {})
+    cx, cy, r = center.get("x", 0.0), center.get("y", 0.0), entity.get("radius", 0.0)
+    start = 0.0 if closed else entity.get("start_angle", 0.0)
+    sweep = 2 * math.pi if closed else (entity.get("end_angle", 0.0) - start) % (2 * math.pi)
+    steps = max(2, math.ceil(sweep / math.radians(5)))
+    return [(cx + r * math.cos(start + sweep * i / steps), cy + r * math.sin(start + sweep * i / steps))
+            for i in range(steps if closed else steps + 1)]
+
 
+def _svg_text(value) -> str:
+    return str(value).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
 
-def validate_entity_types(dwg_json: dict) -> list[ValidationError]:
-    """Check for forbidden entity types."""
-    errors = []
+
+class OverlayTiles:
+    """
+    Pre-cut SVG tiles of a drawing with its finding markers, for a plan
+    viewer. Zoom level z has 2^z x 2^z tiles of tile_size px over the square
+    extent of the drawing (XYZ scheme, tile row 0 at the top); max_level is
+    chosen so a pixel covers at most resolution drawing units.
     
-    model_space = dwg_json.get("blocks", {}).get("*Model_Space", {})
-    for entity in model_space.get("entities", []):
-        etype = entity.get("type", "UNKNOWN")
-        
-        if etype in FORBIDDEN_ENTITY_TYPES:
-            loc = None
-            if "insertion_point" in entity:
-                pt = entity["insertion_point"]
-                loc = Location(x=pt["x"], y=pt["y"], z=pt.get("z", 0))
-            elif "points" in entity and entity["points"]:
-                pt = entity["points"][0]
-                loc = Location(x=pt["x"], y=pt["y"], z=pt.get("z", 0))
-            
-            errors.append(ValidationError(
-                code="FORBIDDEN_ENTITY_TYPE",
-                message=f"Verbotener Entitätstyp '{etype}' gefunden",
-                severity=Severity.ERROR,
-                entity_handle=entity.get("handle"),
-                layer=entity.get("layer"),
-                location=loc
-            ))
+    Model space is reduced once to primitives: polylines (LWPOLYLINE, LINE,
+    and ARC/CIRCLE flattened), the outline of each INSERT's block extent,
+    and text anchors. Every primitive goes into a hierarchical grid at the
+    level whose cell size matches its extent, so a tile visits only the
+    cells around it and skips the grid levels whose primitives would be
+    smaller than a pixel at its zoom. Geometry is simplified per tile to
+    half a pixel in pixel coordinates; text is drawn once it is a few
+    pixels high.
     
-    return errors
-
-
-def validate_geometry(dwg_json: dict) -> list[ValidationError]:
-    """Validate geometry: closed polylines, Z=0, no overlaps, minimum area."""
-    errors = []
-    room_polygons = []
+    Findings with a location, from any number of finding sequences (e.g.
+    result.errors, result.warnings), become markers. Below max_level they
+    are clustered on cells of cluster_size px: one circle per cell with the
+    count, colored by the worst severity. The cluster grid of a level is
+    built on its first tile.
     
-    model_space = dwg_json.get("blocks", {}).get("*Model_Space", {})
+    Tiles are rendered on request and kept in an LRU of max_tiles, and, with
+    cache_dir and key (e.g. the ParseCache key plus a digest of the rule
+    set), on disk as cache_dir/key/z/x/y.svg. Safe to share between the
+    threads of a tile server.
+    """
     
-    for entity in model_space.get("entities", []):
-        if entity.get("type") != "LWPOLYLINE":
-            continue
-        
-        handle = entity.get("handle", "?")
-        layer = entity.get("layer", "?")
-        points = entity.get("points", [])
-        
-        if not points:
-            continue
-        
-        first_point = points[0]
-        loc = Location(x=first_point["x"], y=first_point["y"], z=first_point.get("z", 0))
-        
-        # Check closure (for room polygons)
-        if layer in ("R_RAUMPOLYGON", "R_RAUMPOLYGON-ABZUG", "R_GESCHOSSPOLYGON"):
-            is_closed = entity.get("flag", 0) & 1
-            if not is_closed:
-                errors.append(ValidationError(
-                    code="POLYLINE_NOT_CLOSED",
-                    message=f"Raumpolygon ist nicht geschlossen",
-                    severity=Severity.ERROR,
-                    entity_handle=handle,
-                    layer=layer,
-                    location=loc
-                ))
+    def __init__(self, dwg_json: dict, *findings, tile_size: int = 256, resolution: float = 5.0,
+                 max_level: Optional[int] = None, cluster_size: int = 64, max_tiles: int = 4096,
+                 cache_dir: Optional[Path] = None, key: Optional[str] = None):
+        if tile_size % cluster_size:
+            raise ValueError("cluster_size must divide tile_size")
+        self.tile_size = tile_size
+        self.cluster_size = cluster_size
+        self.max_tiles = max_tiles
+        self.cache_dir = Path(cache_dir) / key if cache_dir and key else None
+        self._tiles = {}
+        self._lock = threading.Lock()
         
-        # Check Z-coordinates
-        for pt in points:
-            if pt.get("z", 0) != 0:
-                errors.append(ValidationError(
-                    code="Z_NOT_ZERO",
-                    message=f"Z-Koordinate ist nicht 0 (gefunden: {pt['z']})",
-                    severity=Severity.ERROR,
-                    entity_handle=handle,
-                    layer=layer,
-                    location=Location(x=pt["x"], y=pt["y"], z=pt["z"])
-                ))
-                break  # Only report once per polyline
+        self.layer_names = []
+        self._layer_ids = {}
+        self.kinds = array("B")
+        self.layers = array("H")
+        self.offsets = array("I", [0])
+        self.coords = array("d")
+        self.boxes = array("d")
+        self.texts = {}
+        self._block_extents = {}
+        self._load_entities(dwg_json)
+        self._load_markers(findings)
         
-        # Check polyline width
-        width = entity.get("const_width", 0)
-        if width != 0:
-            errors.append(ValidationError(
-                code="POLYLINE_WIDTH_NOT_ZERO",
-                message=f"Polylinienbreite ist {width}, erwartet 0",
-                severity=Severity.ERROR,
-                entity_handle=handle,
-                layer=layer,
-                location=loc
-            ))
+        boxes = self.boxes
+        xs = boxes[0::4] + boxes[2::4] + self.marker_x
+        ys = boxes[1::4] + boxes[3::4] + self.marker_y
+        if xs:
+            self.bounds = (min(xs), min(ys), max(xs), max(ys))
+        else:
+            self.bounds = (0.0, 0.0, 0.0, 0.0)
+        size = max(self.bounds[2] - self.bounds[0], self.bounds[3] - self.bounds[1], 1.0)
+        self.extent = size * 1.02
+        self.origin = (self.bounds[0] - size * 0.01, self.bounds[3] + size * 0.01)
+        if max_level is None:
+            max_level = max(0, math.ceil(math.log2(self.extent / (tile_size * resolution))))
+        self.max_level = min(max_level, 24)
         
-        # Build Shapely polygons for room checks
-        if SHAPELY_AVAILABLE and layer == "R_RAUMPOLYGON":
-            coords = [(p["x"], p["y"]) for p in points]
-            if len(coords) >= 3:
-                poly = Polygon(coords)
-                
-                # Check minimum area
-                area_m2 = poly.area / 1_000_000  # mm² to m²
-                if area_m2 < MIN_ROOM_AREA_M2:
-                    errors.append(ValidationError(
-                        code="ROOM_TOO_SMALL",
-                        message=f"Raumfläche {area_m2:.3f} m² < {MIN_ROOM_AREA_M2} m²",
-                        severity=Severity.ERROR,
-                        entity_handle=handle,
-                        layer=layer,
-                        location=loc
-                    ))
-                
-                # Check polygon validity
-                if not poly.is_valid:
-                    errors.append(ValidationError(
-                        code="POLYGON_INVALID",
-                        message=f"Ungültiges Polygon: {explain_validity(poly)}",
-                        severity=Severity.ERROR,
-                        entity_handle=handle,
-                        layer=layer,
-                        location=loc
-                    ))
-                
-                room_polygons.append((handle, poly, loc))
+        # Grid levels reach past max_level by the pixel bits of a tile, so
+        # primitives of a few pixels at max_level still get their own level
+        self._pixel_bits = int(math.log2(tile_size))
+        self.grid_depth = self.max_level + self._pixel_bits
+        self._grid = [{} for _ in range(self.grid_depth + 1)]
+        for pid in range(len(self.kinds)):
+            self._register(pid)
+        self._clusters = {}
     
-    # Check for overlapping rooms
-    if SHAPELY_AVAILABLE:
-        for i, (h1, p1, loc1) in enumerate(room_polygons):
-            for h2, p2, loc2 in room_polygons[i+1:]:
-                if p1.overlaps(p2):
-                    errors.append(ValidationError(
-                        code="ROOMS_OVERLAP",
-                        message=f"Raumpolygone {h1} und {h2} überlappen sich",
-                        severity=Severity.ERROR,
-                        entity_handle=h1,
-                        layer="R_RAUMPOLYGON",
-                        location=loc1
-                    ))
+    def _add(self, kind: int, layer: Optional[str], points) -> int:
+        layer_id = self._layer_ids.get(layer)
+        if layer_id is None:
+            layer_id = self._layer_ids[layer] = len(self.layer_names)
+            self.layer_names.append(layer)
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        self.coords.extend(itertools.chain.from_iterable(points))
+        self.boxes.extend((min(xs), min(ys), max(xs), max(ys)))
+        self.kinds.append(kind)
+        self.layers.append(layer_id)
+        self.offsets.append(len(self.coords))
+        return len(self.kinds) - 1
     
-    return errors
-
-
-def validate_aoids(dwg_json: dict, excel_rooms: Optional[dict] = None) -> list[ValidationError]:
-    """Validate AOID text entities and cross-check with Excel."""
-    errors = []
+    def _load_entities(self, dwg_json: dict) -> None:
+        blocks = dwg_json.get("blocks", {})
+        for entity in model_space_entities(dwg_json):
+            etype = entity.get("type")
+            layer = entity.get("layer")
+            if etype == "LWPOLYLINE":
+                points = [(p.get("x", 0.0), p.get("y", 0.0)) for p in entity.get("points", ())]
+                if points:
+                    self._add(_CLOSED if entity.get("flag", 0) & 1 else _OPEN, layer, points)
+            elif etype == "LINE":
+                start, end = entity.get("start", {}), entity.get("end", {})
+                self._add(_OPEN, layer, ((start.get("x", 0.0), start.get("y", 0.0)),
+                                         (end.get("x", 0.0), end.get("y", 0.0))))
+            elif etype in ("ARC", "CIRCLE"):
+                closed = etype == "CIRCLE"
+                self._add(_CLOSED if closed else _OPEN, layer, _arc_points(entity, closed))
+            elif etype == "INSERT":
+                outline = self._insert_outline(entity, blocks)
+                if outline:
+                    self._add(_CLOSED, layer, outline)
+            elif etype in ("TEXT", "MTEXT"):
+                value = entity.get("text_value") or entity.get("text") or ""
+                point = entity.get("insertion_point", {})
+                if value:
+                    height = entity.get("height", 100.0) or 100.0
+                    x, y = point.get("x", 0.0), point.get("y", 0.0)
+                    # Anchor plus an estimated far corner, so the grid level fits the label
+                    pid = self._add(_TEXT, layer, ((x, y), (x + 0.6 * height * len(value), y + height)))
+                    self.texts[pid] = (value, height)
     
-    model_space = dwg_json.get("blocks", {}).get("*Model_Space", {})
+    def _insert_outline(self, insert: dict, blocks: dict) -> Optional[list]:
+        """The block extent of an INSERT as a world coordinate quadrilateral."""
+        name = insert.get("name")
+        if name not in self._block_extents:
+            xs, ys = [], []
+            for entity in blocks.get(name, {}).get("entities", ()):
+                for key in ("start", "end", "center", "insertion_point"):
+                    point = entity.get(key)
+                    if point:
+                        xs.append(point.get("x", 0.0))
+                        ys.append(point.get("y", 0.0))
+                for point in entity.get("points", ()):
+                    xs.append(point.get("x", 0.0))
+                    ys.append(point.get("y", 0.0))
+            self._block_extents[name] = (min(xs), min(ys), max(xs), max(ys)) if xs else None
+        extent = self._block_extents[name]
+        if extent is None:
+            return None
+        m = insert_transform(insert, blocks.get(name, {}).get("base_point", {}))
+        x0, y0, x1, y1 = extent
+        return [(m[0] * x + m[1] * y + m[3], m[4] * x + m[5] * y + m[7])
+                for x, y in ((x0, y0), (x1, y0), (x1, y1), (x0, y1))]
     
-    # Collect room polygons and AOID texts
-    room_polygons = []
-    aoid_texts = []
+    def _register(self, pid: int) -> None:
+        x0, y0, x1, y1 = self.boxes[4 * pid:4 * pid + 4]
+        size = max(x1 - x0, y1 - y0)
+        level = self.grid_depth if size <= 0 else min(self.grid_depth, int(math.log2(self.extent / size)))
+        cell = self.extent / (1 << level)
+        left, top = self.origin
+        grid = self._grid[level]
+        for cx in range(int((x0 - left) // cell), int((x1 - left) // cell) + 1):
+            for cy in range(int((top - y1) // cell), int((top - y0) // cell) + 1):
+                key = (cx, cy)
+                pids = grid.get(key)
+                if pids is None:
+                    grid[key] = [pid]
+                else:
+                    pids.append(pid)
     
-    for entity in model_space.get("entities", []):
-        etype = entity.get("type")
-        layer = entity.get("layer")
-        
-        if etype == "LWPOLYLINE" and layer == "R_RAUMPOLYGON":
-            points = entity.get("points", [])
-            if SHAPELY_AVAILABLE and len(points) >= 3:
-                coords = [(p["x"], p["y"]) for p in points]
-                room_polygons.append(Polygon(coords))
-        
-        elif etype in ("TEXT", "MTEXT") and layer == "R_AOID":
-            pt = entity.get("insertion_point", {})
-            aoid_texts.append({
-                "handle": entity.get("handle"),
-                "value": entity.get("text_value", "").strip(),
-                "point": Point(pt.get("x", 0), pt.get("y", 0)) if SHAPELY_AVAILABLE else None,
-                "location": Location(x=pt.get("x", 0), y=pt.get("y", 0))
-            })
+    def _primitives(self, z: int, tx: int, ty: int) -> list:
+        """Ids of the primitives around a tile, in drawing order, without those under about two pixels."""
+        found = set()
+        for level in range(min(self.grid_depth, z + self._pixel_bits - 2) + 1):
+            grid = self._grid[level]
+            if not grid:
+                continue
+            if level <= z:
+                shift = z - level
+                found.update(grid.get((tx >> shift, ty >> shift), ()))
+                continue
+            shift = level - z
+            cx0, cy0, span = tx << shift, ty << shift, 1 << shift
+            if span * span > len(grid):
+                for (cx, cy), pids in grid.items():
+                    if cx0 <= cx < cx0 + span and cy0 <= cy < cy0 + span:
+                        found.update(pids)
+            else:
+                for cx in range(cx0, cx0 + span):
+                    for cy in range(cy0, cy0 + span):
+                        found.update(grid.get((cx, cy), ()))
+        return sorted(found)
     
-    found_aoids = set()
+    def _load_markers(self, groups) -> None:
+        self.marker_x = array("d")
+        self.marker_y = array("d")
+        self.marker_severity = array("B")
+        self.marker_titles = []
+        severity_ids = {severity.value: i for i, severity in enumerate(FindingStore.SEVERITIES)}
+        for record in itertools.chain.from_iterable(map(iter_findings, groups)):
+            location = record["location"]
+            if location is None:
+                continue
+            self.marker_x.append(location["x"])
+            self.marker_y.append(location["y"])
+            self.marker_severity.append(severity_ids[record["severity"]])
+            self.marker_titles.append(f"[{record['code']}] {record['message']}")
     
-    for text in aoid_texts:
-        aoid = text["value"]
-        
-        # Check format
-        if not AOID_PATTERN.match(aoid):
-            errors.append(ValidationError(
-                code="AOID_FORMAT_INVALID",
-                message=f"AOID '{aoid}' entspricht nicht dem Format (z.B. 2011.DM.04.045)",
-                severity=Severity.ERROR,
-                entity_handle=text["handle"],
-                layer="R_AOID",
-                location=text["location"]
-            ))
-            continue
+    def _cluster_grid(self, z: int) -> dict:
+        """
+        Marker cells of a level: cell -> [count, sum x, sum y, worst severity,
+        first marker, all markers]; the member list is only kept at max_level.
+        """
+        grid = self._clusters.get(z)
+        if grid is not None:
+            return grid
+        cell = self.extent / (1 << z) * self.cluster_size / self.tile_size
+        left, top = self.origin
+        members = z == self.max_level
+        grid = {}
+        for i, (x, y, severity) in enumerate(zip(self.marker_x, self.marker_y, self.marker_severity)):
+            key = (int((x - left) // cell), int((top - y) // cell))
+            entry = grid.get(key)
+            if entry is None:
+                grid[key] = [1, x, y, severity, i, [i] if members else None]
+                continue
+            entry[0] += 1
+            entry[1] += x
+            entry[2] += y
+            if severity < entry[3]:
+                entry[3] = severity
+            if members:
+                entry[5].append(i)
+        self._clusters[z] = grid
+        return grid
+    
+    def _markers(self, z: int, tx: int, ty: int) -> list:
+        """Clusters of the tile's marker cells plus a ring of neighbours, whose circles reach in."""
+        with self._lock:
+            grid = self._cluster_grid(z)
+        per_tile = self.tile_size // self.cluster_size
+        cx0, cy0 = tx * per_tile - 1, ty * per_tile - 1
+        span = per_tile + 2
+        if span * span > len(grid):
+            return [entry for (cx, cy), entry in grid.items()
+                    if cx0 <= cx < cx0 + span and cy0 <= cy < cy0 + span]
+        return [grid[(cx, cy)] for cx in range(cx0, cx0 + span) for cy in range(cy0, cy0 + span)
+                if (cx, cy) in grid]
+    
+    def tile_count(self, z: int) -> int:
+        return 1 << z
+    
+    def metadata(self) -> dict:
+        """What a viewer needs to place the tiles."""
+        return {
+            "tile_size": self.tile_size,
+            "max_level": self.max_level,
+            "origin": list(self.origin),
+            "extent": self.extent,
+            "bounds": list(self.bounds),
+            "markers": len(self.marker_x)
+        }
+    
+    def tile(self, z: int, tx: int, ty: int) -> bytes:
+        """SVG of one tile, rendered on first request."""
+        if not 0 <= z <= self.max_level or not (0 <= tx < 1 << z and 0 <= ty < 1 << z):
+            raise ValueError(f"no tile {z}/{tx}/{ty} (max level {self.max_level})")
+        key = (z, tx, ty)
+        with self._lock:
+            svg = self._tiles.pop(key, None)
+            if svg is not None:
+                self._tiles[key] = svg
+                return svg
         
-        # Check uniqueness
-        if aoid in found_aoids:
-            errors.append(ValidationError(
-                code="AOID_DUPLICATE",
-                message=f"AOID '{aoid}' kommt mehrfach vor",
-                severity=Severity.ERROR,
-                entity_handle=text["handle"],
-                layer="R_AOID",
-                location=text["location"]
-            ))
-        found_aoids.add(aoid)
+        path = self.cache_dir / str(z) / str(tx) / f"{ty}.svg" if self.cache_dir else None
+        svg = None
+        if path is not None and path.exists():
+            svg = path.read_bytes()
+        if svg is None:
+            svg = self.render_tile(z, tx, ty)
+            if path is not None:
+                # Write then rename so concurrent readers never see a partial tile
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+                tmp_path.write_bytes(svg)
+                os.replace(tmp_path, path)
         
-        # Check if AOID is inside a room polygon
-        if SHAPELY_AVAILABLE and text["point"] and room_polygons:
-            inside_any = any(poly.contains(text["point"]) for poly in room_polygons)
-            if not inside_any:
-                errors.append(ValidationError(
-                    code="AOID_OUTSIDE_ROOM",
-                    message=f"AOID '{aoid}' liegt nicht innerhalb eines Raumpolygons",
-                    severity=Severity.ERROR,
-                    entity_handle=text["handle"],
-                    layer="R_AOID",
-                    location=text["location"]
-                ))
+        with self._lock:
+            self._tiles[key] = svg
+            while len(self._tiles) > self.max_tiles:
+                del self._tiles[next(iter(self._tiles))]
+        return svg
     
-    # Cross-check with Excel
-    if excel_rooms:
-        excel_aoids = set(excel_rooms.keys())
+    def render_tile(self, z: int, tx: int, ty: int) -> bytes:
+        """SVG of one tile, without the cache."""
+        size = self.tile_size
+        scale = size * (1 << z) / self.extent
+        left = self.origin[0] + tx * size / scale
+        top = self.origin[1] - ty * size / scale
+        margin = 2.0
+        coords, offsets, kinds = self.coords, self.offsets, self.kinds
         
-        for aoid in found_aoids - excel_aoids:
-            errors.append(ValidationError(
-                code="AOID_NOT_IN_EXCEL",
-                message=f"AOID '{aoid}' in DWG, aber nicht in Raumtabelle",
-                severity=Severity.ERROR
-            ))
+        paths = {}
+        labels = []
+        # Visible part of the tile in drawing units, with room for strokes
+        pad = margin / scale
+        west, east = left - pad, left + (size + margin) / scale
+        north, south = top + pad, top - (size + margin) / scale
+        boxes = self.boxes
+        for pid in self._primitives(z, tx, ty):
+            x0, y0, x1, y1 = boxes[4 * pid:4 * pid + 4]
+            if x1 < west or x0 > east or y1 < south or y0 > north:
+                continue
+            points = [((coords[i] - left) * scale, (top - coords[i + 1]) * scale)
+                      for i in range(offsets[pid], offsets[pid + 1], 2)]
+            kind = kinds[pid]
+            if kind == _TEXT:
+                value, height = self.texts[pid]
+                if height * scale >= 4:
+                    labels.append(f'<text x="{points[0][0]:.1f}" y="{points[0][1]:.1f}" '
+                                  f'font-size="{height * scale:.1f}">{_svg_text(value)}</text>')
+                continue
+            points = simplify_points(points, 0.5)
+            d = "M" + "L".join(f"{x:.1f} {y:.1f}" for x, y in points)
+            if kind == _CLOSED and len(points) > 2:
+                d += "Z"
+            paths.setdefault(self.layers[pid], []).append(d)
         
-        for aoid in excel_aoids - found_aoids:
-            errors.append(ValidationError(
-                code="AOID_MISSING_IN_DWG",
-                message=f"AOID '{aoid}' in Raumtabelle, aber nicht in DWG",
-                severity=Severity.ERROR
-            ))
+        out = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" '
+               f'viewBox="0 0 {size} {size}">']
+        if paths:
+            out.append('<g fill="none" stroke-width="1">')
+            for layer_id in sorted(paths):
+                layer = self.layer_names[layer_id]
+                color = OVERLAY_LAYER_COLORS.get(layer, OVERLAY_DEFAULT_COLOR)
+                fill = f' fill="{color}" fill-opacity="0.2"' if layer == "R_RAUMPOLYGON" else ""
+                out.append(f'<path stroke="{color}"{fill} d="{"".join(paths[layer_id])}"/>')
+            out.append("</g>")
+        if labels:
+            out.append('<g font-family="sans-serif" fill="#333333">' + "".join(labels) + "</g>")
+        
+        markers = self._markers(z, tx, ty)
+        if markers:
+            out.append('<g id="findings" stroke-width="2" fill-opacity="0.3">')
+            for count, sum_x, sum_y, severity, first, members in markers:
+                color = OVERLAY_SEVERITY_COLORS[severity]
+                x, y = (sum_x / count - left) * scale, (top - sum_y / count) * scale
+                if count == 1:
+                    out.append(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="6" stroke="{color}" fill="{color}">'
+                               f'<title>{_svg_text(self.marker_titles[first])}</title></circle>')
+                elif members is not None:
+                    # No further zoom level splits the cell: draw each marker with its title
+                    for i in members:
+                        color = OVERLAY_SEVERITY_COLORS[self.marker_severity[i]]
+                        out.append(f'<circle cx="{(self.marker_x[i] - left) * scale:.1f}" '
+                                   f'cy="{(top - self.marker_y[i]) * scale:.1f}" r="4" stroke="{color}" '
+                                   f'fill="{color}"><title>{_svg_text(self.marker_titles[i])}</title></circle>')
+                else:
+                    r = 8 + 4 * math.log10(count)
+                    out.append(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{r:.1f}" stroke="{color}" fill="{color}"/>'
+                               f'<text x="{x:.1f}" y="{y:.1f}" font-size="10" text-anchor="middle" '
+                               f'dominant-baseline="central">{count}</text>')
+            out.append("</g>")
+        out.append("</svg>")
+        return "".join(out).encode("utf-8")
+
+
+
+def write_tiles(tiles: OverlayTiles, out_dir: Path, levels: int) -> int:
+    """Pre-cut levels 0..levels into out_dir/z/x/y.svg next to tiles.json; returns the tile count."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / "tiles.json").write_bytes(_dumps(tiles.metadata()))
+    count = 0
+    for z in range(min(levels, tiles.max_level) + 1):
+        for tx in range(tiles.tile_count(z)):
+            column = out_dir / str(z) / str(tx)
+            column.mkdir(parents=True, exist_ok=True)
+            for ty in range(tiles.tile_count(z)):
+                (column / f"{ty}.svg").write_bytes(tiles.render_tile(z, tx, ty))
+                count += 1
+    return count
+
+
+def serve_tiles(tiles: OverlayTiles, host: str = "127.0.0.1", port: int = 8000) -> None:
+    """
+    Serve /tiles.json and /{z}/{x}/{y}.svg over HTTP, rendering each tile on
+    its first request. Blocks until interrupted.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
     
-    return errors
+    class TileHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/tiles.json":
+                body, content_type = _dumps(tiles.metadata()), "application/json"
+            else:
+                match = re.fullmatch(r"/(\d+)/(\d+)/(\d+)\.svg", self.path)
+                try:
+                    body = tiles.tile(*map(int, match.groups())) if match else None
+                except ValueError:
+                    body = None
+                if body is None:
+                    self.send_error(404)
+                    return
+                content_type = "image/svg+xml"
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    with ThreadingHTTPServer((host, port), TileHandler) as server:
+        server.serve_forever()
+
+# =============================================================================
+# Batch Validation
+# =============================================================================
 
+@dataclass
+class BatchJob:
+    dwg_path: Path
+    excel_path: Optional[Path] = None
+    attempts: int = 0
+    isolated: bool = False
 
-def validate_text_entities(dwg_json: dict) -> list[ValidationError]:
-    """Validate text entities: correct layer, font, color."""
-    errors = []
+
+def discover_jobs(source: Path) -> list[BatchJob]:
+    """
+    Collect DWG/XLSX pairs from a directory or a manifest file.
     
-    # Get text styles
-    styles = {}
-    for style in dwg_json.get("tables", {}).get("STYLE", []):
-        styles[style["name"]] = style
+    A directory is searched recursively for *.dwg; a room table with the same
+    stem next to the DWG is paired with it. A manifest is a JSON Lines file
+    with {"dwg": ..., "excel": ...} per line, relative to the manifest.
+    """
+    source = Path(source)
+    jobs = []
     
-    model_space = dwg_json.get("blocks", {}).get("*Model_Space", {})
+    if source.is_dir():
+        for dwg_path in sorted(source.rglob("*")):
+            if dwg_path.suffix.lower() != ".dwg":
+                continue
+            excel_path = dwg_path.with_suffix(".xlsx")
+            jobs.append(BatchJob(dwg_path, excel_path if excel_path.exists() else None))
+        return jobs
     
-    for entity in model_space.get("entities", []):
-        if entity.get("type") not in ("TEXT", "MTEXT"):
-            continue
-        
-        handle = entity.get("handle")
-        layer = entity.get("layer", "?")
-        pt = entity.get("insertion_point", {})
-        loc = Location(x=pt.get("x", 0), y=pt.get("y", 0))
-        
-        # Check layer
-        if layer not in TEXT_ALLOWED_LAYERS:
-            errors.append(ValidationError(
-                code="TEXT_WRONG_LAYER",
-                message=f"Text auf Layer '{layer}' - nur erlaubt auf {TEXT_ALLOWED_LAYERS}",
-                severity=Severity.ERROR,
-                entity_handle=handle,
-                layer=layer,
-                location=loc
-            ))
-        
-        # Check font
-        style_name = entity.get("style", "Standard")
-        if style_name in styles:
-            font = styles[style_name].get("font_file", "").lower()
-            if font and "arial" not in font:
-                errors.append(ValidationError(
-                    code="TEXT_WRONG_FONT",
-                    message=f"Text verwendet Schriftart '{font}', nur Arial erlaubt",
-                    severity=Severity.ERROR,
-                    entity_handle=handle,
-                    layer=layer,
-                    location=loc
-                ))
-        
-        # Check color is BYLAYER
-        color = entity.get("color", 256)
-        if color != 256:
-            errors.append(ValidationError(
-                code="COLOR_NOT_BYLAYER",
-                message=f"Text hat explizite Farbe {color}, sollte BYLAYER sein",
-                severity=Severity.WARNING,
-                entity_handle=handle,
-                layer=layer,
-                location=loc
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            excel = entry.get("excel")
+            jobs.append(BatchJob(
+                source.parent / entry["dwg"],
+                source.parent / excel if excel else None
             ))
-    
-    return errors
+    return jobs
 
 
-# =============================================================================
-# Main Validation Engine
-# =============================================================================
+_worker_validator = None
 
-class PlanCheckValidator:
-    """Main validation engine combining all validators."""
+
+def _init_batch_worker(options: dict) -> None:
+    global _worker_validator
+    _worker_validator = PlanCheckValidator(**options)
+
+
+def _validate_batch_job(dwg_path: Path, excel_path: Optional[Path]) -> ValidationResult:
+    # The result goes back with its findings still in FindingStore columns;
+    # the parent streams them out through a ReportWriter
+    result = _worker_validator.validate(dwg_path, excel_path)
+    if excel_path:
+        result.stats["excel"] = str(excel_path)
+    return result
+
+
+def _failed_job_result(job: BatchJob, code: str, message: str) -> ValidationResult:
+    return ValidationResult(
+        file_path=str(job.dwg_path),
+        valid=False,
+        errors=[ValidationError(code=code, message=message, severity=Severity.ERROR)],
+        stats={"excel": str(job.excel_path)} if job.excel_path else {}
+    )
+
+
+def _terminate_workers(executor) -> None:
+    terminate = getattr(executor, "terminate_workers", None)
+    if terminate is not None:
+        terminate()
+        return
+    # terminate_workers() is new in Python 3.14; on 3.12 and 3.13 the
+    # private _processes map is the only handle on the pool's workers
+    for process in list((executor._processes or {}).values()):
+        process.terminate()
+
+
+def run_batch(jobs: list[BatchJob], workers: Optional[int] = None, max_retries: int = 1,
+              job_timeout: Optional[float] = None, **validator_options):
+    """
+    Validate many drawings on a process pool and yield one ValidationResult
+    per job as soon as it finishes (completion order, not submission order).
+    The room table a job was paired with is in stats["excel"].
     
-    def __init__(self, use_mock_parser: bool = False):
-        if use_mock_parser:
-            self.parser = MockDWGParser()
-        else:
-            self.parser = LibreDWGParser()
+    Hung conversions are bounded by the parser timeout inside each worker and
+    come back as PARSE_ERROR. If a worker process dies (e.g. a native crash),
+    the pool is rebuilt. A crash only counts against a job that was running
+    alone: when several jobs were in flight, each of them is resubmitted to
+    run on its own without spending a retry, so the one that crashes can be
+    told from the others. A job is retried up to max_retries times before
+    being reported as WORKER_CRASHED.
     
-    def validate(self, dwg_path: Path, excel_path: Optional[Path] = None) -> ValidationResult:
-        """Run full validation on a DWG file."""
-        
-        # Parse DWG
-        try:
-            dwg_json = self.parser.parse_dwg_to_json(dwg_path)
-        except Exception as e:
-            return ValidationResult(
-                file_path=str(dwg_path),
-                valid=False,
-                errors=[ValidationError(
-                    code="PARSE_ERROR",
-                    message=f"DWG konnte nicht gelesen werden: {e}",
-                    severity=Severity.ERROR
-                )]
-            )
-        
-        # Parse Excel room table if provided
-        excel_rooms = None
-        if excel_path and OPENPYXL_AVAILABLE:
-            try:
-                excel_rooms = self._parse_excel_rooms(excel_path)
-            except Exception as e:
-                return ValidationResult(
-                    file_path=str(dwg_path),
-                    valid=False,
-                    errors=[ValidationError(
-                        code="EXCEL_PARSE_ERROR",
-                        message=f"Raumtabelle konnte nicht gelesen werden: {e}",
-                        severity=Severity.ERROR
-                    )]
-                )
-        
-        # Run all validators
-        all_errors = []
-        all_errors.extend(validate_layers(dwg_json))
-        all_errors.extend(validate_entity_types(dwg_json))
-        all_errors.extend(validate_geometry(dwg_json))
-        all_errors.extend(validate_aoids(dwg_json, excel_rooms))
-        all_errors.extend(validate_text_entities(dwg_json))
-        
-        # Separate errors and warnings
-        errors = [e for e in all_errors if e.severity == Severity.ERROR]
-        warnings = [e for e in all_errors if e.severity == Severity.WARNING]
-        
-        # Collect stats
-        model_space = dwg_json.get("blocks", {}).get("*Model_Space", {})
-        entities = model_space.get("entities", [])
-        
-        stats = {
-            "total_entities": len(entities),
-            "layers_found": len(dwg_json.get("tables", {}).get("LAYER", [])),
-            "room_polygons": sum(1 for e in entities if e.get("layer") == "R_RAUMPOLYGON"),
-            "aoid_texts": sum(1 for e in entities if e.get("layer") == "R_AOID"),
-            "error_count": len(errors),
-            "warning_count": len(warnings)
-        }
-        
-        return ValidationResult(
-            file_path=str(dwg_path),
-            valid=len(errors) == 0,
-            errors=errors,
-            warnings=warnings,
-            stats=stats
-        )
+    job_timeout bounds the whole validation of one file, Python included.
+    A running job cannot be cancelled, so an overdue job is reported as
+    JOB_TIMEOUT, the pool's workers are terminated and the other jobs in
+    flight are resubmitted to a new pool without counting as a retry. With
+    a job_timeout, only as many jobs as workers are in flight, so a job's
+    clock starts when a worker takes it.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    from concurrent.futures.process import BrokenProcessPool
     
-    def _parse_excel_rooms(self, excel_path: Path) -> dict:
-        """Parse BBL room table Excel file."""
-        wb = openpyxl.load_workbook(excel_path, read_only=True)
-        ws = wb.active
-        
-        rooms = {}
-        for row in ws.iter_rows(min_row=2, values_only=True):  # Skip header
-            if row[0]:  # AOID column
-                aoid = str(row[0]).strip()
-                rooms[aoid] = {
-                    "aoid": aoid,
-                    "name": row[1] if len(row) > 1 else None,
-                    "area": row[2] if len(row) > 2 else None,
-                }
-        
-        return rooms
+    workers = workers or os.cpu_count() or 1
+    window = workers if job_timeout is not None else workers * 2
+    pending = list(reversed(jobs))
+    
+    while pending:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_batch_worker,
+            initargs=(validator_options,)
+        )
+        in_flight = {}
+        started = {}
+        broken = False
+        try:
+            while pending or in_flight:
+                # Keep a bounded window in flight so results stream out early
+                while pending and len(in_flight) < window and not broken:
+                    # A job under suspicion of crashing the pool runs alone
+                    if in_flight and (pending[-1].isolated or any(job.isolated for job in in_flight.values())):
+                        break
+                    job = pending.pop()
+                    job.attempts += 1
+                    try:
+                        future = executor.submit(_validate_batch_job, job.dwg_path, job.excel_path)
+                    except BrokenProcessPool:
+                        pending.append(job)
+                        job.attempts -= 1
+                        broken = True
+                        break
+                    in_flight[future] = job
+                    started[future] = time.monotonic()
+                
+                if not in_flight:
+                    break
+                timeout = None
+                if job_timeout is not None:
+                    timeout = max(0.0, min(started[f] for f in in_flight) + job_timeout - time.monotonic())
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                if any(isinstance(future.exception(), BrokenProcessPool) for future in done):
+                    # A broken pool fails every job still in flight; collect
+                    # them all to see whether the crashed job ran alone
+                    done = set(in_flight)
+                    wait(done)
+                crashed = []
+                for future in done:
+                    job = in_flight.pop(future)
+                    try:
+                        yield future.result()
+                    except BrokenProcessPool:
+                        crashed.append(job)
+                    except Exception as e:
+                        yield _failed_job_result(job, "VALIDATION_FAILED", f"Validierung fehlgeschlagen: {e}")
+                if len(crashed) == 1:
+                    job = crashed[0]
+                    if job.attempts <= max_retries:
+                        pending.append(job)
+                    else:
+                        yield _failed_job_result(job, "WORKER_CRASHED", "Validierungsprozess abgestürzt")
+                else:
+                    for job in crashed:
+                        job.attempts -= 1
+                        job.isolated = True
+                        pending.append(job)
+                broken = broken or bool(crashed)
+                
+                now = time.monotonic()
+                overdue = [f for f in in_flight if job_timeout is not None and now - started[f] >= job_timeout]
+                if overdue:
+                    for future in overdue:
+                        yield _failed_job_result(in_flight.pop(future), "JOB_TIMEOUT",
+                                                 f"Validierung nach {job_timeout} s abgebrochen")
+                    for job in in_flight.values():
+                        job.attempts -= 1
+                        pending.append(job)
+                    in_flight.clear()
+                    _terminate_workers(executor)
+                    broken = True
+                if broken and not in_flight:
+                    break
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
 
 
 # =============================================================================
 # CLI Entry Point
 # =============================================================================
 
-def main():
+def run_demo() -> int:
     """Run validation on mock data for demonstration."""
     print("=" * 60)
     print("plan-check: BBL Floor Plan Validation Engine (Prototype)")
@@ -749,35 +5398,222 @@ def main():
             print(f"  {i}. [{warn.code}] {warn.message}")
     print()
     
-    # Generate JSON report
-    report = {
-        "file": result.file_path,
-        "valid": result.valid,
-        "stats": result.stats,
-        "errors": [
-            {
-                "code": e.code,
-                "message": e.message,
-                "severity": e.severity.value,
-                "handle": e.entity_handle,
-                "layer": e.layer,
-                "location": {"x": e.location.x, "y": e.location.y} if e.location else None
-            }
-            for e in result.errors
-        ],
-        "warnings": [
-            {
-                "code": w.code,
-                "message": w.message,
-                "severity": w.severity.value
-            }
-            for w in result.warnings
-        ]
-    }
-    
+    # Stream the JSON report; only the previewed part gets serialized
     print("JSON Report Preview:")
-    print(json.dumps(report, indent=2, ensure_ascii=False)[:1000] + "...")
+    print(report_preview(result, limit=1000) + "...")
+    return 0
+
+
+def run_validate_cli(args: argparse.Namespace) -> int:
+    """Validate one drawing and stream its report to a file, socket or stdout."""
+    validator = PlanCheckValidator(
+        use_mock_parser=args.mock,
+        streaming=args.streaming,
+        rules=args.rules,
+        backend=args.backend,
+        mode=args.mode,
+        max_errors=args.max_errors,
+        time_budget=args.time_budget,
+        aoid_index=args.aoid_index
+    )
+    result = validator.validate(args.dwg, args.excel, args.document)
+    with open_report_output(args.output) as out, create_report_writer(args.format, out) as writer:
+        writer.write(result)
+    if args.output is None and args.format != "jsonl":
+        sys.stdout.write("\n")
+    
+    print(f"{len(result.errors)} Fehler, {len(result.warnings)} Warnungen", file=sys.stderr)
+    return 0 if result.valid else 1
+
+
+def run_batch_cli(args: argparse.Namespace) -> int:
+    """Validate a directory or manifest and stream each file's report as it finishes."""
+    jobs = discover_jobs(args.source)
+    failed = 0
+    with open_report_output(args.output) as out, create_report_writer(args.format, out) as writer:
+        for result in run_batch(
+            jobs,
+            workers=args.workers,
+            job_timeout=args.job_timeout,
+            use_mock_parser=args.mock,
+            streaming=args.streaming,
+            cache_dir=args.cache_dir,
+            dwg_timeout=args.timeout,
+            rules=args.rules,
+            backend=args.backend,
+            mode=args.mode,
+            max_errors=args.max_errors,
+            time_budget=args.time_budget,
+            aoid_index=args.aoid_index
+        ):
+            failed += not result.valid
+            writer.write(result)
+            out.flush()
+    if args.output is None and args.format != "jsonl":
+        sys.stdout.write("\n")
+    
+    print(f"{len(jobs)} Dateien geprüft, {failed} mit Fehlern", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def run_aoids_cli(args: argparse.Namespace) -> int:
+    """List, seed or prune a project AOID index."""
+    index = ProjectAoidIndex(args.index)
+    if args.import_table:
+        document, table = args.import_table
+        rooms = load_room_table(Path(table))
+        conflicts = index.accept(document, [(aoid, None, None) for aoid in rooms])
+        for aoid, (other, _) in sorted(conflicts.items()):
+            print(f"AOID '{aoid}' ist im Projekt bereits in '{other}' vergeben", file=sys.stderr)
+        if conflicts:
+            return 1
+        print(f"{len(rooms)} AOIDs für '{document}' übernommen", file=sys.stderr)
+    if args.remove:
+        print(f"{index.remove(args.remove)} AOIDs von '{args.remove}' freigegeben", file=sys.stderr)
+    if args.lookup:
+        for document, handle, location in index.lookup(args.lookup):
+            where = f" @ ({location.x:.0f}, {location.y:.0f})" if location else ""
+            print(f"{args.lookup}\t{document}\t{handle or '-'}{where}")
+        return 0
+    for document, count in index.documents().items():
+        print(f"{count:8d}  {document}")
+    return 0
+
+
+def run_tiles_cli(args: argparse.Namespace) -> int:
+    """Validate one drawing and pre-cut or serve its error overlay tiles."""
+    validator = PlanCheckValidator(use_mock_parser=args.mock, rules=args.rules, backend=args.backend)
+    dwg_json, _ = validator._load_drawing(args.dwg)
+    result = validator.validate_drawing(args.dwg, dwg_json, args.excel)
+    tiles = OverlayTiles(dwg_json, result.errors, result.warnings,
+                         tile_size=args.tile_size, resolution=args.resolution)
+    del dwg_json
+    
+    print(f"{len(tiles.marker_x)} Befunde mit Lage, Zoomstufen 0-{tiles.max_level}", file=sys.stderr)
+    if args.output:
+        count = write_tiles(tiles, args.output, args.levels)
+        print(f"{count} Kacheln nach {args.output} geschrieben", file=sys.stderr)
+    if args.serve:
+        print(f"Kacheln unter http://{args.host}:{args.serve}/{{z}}/{{x}}/{{y}}.svg", file=sys.stderr)
+        serve_tiles(tiles, args.host, args.serve)
+    return 0
+
+
+def run_profile_cli(args: argparse.Namespace) -> int:
+    """Validate one drawing and print where the time (or memory) went."""
+    validator = PlanCheckValidator(
+        use_mock_parser=args.mock,
+        streaming=args.streaming,
+        rules=args.rules,
+        backend=args.backend,
+        profile=True,
+        trace_memory=args.memory
+    )
+    if args.mode == "stages":
+        result, hot_spots = validator.validate(args.dwg, args.excel), ""
+    else:
+        result, hot_spots = capture_profile(lambda: validator.validate(args.dwg, args.excel), args.mode, args.top)
+    
+    print(json.dumps(result.stats["profile"], indent=2))
+    if hot_spots:
+        print(hot_spots)
+    print(f"{len(result.errors)} Fehler, {len(result.warnings)} Warnungen", file=sys.stderr)
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="plan-check: BBL Floor Plan Validation Engine")
+    commands = parser.add_subparsers(dest="command")
+    
+    batch = commands.add_parser("batch", help="validate many DWG/XLSX pairs in parallel")
+    batch.add_argument("source", type=Path, help="directory with DWG/XLSX files or JSON Lines manifest")
+    batch.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    batch.add_argument("--timeout", type=float, default=60, help="per-file dwgread timeout in seconds")
+    batch.add_argument("--job-timeout", type=float, default=300,
+                       help="per-file limit of the whole validation in seconds")
+    batch.add_argument("--format", choices=["jsonl", "sarif"], default="jsonl",
+                       help="JSON Lines records or one SARIF log for the whole batch")
+    batch.add_argument("--output", default=None, help="output file or tcp://host:port (default: stdout)")
+    batch.add_argument("--cache-dir", type=Path, default=None, help="parse cache directory")
+    batch.add_argument("--streaming", action="store_true", help="stream dwgread output")
+    batch.add_argument("--mock", action="store_true", help="use the mock parser")
+    batch.add_argument("--rules", type=Path, default=None, help="YAML/JSON rule set (default: built-in BBL rules)")
+    batch.add_argument("--backend", choices=["cli", "library"], default="cli",
+                       help="dwgread processes or the libredwg library")
+    batch.add_argument("--mode", choices=VALIDATION_MODES, default="exhaustive",
+                       help="run every validator, stop at the first error, or stop at a budget")
+    batch.add_argument("--max-errors", type=int, default=None, help="error budget (budgeted mode)")
+    batch.add_argument("--time-budget", type=float, default=None, help="seconds per file (budgeted mode)")
+    batch.add_argument("--aoid-index", type=Path, default=None,
+                       help="project AOID index: check AOIDs across floors, accept valid drawings")
+    
+    validate = commands.add_parser("validate", help="validate one drawing and stream its report")
+    validate.add_argument("dwg", type=Path, help="DWG file")
+    validate.add_argument("--excel", type=Path, default=None, help="room table (XLSX/CSV/Parquet)")
+    validate.add_argument("--format", choices=sorted(REPORT_FORMATS), default="json",
+                          help="report document, JSON Lines records or SARIF log")
+    validate.add_argument("--output", default=None, help="output file or tcp://host:port (default: stdout)")
+    validate.add_argument("--streaming", action="store_true", help="stream dwgread output")
+    validate.add_argument("--mock", action="store_true", help="use the mock parser")
+    validate.add_argument("--rules", type=Path, default=None, help="YAML/JSON rule set (default: built-in BBL rules)")
+    validate.add_argument("--backend", choices=["cli", "library"], default="cli",
+                          help="dwgread processes or the libredwg library")
+    validate.add_argument("--mode", choices=VALIDATION_MODES, default="exhaustive",
+                          help="run every validator, stop at the first error, or stop at a budget")
+    validate.add_argument("--max-errors", type=int, default=None, help="error budget (budgeted mode)")
+    validate.add_argument("--time-budget", type=float, default=None, help="seconds (budgeted mode)")
+    validate.add_argument("--aoid-index", type=Path, default=None,
+                          help="project AOID index: check AOIDs across floors, accept a valid drawing")
+    validate.add_argument("--document", default=None, help="document name in the AOID index (default: file name)")
+    
+    aoids = commands.add_parser("aoids", help="list, seed or prune a project AOID index")
+    aoids.add_argument("index", type=Path, help="project AOID index (SQLite file)")
+    aoids.add_argument("--import", dest="import_table", nargs=2, metavar=("DOCUMENT", "TABLE"),
+                       help="register the AOIDs of a room table for a document without parsing its DWG")
+    aoids.add_argument("--remove", metavar="DOCUMENT", help="release the AOIDs of a document")
+    aoids.add_argument("--lookup", metavar="AOID", help="list the documents holding an AOID")
+    
+    tiles = commands.add_parser("tiles", help="tiled SVG error overlay of one drawing")
+    tiles.add_argument("dwg", type=Path, help="DWG file")
+    tiles.add_argument("--excel", type=Path, default=None, help="room table (XLSX/CSV/Parquet)")
+    tiles.add_argument("--output", type=Path, default=None, help="directory for pre-cut tiles and tiles.json")
+    tiles.add_argument("--levels", type=int, default=3, help="zoom levels to pre-cut into --output")
+    tiles.add_argument("--serve", type=int, default=None, metavar="PORT",
+                       help="serve the tiles over HTTP, rendering them on request")
+    tiles.add_argument("--host", default="127.0.0.1", help="address to serve on")
+    tiles.add_argument("--tile-size", type=int, default=256, help="tile edge in pixels")
+    tiles.add_argument("--resolution", type=float, default=5.0, help="drawing units per pixel at the finest level")
+    tiles.add_argument("--mock", action="store_true", help="use the mock parser")
+    tiles.add_argument("--rules", type=Path, default=None, help="YAML/JSON rule set (default: built-in BBL rules)")
+    tiles.add_argument("--backend", choices=["cli", "library"], default="cli",
+                       help="dwgread processes or the libredwg library")
+    
+    profile = commands.add_parser("profile", help="time one validation per stage and validator")
+    profile.add_argument("dwg", type=Path, help="DWG file")
+    profile.add_argument("--excel", type=Path, default=None, help="room table (XLSX/CSV/Parquet)")
+    profile.add_argument("--mode", choices=["stages", "cprofile", "tracemalloc"], default="stages",
+                         help="stages only, or additionally the cProfile/tracemalloc top list")
+    profile.add_argument("--top", type=int, default=30, help="entries in the cProfile/tracemalloc list")
+    profile.add_argument("--memory", action="store_true", help="record tracemalloc peaks per stage (slower)")
+    profile.add_argument("--streaming", action="store_true", help="stream dwgread output")
+    profile.add_argument("--mock", action="store_true", help="use the mock parser")
+    profile.add_argument("--rules", type=Path, default=None, help="YAML/JSON rule set (default: built-in BBL rules)")
+    profile.add_argument("--backend", choices=["cli", "library"], default="cli",
+                         help="dwgread processes or the libredwg library")
+    
+    args = parser.parse_args(argv)
+    if args.command == "batch":
+        return run_batch_cli(args)
+    if args.command == "validate":
+        return run_validate_cli(args)
+    if args.command == "aoids":
+        return run_aoids_cli(args)
+    if args.command == "tiles":
+        return run_tiles_cli(args)
+    if args.command == "profile":
+        return run_profile_cli(args)
+    return run_demo()
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())